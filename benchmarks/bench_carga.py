@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+# ==============================================================================
+# BENCHMARK DE CARGA SINTÉTICA (FLUXOS DA SECRETARIA REPRODUZIDOS VIA APPTEST)
+# ==============================================================================
+# Uso: python benchmarks/bench_carga.py --escalas 10000,100000,1000000 --limite-p95-ms 500
+# Para cada escala, semeia um banco temporário com alunos, turmas e matrículas e
+# reproduz os fluxos de um secretário (buscar aluno e abrir o histórico, matricular,
+# filtrar a listagem de turmas, navegar entre páginas), medindo cada interação.
+# Com --limite-p95-ms, termina com código 1 se algum passo passar do limite (CI);
+# com --json, grava os resultados para comparar com execuções anteriores.
+# Cada escala roda num processo próprio: o caminho do banco (SGDE_DB) é lido uma
+# vez, na importação de sgde.banco, e os serviços do app ficam em cache no processo.
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from bench_rerun import PAGINAS  # noqa: E402
+
+PRIMEIROS_NOMES = [
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João",
+    "Larissa", "Miguel", "Natália", "Otávio", "Pietra", "Rafael", "Sofia", "Thiago", "Valentina", "Wesley",
+]
+SOBRENOMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+]
+ETAPA = "201 - Fundamental Anos Iniciais"
+ALUNOS_POR_TURMA_ANTERIOR = 35
+TAMANHO_BLOCO_SEMEADURA = 50000
+
+
+def nome_sintetico(i):
+    return (
+        f"{PRIMEIROS_NOMES[i % 20]} {SOBRENOMES[i // 20 % 20]} "
+        f"{SOBRENOMES[i // 400 % 20]} {SOBRENOMES[i // 8000 % 20]}"
+    )
+
+
+def semear(caminho, n_alunos, n_turmas):
+    # Direto pelo Banco (executemany em blocos): o Repositorio só é montado pelo app,
+    # e essa carga fria entra na medição. Cada aluno tem uma matrícula de 2024
+    # (histórico) e fica sem turma em 2025, onde há n_turmas com vagas.
+    from sgde.banco import Banco
+
+    banco = Banco(caminho)
+    sala_id = banco.inserir('dependencias', {
+        'nome': 'Sala 01', 'numero': 1, 'climatizacao': False, 'metragem': 60.0, 'capacidade': 50,
+    })
+    n_anteriores = max((n_alunos + ALUNOS_POR_TURMA_ANTERIOR - 1) // ALUNOS_POR_TURMA_ANTERIOR, 1)
+    turmas = [
+        {'codigo': f"024.201.{i + 1:06d}", 'ano_letivo': 2024, 'etapa_label': ETAPA, 'horario': "Manhã",
+         'dependencia_id': sala_id, 'capacidade_max': ALUNOS_POR_TURMA_ANTERIOR, 'alunos_matriculados': 0}
+        for i in range(n_anteriores)
+    ] + [
+        {'codigo': f"025.201.{i + 1:03d}", 'ano_letivo': 2025, 'etapa_label': ETAPA, 'horario': "Manhã",
+         'dependencia_id': sala_id, 'capacidade_max': 50, 'alunos_matriculados': 0}
+        for i in range(n_turmas)
+    ]
+    banco.inserir_varios('turmas', turmas)
+
+    for inicio in range(0, n_alunos, TAMANHO_BLOCO_SEMEADURA):
+        fim = min(inicio + TAMANHO_BLOCO_SEMEADURA, n_alunos)
+        ids = banco.inserir_varios('alunos', [
+            {'nome_completo': nome_sintetico(i), 'dt_nascimento': date(2017, 1 + i % 12, 1 + i % 28), 'ra': "N/A"}
+            for i in range(inicio, fim)
+        ])
+        matriculas = []
+        for i, aluno_id in zip(range(inicio, fim), ids):
+            turma = turmas[i // ALUNOS_POR_TURMA_ANTERIOR]
+            turma['alunos_matriculados'] += 1
+            matriculas.append({
+                'aluno_id': aluno_id, 'turma_id': turma['id'], 'turma_codigo': turma['codigo'],
+                'ano_letivo': 2024, 'data_matricula': date(2024, 2, 1), 'status_rendimento': 'Aprovado',
+            })
+        banco.inserir_varios('matriculas', matriculas)
+    with banco.transacao() as con:
+        con.executemany(
+            "UPDATE turmas SET alunos_matriculados = ? WHERE id = ?",
+            [(t['alunos_matriculados'], t['id']) for t in turmas[:n_anteriores]],
+        )
+    banco.fechar()
+
+
+class Cronometro:
+    # Acumula a duração de cada interação com o app, por passo do fluxo
+    def __init__(self, at, n_alunos):
+        self.at = at
+        self.n_alunos = n_alunos
+        self.tempos = {}
+
+    def executar(self, passo, elemento=None):
+        inicio = time.perf_counter()
+        (elemento or self.at).run()
+        self.tempos.setdefault(passo, []).append((time.perf_counter() - inicio) * 1000)
+        if self.at.exception:
+            raise RuntimeError(f"{passo}: {self.at.exception}")
+
+
+def _por_rotulo(elementos, inicio_rotulo):
+    return next(e for e in elementos if e.label.startswith(inicio_rotulo))
+
+
+def fluxo_historico(c, i):
+    # Cadastro de Alunos > Funcionalidades: buscar pelo nome e abrir a ficha/histórico
+    at = c.at
+    at.switch_page(PAGINAS["Cadastro de Alunos"])
+    c.executar("alunos: abrir página")
+    c.executar("alunos: buscar", _por_rotulo(at.text_input, "Buscar Aluno").input(nome_sintetico(i * 7919 % c.n_alunos)))
+    c.executar("alunos: abrir ficha", _por_rotulo(at.selectbox, "Selecione o Aluno").select_index(1))
+
+
+def fluxo_matricula(c, i):
+    # Gestão de Turmas > Matrícula: escolher uma turma de 2025, buscar o aluno,
+    # selecioná-lo e confirmar a matrícula
+    at = c.at
+    at.switch_page(PAGINAS["Gestão de Turmas"])
+    c.executar("turmas: abrir página")
+    c.executar("turmas: escolher turma", _por_rotulo(at.selectbox, "Selecione a Turma").select("025.201.001"))
+    c.executar("turmas: buscar aluno", _por_rotulo(at.text_input, "Buscar Aluno").input(nome_sintetico(i * 104729 % c.n_alunos)))
+    c.executar("turmas: selecionar aluno", _por_rotulo(at.selectbox, "Selecione o Aluno").select_index(1))
+    c.executar("turmas: confirmar matrícula", _por_rotulo(at.button, "Confirmar Matrícula").click())
+
+
+def fluxo_listagem(c, i):
+    # Gestão de Turmas > Turmas Existentes: filtrar e reordenar a listagem paginada
+    at = c.at
+    at.switch_page(PAGINAS["Gestão de Turmas"])
+    c.executar("turmas: abrir página")
+    c.executar("listagem: filtrar", at.text_input(key="lista_turmas_filtro").input(f"02{4 + i % 2}.201"))
+    c.executar("listagem: ordenar", at.selectbox(key="lista_turmas_ordem").select("alunos_matriculados"))
+
+
+def fluxo_navegacao(c, i):
+    for titulo, caminho in PAGINAS.items():
+        c.at.switch_page(caminho)
+        c.executar(f"navegar: {titulo}")
+
+
+FLUXOS = [fluxo_historico, fluxo_matricula, fluxo_listagem, fluxo_navegacao]
+
+
+def _percentil(tempos, fracao):
+    ordenados = sorted(tempos)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * fracao))]
+
+
+def medir_escala(n_alunos, n_turmas, repeticoes):
+    # Roda no processo filho, com SGDE_DB já apontando para o banco novo da escala
+    caminho = os.environ['SGDE_DB']
+    inicio = time.perf_counter()
+    semear(caminho, n_alunos, n_turmas)
+    semeadura_ms = (time.perf_counter() - inicio) * 1000
+
+    from streamlit.testing.v1 import AppTest
+    from sgde import metricas
+    from sgde.banco import CAMINHO_BANCO
+
+    # O app abre o banco por CAMINHO_BANCO: se não for o desta escala, a medição não vale
+    if os.path.abspath(CAMINHO_BANCO) != os.path.abspath(caminho):
+        raise RuntimeError(f"O app usaria {CAMINHO_BANCO}, não o banco da escala ({caminho}).")
+
+    metricas.zerar()
+    at = AppTest.from_file(os.path.join(RAIZ, 'app.py'), default_timeout=600)
+    c = Cronometro(at, n_alunos)
+    c.executar("primeira execução (serviços frios)")
+    for i in range(repeticoes):
+        for fluxo in FLUXOS:
+            fluxo(c, i)
+
+    passos = {
+        passo: {'n': len(t), 'p50_ms': round(statistics.median(t), 1), 'p95_ms': round(_percentil(t, 0.95), 1)}
+        for passo, t in c.tempos.items()
+    }
+    return {'alunos': n_alunos, 'turmas': n_turmas, 'semeadura_ms': round(semeadura_ms), 'passos': passos,
+            'metricas': metricas.resumo()}
+
+
+def medir_escala_em_processo(n_alunos, n_turmas, repeticoes):
+    pasta = tempfile.mkdtemp(prefix='sgde_carga_')
+    saida = os.path.join(pasta, 'resultado.json')
+    subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--escala-unica', str(n_alunos), '--turmas', str(n_turmas),
+         '--repeticoes', str(repeticoes), '--json', saida],
+        env=dict(os.environ, SGDE_DB=os.path.join(pasta, 'carga.db')), check=True,
+    )
+    with open(saida, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def imprimir(resultado):
+    print(f"\n== {resultado['alunos']} alunos / {resultado['turmas']} turmas "
+          f"(semeadura: {resultado['semeadura_ms'] / 1000:.1f} s) ==")
+    print(f"{'Passo':<40}{'n':>5}{'p50 (ms)':>12}{'p95 (ms)':>12}")
+    for passo, r in resultado['passos'].items():
+        print(f"{passo:<40}{r['n']:>5}{r['p50_ms']:>12.1f}{r['p95_ms']:>12.1f}")
+    print(f"\n{'Medição interna (sgde.metricas)':<52}{'n':>7}{'p50 (ms)':>12}{'p95 (ms)':>12}")
+    for m in sorted(resultado['metricas'], key=lambda m: -m['p95_ms'])[:15]:
+        print(f"{m['nome']:<52}{m['chamadas']:>7}{m['p50_ms']:>12.2f}{m['p95_ms']:>12.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de carga sintética dos fluxos do SGDE")
+    parser.add_argument('--escalas', default="10000,100000", help="quantidades de alunos, separadas por vírgula")
+    parser.add_argument('--turmas', type=int, default=40, help="turmas com vagas no ano letivo de 2025")
+    parser.add_argument('--repeticoes', type=int, default=10)
+    parser.add_argument('--limite-p95-ms', type=float, help="falha (código 1) se algum passo passar deste p95")
+    parser.add_argument('--json', help="arquivo onde gravar os resultados")
+    parser.add_argument('--escala-unica', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.escala_unica:
+        # Processo filho de uma escala: mede e devolve o resultado pelo --json
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(medir_escala(args.escala_unica, args.turmas, args.repeticoes), f, ensure_ascii=False)
+        sys.exit(0)
+
+    resultados = []
+    for escala in args.escalas.split(','):
+        resultado = medir_escala_em_processo(int(escala), args.turmas, args.repeticoes)
+        imprimir(resultado)
+        resultados.append(resultado)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+    if args.limite_p95_ms:
+        lentos = [
+            (r['alunos'], passo, p['p95_ms']) for r in resultados for passo, p in r['passos'].items()
+            if p['p95_ms'] > args.limite_p95_ms and not passo.startswith("primeira execução")
+        ]
+        for alunos, passo, p95 in lentos:
+            print(f"REGRESSÃO: {passo} com {alunos} alunos: p95 {p95:.1f} ms > {args.limite_p95_ms:.1f} ms")
+        sys.exit(1 if lentos else 0)
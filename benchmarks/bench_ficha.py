@@ -0,0 +1,152 @@
+import argparse
+import gc
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+# ==============================================================================
+# BENCHMARK DA FICHA DO ALUNO (DICT POR ALUNO X ARMAZENAMENTO COLUNAR)
+# ==============================================================================
+# Uso: python benchmarks/bench_ficha.py --alunos 100000
+# Semeia um banco temporário com fichas completas e compara, para o mesmo
+# conjunto de alunos, o dict id -> dict usado antes pelo Repositorio com as
+# FichasAlunos colunares: memória retida e pico durante a carga, tempo de carga,
+# leitura de campos, montagem do DataFrame, conversão para Arrow (o que o
+# st.dataframe envia ao navegador) e pickle.
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from bench_carga import nome_sintetico, SOBRENOMES  # noqa: E402
+
+BAIRROS = ["Centro", "Jardim América", "Vila Nova", "São José", "Boa Vista", "Santa Luzia", "Industrial", "Alvorada"]
+TAMANHO_BLOCO_SEMEADURA = 50000
+
+
+def ficha_sintetica(i):
+    return {
+        'nome_completo': nome_sintetico(i), 'nome_social': None, 'dt_nascimento': date(2010 + i % 10, 1 + i % 12, 1 + i % 28),
+        'ra': f"{i:09d}-{i % 10}", 'cpf': None, 'turno_preferido': ["Manhã", "Tarde", None][i % 3], 'nra_gerado': None,
+        'nome_afetivo': None, 'sexo': ["Masculino", "Feminino"][i % 2],
+        'raca_cor': ["Não declarado", "Branca", "Preta", "Parda"][i % 4], 'nacionalidade': "Brasileira",
+        'municipio_nascimento': ["Fortaleza", "Caucaia", "Maracanaú"][i % 3], 'educacenso': f"{100000000000 + i}",
+        'rg_numero': f"{20000000 + i}", 'rg_digito': str(i % 10), 'rg_emissao': date(2020, 1 + i % 12, 1),
+        'rg_uf': "CE", 'cert_matricula': f"{i:032d}", 'cert_livro': str(i % 300), 'cert_folha': str(i % 200),
+        'cert_comarca': "Fortaleza", 'cert_distrito': None, 'nis': f"{10000000000 + i}", 'cartao_sus': f"{700000000000000 + i}",
+        'filiacao1': f"Maria {SOBRENOMES[i % 20]}", 'filiacao2': f"José {SOBRENOMES[i // 20 % 20]}",
+        'bolsa_familia': i % 3 == 0, 'end_logradouro': f"Rua {SOBRENOMES[i % 20]}", 'end_numero': str(i % 2000),
+        'end_bairro': BAIRROS[i % len(BAIRROS)], 'end_cep': f"60{i % 1000:03d}-000", 'end_cidade': "Fortaleza",
+        'telefones': f"(85) 9{i % 100000000:08d}", 'email': None, 'deficiencia': i % 20 == 0,
+        'tipo_deficiencia': None, 'tgd_tea': None, 'nivel_apoio': "Nível 1" if i % 20 == 0 else None,
+        'laudo_medico': i % 20 == 0, 'profissional_apoio': False, 'mobilidade_reduzida': False,
+    }
+
+
+def semear(caminho, n_alunos):
+    from sgde.banco import Banco
+
+    banco = Banco(caminho)
+    for inicio in range(0, n_alunos, TAMANHO_BLOCO_SEMEADURA):
+        banco.inserir_varios('alunos', [
+            ficha_sintetica(i) for i in range(inicio, min(inicio + TAMANHO_BLOCO_SEMEADURA, n_alunos))
+        ])
+    return banco
+
+
+def carregar_dicts(banco):
+    return {a['id']: a for a in banco.listar('alunos')}
+
+
+def carregar_fichas(banco):
+    from sgde.ficha import FichasAlunos
+
+    fichas = FichasAlunos()
+    fichas.adicionar_varios(banco.iterar('alunos'))
+    return fichas
+
+
+def dataframe_dicts(alunos):
+    import pandas as pd
+    return pd.DataFrame.from_records(list(alunos.values()))
+
+
+def dataframe_fichas(fichas):
+    return fichas.dataframe()
+
+
+def ler_campos(alunos):
+    # Leitura típica da enturmação e das listagens: nome, nascimento e turno de todos
+    for aluno in alunos.values():
+        aluno['nome_completo'], aluno['dt_nascimento'], aluno.get('turno_preferido')
+
+
+def memoria(funcao, *args):
+    # (objeto, bytes retidos, pico em bytes) medidos pelo tracemalloc
+    gc.collect()
+    tracemalloc.start()
+    objeto = funcao(*args)
+    retido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objeto, retido, pico
+
+
+def cronometrar(funcao, *args, repeticoes=3):
+    melhor, resultado = None, None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return resultado, melhor
+
+
+def medir(n_alunos, repeticoes):
+    import pyarrow as pa
+
+    with tempfile.TemporaryDirectory() as pasta:
+        banco = semear(os.path.join(pasta, "bench.db"), n_alunos)
+        linhas = []
+        for nome, carregar, montar_df in (
+            ("dict por aluno", carregar_dicts, dataframe_dicts),
+            ("FichasAlunos (colunar)", carregar_fichas, dataframe_fichas),
+        ):
+            estrutura, retido, pico = memoria(carregar, banco)
+            del estrutura
+            estrutura, t_carga = cronometrar(carregar, banco, repeticoes=repeticoes)
+            _, t_leitura = cronometrar(ler_campos, estrutura, repeticoes=repeticoes)
+            df, t_df = cronometrar(montar_df, estrutura, repeticoes=repeticoes)
+            tabela, t_arrow = cronometrar(pa.Table.from_pandas, df, repeticoes=repeticoes)
+            serializado, t_pickle = cronometrar(pickle.dumps, estrutura, repeticoes=repeticoes)
+            linhas.append({
+                'estrutura': nome, 'retido_mb': retido / 1e6, 'pico_mb': pico / 1e6,
+                'bytes_por_aluno': retido / n_alunos, 'carga_s': t_carga, 'leitura_ms': t_leitura * 1000,
+                'dataframe_ms': t_df * 1000, 'df_mb': df.memory_usage(deep=True).sum() / 1e6,
+                'arrow_ms': t_arrow * 1000, 'arrow_mb': tabela.nbytes / 1e6,
+                'pickle_ms': t_pickle * 1000, 'pickle_mb': len(serializado) / 1e6,
+            })
+            del estrutura, df, tabela, serializado
+        banco.fechar()
+    return linhas
+
+
+def imprimir(n_alunos, linhas):
+    print(f"\n== {n_alunos} fichas completas ==")
+    colunas = [
+        ('retido_mb', "retido MB"), ('pico_mb', "pico MB"), ('bytes_por_aluno', "B/aluno"), ('carga_s', "carga s"),
+        ('leitura_ms', "leitura ms"), ('dataframe_ms', "DataFrame ms"), ('df_mb', "DataFrame MB"),
+        ('arrow_ms', "Arrow ms"), ('arrow_mb', "Arrow MB"), ('pickle_ms', "pickle ms"), ('pickle_mb', "pickle MB"),
+    ]
+    print(f"{'':<24}" + ''.join(f"{rotulo:>14}" for _, rotulo in colunas))
+    for linha in linhas:
+        print(f"{linha['estrutura']:<24}" + ''.join(f"{linha[chave]:>14.1f}" for chave, _ in colunas))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de memória e serialização da ficha do aluno")
+    parser.add_argument('--alunos', type=int, default=100000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+    imprimir(args.alunos, medir(args.alunos, args.repeticoes))
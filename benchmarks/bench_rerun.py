@@ -0,0 +1,83 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+# ==============================================================================
+# BENCHMARK DE INICIALIZAÇÃO E RERUN DAS PÁGINAS (STREAMLIT APPTEST, SEM NAVEGADOR)
+# ==============================================================================
+# Uso: python benchmarks/bench_rerun.py --alunos 10000 --repeticoes 20
+# Mede a primeira execução do app (serviços frios) e a latência de cada rerun por
+# página, num banco temporário semeado com dados sintéticos.
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+PAGINAS = {
+    "Página Inicial": "paginas/inicio.py",
+    "Cadastro de Escola": "paginas/escola.py",
+    "Cadastro de Alunos": "paginas/alunos.py",
+    "Gestão de Turmas": "paginas/turmas.py",
+    "Painel de Vagas": "paginas/ocupacao.py",
+    "Relatórios da Rede": "paginas/rede.py",
+    "Exportação Educacenso": "paginas/exportacao.py",
+    "Transporte Escolar": "paginas/transporte.py",
+}
+
+
+def semear(caminho, n_alunos, n_turmas):
+    from sgde.banco import Banco
+    from sgde.repositorio import Repositorio
+
+    repo = Repositorio(Banco(caminho))
+    sala = repo.inserir_dependencia({
+        'nome': 'Sala 01', 'numero': 1, 'climatizacao': False, 'metragem': 60.0, 'capacidade': 50,
+    })
+    for i in range(n_turmas):
+        repo.inserir_turma({
+            'codigo': f"025.201.{i + 1:03d}", 'ano_letivo': 2025, 'etapa_label': "201 - Fundamental Anos Iniciais",
+            'horario': "Manhã", 'dependencia_id': sala['id'], 'capacidade_max': 50, 'alunos_matriculados': 0,
+        })
+    repo.inserir_alunos([
+        {'nome_completo': f"Aluno Sintético {i}", 'dt_nascimento': date(2017, 1 + i % 12, 1 + i % 28), 'ra': "N/A"}
+        for i in range(n_alunos)
+    ])
+    repo.banco.fechar()
+
+
+def medir(n_alunos, n_turmas, repeticoes):
+    caminho = os.path.join(tempfile.mkdtemp(prefix='sgde_bench_'), 'bench.db')
+    os.environ['SGDE_DB'] = caminho
+    semear(caminho, n_alunos, n_turmas)
+
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(RAIZ, 'app.py'), default_timeout=300)
+    inicio = time.perf_counter()
+    at.run()
+    print(f"Primeira execução (serviços frios, {n_alunos} alunos): {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    print(f"{'Página':<22}{'mediana (ms)':>14}{'p95 (ms)':>12}")
+    for titulo, caminho_pagina in PAGINAS.items():
+        at.switch_page(caminho_pagina).run()
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            at.run()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        if at.exception:
+            raise RuntimeError(f"{titulo}: {at.exception}")
+        tempos.sort()
+        p95 = tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))]
+        print(f"{titulo:<22}{statistics.median(tempos):>14.1f}{p95:>12.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de rerun das páginas do SGDE")
+    parser.add_argument('--alunos', type=int, default=10000)
+    parser.add_argument('--turmas', type=int, default=40)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+    medir(args.alunos, args.turmas, args.repeticoes)
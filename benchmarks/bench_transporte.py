@@ -0,0 +1,77 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+# ==============================================================================
+# BENCHMARK DO PLANEJAMENTO DE ROTAS DO TRANSPORTE ESCOLAR
+# ==============================================================================
+# Uso: python benchmarks/bench_transporte.py --alunos 50000
+# Carrega o PlanejadorRotas com fichas sintéticas (endereços de bench_ficha) em
+# dois turnos e mede: carga do índice, planejamento completo de um ano, consulta
+# repetida (rotas em cache) e replanejamento após alterações pontuais de endereço
+# ou turno, que refazem só as zonas dos alunos alterados.
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from bench_ficha import ficha_sintetica  # noqa: E402
+
+ANO = 2025
+TURNOS = ["Manhã", "Tarde"]
+
+
+def carregar(planejador, n_alunos):
+    for i in range(n_alunos):
+        planejador.atualizar_aluno(i, ficha_sintetica(i), {ANO: TURNOS[i % 2]})
+
+
+def alterar(planejador, n_alunos, alteracoes, semente=0):
+    # Metade muda de endereço, metade de turno (transferência de turma)
+    sorteio = random.Random(semente)
+    for _ in range(alteracoes):
+        i = sorteio.randrange(n_alunos)
+        ficha = ficha_sintetica(i)
+        if sorteio.random() < 0.5:
+            ficha['end_cep'] = f"60{sorteio.randrange(1000):03d}-{sorteio.randrange(1000):03d}"
+            planejador.atualizar_aluno(i, ficha, {ANO: TURNOS[i % 2]})
+        else:
+            planejador.atualizar_aluno(i, ficha, {ANO: TURNOS[(i + 1) % 2]})
+
+
+def cronometrar(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def medir(n_alunos, alteracoes):
+    from sgde.transporte import PlanejadorRotas
+
+    planejador = PlanejadorRotas()
+    _, t_carga = cronometrar(carregar, planejador, n_alunos)
+    rotas, t_plano = cronometrar(planejador.rotas, ANO)
+    _, t_cache = cronometrar(planejador.rotas, ANO)
+    _, t_alteracoes = cronometrar(alterar, planejador, n_alunos, alteracoes)
+    _, t_replano = cronometrar(planejador.rotas, ANO)
+    return {
+        'rotas': len(rotas), 'carga_s': t_carga, 'plano_ms': t_plano * 1000, 'cache_ms': t_cache * 1000,
+        'alteracoes_ms': t_alteracoes * 1000, 'replano_ms': t_replano * 1000,
+    }
+
+
+def imprimir(n_alunos, alteracoes, resultado):
+    print(f"\n== {n_alunos} alunos em {len(TURNOS)} turnos ({resultado['rotas']} rotas) ==")
+    print(f"carga do índice:                 {resultado['carga_s']:.2f} s")
+    print(f"planejamento completo:           {resultado['plano_ms']:.1f} ms")
+    print(f"consulta sem alterações:         {resultado['cache_ms']:.3f} ms")
+    print(f"{alteracoes} alterações aplicadas:       {resultado['alteracoes_ms']:.1f} ms")
+    print(f"replanejamento após alterações:  {resultado['replano_ms']:.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark do planejamento de rotas do transporte escolar")
+    parser.add_argument('--alunos', type=int, default=50000)
+    parser.add_argument('--alteracoes', type=int, default=100)
+    args = parser.parse_args()
+    imprimir(args.alunos, args.alteracoes, medir(args.alunos, args.alteracoes))
@@ -0,0 +1 @@
+# Páginas do SGDE (uma por módulo da navegação) e componentes de interface compartilhados.
@@ -0,0 +1,202 @@
+import os
+import pandas as pd
+import streamlit as st
+from datetime import datetime
+
+from sgde.regras import validar_cpf, validar_ra
+from sgde.ficha import SEXOS, RACAS, UFS, NIVEIS_APOIO, TURNOS
+from sgde.sequencias import gerar_nra
+from sgde.tarefas import guardar_arquivo
+from paginas.comum import (
+    obter_banco, repositorio_sincronizado, acompanhar_alteracoes, obter_listagens, seletor_aluno, obter_fila,
+    escola_atual, painel_tarefas, ler_arquivo,
+)
+
+banco = obter_banco()
+repo = repositorio_sincronizado()
+listagens = obter_listagens()
+
+def view_cadastro_alunos():
+    st.title("Cadastro de Alunos")
+    
+    # --- 3.3.1 Ficha Cadastral Completa ---
+    tab_id, tab_docs, tab_familia, tab_saude, tab_funcs, tab_import = st.tabs([
+        "Identificação Pessoal", "Documentação Civil", "Dados Familiares/Contato", "Saúde e Acessibilidade", "Funcionalidades",
+        "Importação em Lote"
+    ])
+
+    with st.form("form_aluno_completo"):
+        with tab_id:
+            st.subheader("Identificação Pessoal")
+            nome_completo = st.text_input("Nome Completo *")
+            col1, col2 = st.columns(2)
+            nome_social = col1.text_input("Nome Social")
+            nome_afetivo = col2.text_input("Nome Afetivo")
+            col3, col4 = st.columns(2)
+            dt_nascimento = col3.date_input("Data de Nascimento *", min_value=datetime(1990, 1, 1))
+            sexo = col4.selectbox("Sexo *", SEXOS)
+            col5, col6 = st.columns(2)
+            raca = col5.selectbox("Raça/Cor", RACAS)
+            nacionalidade = col6.text_input("Nacionalidade", value="Brasileira")
+            municipio_nasc = st.text_input("Município de Nascimento")
+            turno_preferido = st.selectbox("Turno Preferido (Enturmação)", [""] + TURNOS)
+
+        with tab_docs:
+            st.subheader("Documentação Civil")
+            ra_aluno = st.text_input("RA (Registro do Aluno) - Formato padrão")
+            educacenso = st.text_input("Identificação Única (Educacenso)")
+            st.markdown("**RG**")
+            col_rg1, col_rg2, col_rg3, col_rg4 = st.columns([2, 1, 2, 1])
+            rg_num = col_rg1.text_input("Número RG")
+            rg_dig = col_rg2.text_input("Dígito RG")
+            rg_emissao = col_rg3.date_input("Data Emissão RG", value=None)
+            rg_uf = col_rg4.selectbox("UF RG", [""] + UFS)
+            
+            st.markdown("**Certidão de Nascimento**")
+            col_cert1, col_cert2, col_cert3 = st.columns(3)
+            cert_matricula = col_cert1.text_input("Matrícula/Termo")
+            cert_livro = col_cert2.text_input("Livro")
+            cert_folha = col_cert3.text_input("Folha")
+            col_cert4, col_cert5 = st.columns(2)
+            cert_comarca = col_cert4.text_input("Comarca")
+            cert_distrito = col_cert5.text_input("Distrito")
+            
+            st.markdown("**Outros**")
+            col_out1, col_out2, col_out3 = st.columns(3)
+            cpf = col_out1.text_input("CPF")
+            nis = col_out2.text_input("NIS")
+            sus = col_out3.text_input("Cartão SUS")
+
+        with tab_familia:
+            st.subheader("Dados Familiares e Contato")
+            col_f1, col_f2 = st.columns(2)
+            filiacao1 = col_f1.text_input("Filiação 1")
+            filiacao2 = col_f2.text_input("Filiação 2")
+            bolsa_familia = st.checkbox("Participação em Bolsa Família?")
+            st.markdown("**Endereço Residencial**")
+            end_logra = st.text_input("Logradouro")
+            col_end1, col_end2, col_end3 = st.columns([1,2,1])
+            end_num = col_end1.text_input("Número")
+            end_bairro = col_end2.text_input("Bairro")
+            end_cep = col_end3.text_input("CEP")
+            end_cidade = st.text_input("Cidade")
+            st.markdown("**Contato**")
+            col_cont1, col_cont2 = st.columns(2)
+            telefones = col_cont1.text_input("Telefones")
+            email_contato = col_cont2.text_input("E-mail")
+
+        with tab_saude:
+            st.subheader("Educação Especial")
+            deficiencia = st.checkbox("Estudante com Deficiência?")
+            tipo_deficiencia = st.text_input("Tipo de Deficiência") if deficiencia else ""
+            tgd_tea = st.text_input("TGD/TEA (Ex: Autista Infantil)") if deficiencia else ""
+            nivel_apoio = st.selectbox("Nível de Apoio", [""] + NIVEIS_APOIO) if deficiencia else ""
+            col_s1, col_s2, col_s3 = st.columns(3)
+            laudo = col_s1.checkbox("Possui Laudo Médico?") if deficiencia else False
+            apoio_prof = col_s2.checkbox("Necessita Profissional de Apoio?") if deficiencia else False
+            mobilidade = col_s3.checkbox("Mobilidade Reduzida?") if deficiencia else False
+
+        # Botão de submissão principal do formulário
+        submit_aluno = st.form_submit_button("Salvar Ficha do Aluno")
+        if submit_aluno:
+            if not nome_completo or not dt_nascimento:
+                st.error("Campos obrigatórios: Nome Completo e Data de Nascimento.")
+            elif cpf and not validar_cpf(cpf):
+                st.error("CPF inválido.")
+            elif not validar_ra(ra_aluno):
+                st.error("RA em formato inválido.")
+            else:
+                novo_aluno = {
+                    'nome_completo': nome_completo, 'nome_social': nome_social or None, 'dt_nascimento': dt_nascimento,
+                    'ra': ra_aluno if ra_aluno else "N/A", 'cpf': cpf or None, 'turno_preferido': turno_preferido or None,
+                    'nra_gerado': None, # Será preenchido na outra aba
+                    'nome_afetivo': nome_afetivo or None, 'sexo': sexo, 'raca_cor': raca,
+                    'nacionalidade': nacionalidade or None, 'municipio_nascimento': municipio_nasc or None,
+                    'educacenso': educacenso or None, 'rg_numero': rg_num or None, 'rg_digito': rg_dig or None,
+                    'rg_emissao': rg_emissao, 'rg_uf': rg_uf or None, 'cert_matricula': cert_matricula or None,
+                    'cert_livro': cert_livro or None, 'cert_folha': cert_folha or None,
+                    'cert_comarca': cert_comarca or None, 'cert_distrito': cert_distrito or None,
+                    'nis': nis or None, 'cartao_sus': sus or None,
+                    'filiacao1': filiacao1 or None, 'filiacao2': filiacao2 or None, 'bolsa_familia': bolsa_familia,
+                    'end_logradouro': end_logra or None, 'end_numero': end_num or None, 'end_bairro': end_bairro or None,
+                    'end_cep': end_cep or None, 'end_cidade': end_cidade or None,
+                    'telefones': telefones or None, 'email': email_contato or None,
+                    'deficiencia': deficiencia, 'tipo_deficiencia': tipo_deficiencia or None, 'tgd_tea': tgd_tea or None,
+                    'nivel_apoio': nivel_apoio or None, 'laudo_medico': laudo, 'profissional_apoio': apoio_prof,
+                    'mobilidade_reduzida': mobilidade,
+                }
+                repo.inserir_aluno(novo_aluno)
+                st.success(f"Aluno {nome_completo} cadastrado com sucesso!")
+
+    # --- 3.3.2 Funcionalidades do Aluno ---
+    with tab_funcs:
+        st.subheader("Ações do Aluno")
+        if not repo.alunos:
+            st.warning("Cadastre um aluno primeiro para acessar as funcionalidades.")
+        else:
+            # Selecionar aluno para ação
+            aluno_id = seletor_aluno("funcs_aluno", "Selecione o Aluno:")
+            
+            # Encontrar o objeto aluno pelo índice de ids
+            aluno_obj = repo.obter_aluno(aluno_id) if aluno_id is not None else None
+
+            if aluno_obj:
+                st.write(f"Aluno selecionado: **{aluno_obj['nome_completo']}**")
+                
+                col_btn, col_res = st.columns(2)
+                if col_btn.button("Gerar NRA (Número de Registro do Aluno)"):
+                    nra = gerar_nra(banco)
+                    repo.atualizar_aluno(aluno_id, {'nra_gerado': nra})
+                    col_res.success(f"NRA Gerado: {nra}")
+                
+                if aluno_obj.get('nra_gerado'):
+                    st.info(f"NRA Atual: {aluno_obj['nra_gerado']}")
+
+                with st.expander("Ficha Cadastral"):
+                    preenchidos = {campo: valor for campo, valor in aluno_obj.items() if valor not in (None, '')}
+                    st.dataframe(
+                        pd.DataFrame({'campo': list(preenchidos), 'valor': [str(v) for v in preenchidos.values()]}),
+                        hide_index=True,
+                    )
+
+                st.subheader("Histórico de Matrículas")
+                # Matrículas deste aluno, lidas do índice por aluno do repositório (sem varrer todas)
+                df_hist = listagens.historico_do_aluno(aluno_id)
+                if not df_hist.empty:
+                    st.dataframe(df_hist[['turma_codigo', 'ano_letivo', 'status_rendimento']], hide_index=True)
+                else:
+                    st.write("Nenhuma matrícula encontrada.")
+
+    # --- Importação em Lote (planilhas Educacenso/secretaria) ---
+    with tab_import:
+        st.subheader("Importação de Fichas (CSV ou Excel)")
+        st.caption(
+            "Colunas reconhecidas: Nome Completo, Nome Social, Data de Nascimento, RA, NRA, CPF, Turno, "
+            "Etapa e Ano Letivo (opcionais, para validação etária), além de Sexo, Raça/Cor, Nacionalidade, "
+            "Naturalidade, Educacenso, NIS, Cartão SUS, Filiação 1/2, Endereço, Número, Bairro, CEP, Cidade, "
+            "Telefone e E-mail. Cada linha passa pelas mesmas validações do formulário."
+        )
+        arquivo = st.file_uploader("Planilha de Alunos", type=["csv", "xlsx"], key="arquivo_importacao")
+        gerar_nras = st.checkbox("Gerar NRA para os alunos importados")
+        if arquivo and st.button("Importar Alunos"):
+            # A planilha vai para o disco e a importação roda fora desta sessão
+            obter_fila().enfileirar(
+                'importacao_alunos', escola_atual(), arquivo=guardar_arquivo(arquivo, arquivo.name),
+                nome_arquivo=arquivo.name, gerar_nras=gerar_nras,
+            )
+        painel_tarefas('importacao_alunos', ao_concluir=resumo_importacao)
+
+
+def resumo_importacao(tarefa):
+    resumo = tarefa['resultado']
+    st.success(f"{resumo['importadas']} de {resumo['lidas']} linhas importadas.")
+    if resumo['relatorio_erros']:
+        st.warning(f"{resumo['rejeitadas']} linhas rejeitadas.")
+        if os.path.exists(resumo['relatorio_erros']):
+            st.download_button(
+                "Baixar Relatório de Erros", data=lambda c=resumo['relatorio_erros']: ler_arquivo(c),
+                file_name="erros_importacao.csv", mime="text/csv", key=f"erros_importacao_{tarefa['id']}",
+            )
+
+view_cadastro_alunos()
+acompanhar_alteracoes(['alunos', 'matriculas'])
@@ -0,0 +1,204 @@
+from datetime import datetime
+
+import streamlit as st
+
+from sgde.anexos import ArmazemAnexos, CAMINHO_ANEXOS
+from sgde.banco import Banco, CAMINHO_BANCO, ESCOLA_PADRAO
+from sgde.repositorio import Repositorio
+from sgde.listagens import CacheListagens
+from sgde.metricas import medir, registrar_volume
+from sgde.tarefas import FilaTarefas, ESTADOS_ATIVOS, ROTULOS_ESTADO, CONCLUIDA, FALHOU
+
+# ==============================================================================
+# SERVIÇOS COMPARTILHADOS (IMPORTADOS UMA VEZ, CACHEADOS COMO RECURSOS)
+# ==============================================================================
+# As páginas importam este módulo; o Python o carrega uma única vez por processo e
+# o st.cache_resource garante um só Banco/Repositorio/Cache para todas as sessões.
+@st.cache_resource
+def obter_banco():
+    return Banco(CAMINHO_BANCO)
+
+def escola_atual():
+    # Escola em que a sessão está trabalhando (escolhida na sidebar)
+    return st.session_state.get('escola_id', ESCOLA_PADRAO)
+
+# Índices em memória (id -> registro, codigo -> turma, aluno -> matrículas) de uma
+# escola; cada escola é uma partição própria, carregada na primeira vez que é aberta
+@st.cache_resource
+def _repositorio_da_escola(escola_id):
+    return Repositorio(obter_banco(), escola_id)
+
+def obter_repositorio():
+    return _repositorio_da_escola(escola_atual())
+
+# Arquivos anexados (fotos/plantas) em disco, endereçados pelo hash do conteúdo
+@st.cache_resource
+def obter_anexos():
+    return ArmazemAnexos(CAMINHO_ANEXOS)
+
+# DataFrames das listagens, reconstruídos só quando a versão da tabela muda
+@st.cache_resource
+def _listagens_da_escola(escola_id):
+    return CacheListagens(_repositorio_da_escola(escola_id))
+
+def obter_listagens():
+    return _listagens_da_escola(escola_atual())
+
+# Pool de tarefas em segundo plano do processo; as tarefas escrevem pelo mesmo
+# Repositorio da escola usado pelas sessões
+@st.cache_resource
+def obter_fila():
+    return FilaTarefas(obter_banco(), _repositorio_da_escola)
+
+def repositorio_sincronizado():
+    # Repositório compartilhado com as alterações de outros processos já aplicadas
+    # (uma consulta ao log de eventos pela chave primária quando não há novidades)
+    repo = obter_repositorio()
+    repo.sincronizar()
+    return repo
+
+def formatar_escola(escola):
+    nome = escola.get('nome_escola') or f"Escola {escola['id']}"
+    return f"{nome} ({escola['regional']})" if escola.get('regional') else nome
+
+def seletor_escola():
+    # Na sidebar, antes de a página rodar: troca a partição usada por todas as páginas
+    escolas = {e['id']: e for e in obter_banco().listar_escolas()}
+    if st.session_state.get('escola_id') not in escolas:
+        st.session_state['escola_id'] = next(iter(escolas))
+    st.sidebar.selectbox("Escola", list(escolas), format_func=lambda e_id: formatar_escola(escolas[e_id]), key='escola_id')
+
+# ==============================================================================
+# AVISO DE ALTERAÇÕES FEITAS POR OUTRAS SESSÕES
+# ==============================================================================
+# Intervalo (segundos) em que cada página aberta confere se seus dados mudaram
+INTERVALO_ALTERACOES = 5
+
+def acompanhar_alteracoes(tabelas):
+    # Chamado no fim de cada página: guarda as versões que esta sessão acabou de
+    # exibir e deixa um fragmento conferindo periodicamente se elas mudaram.
+    repo = obter_repositorio()
+    st.session_state['versoes_exibidas'] = {t: repo.versoes[t] for t in tabelas}
+    _aviso_alteracoes(tuple(tabelas))
+
+@st.fragment(run_every=INTERVALO_ALTERACOES)
+def _aviso_alteracoes(tabelas):
+    # Só este fragmento roda a cada intervalo; a página inteira é refeita apenas
+    # quando o usuário pede, sem perder o que está sendo digitado nos formulários.
+    repo = repositorio_sincronizado()
+    exibidas = st.session_state.get('versoes_exibidas', {})
+    if any(repo.versoes[t] != exibidas.get(t) for t in tabelas):
+        st.info("Outra sessão alterou os dados desta página.")
+        if st.button("Atualizar dados", key="atualizar_alteracoes"):
+            st.rerun()
+
+
+# ==============================================================================
+# COMPONENTES REUTILIZÁVEIS
+# ==============================================================================
+def ler_arquivo(caminho):
+    # Para download_button(data=...): o arquivo só é lido quando o download é pedido
+    with open(caminho, 'rb') as f:
+        return f.read()
+
+def seletor_aluno(chave, rotulo_resultado="Selecione o Aluno", por_pagina=10):
+    # Busca indexada no servidor: só a página de resultados vai para o navegador,
+    # em vez de um selectbox com todos os alunos cadastrados.
+    consulta = st.text_input("Buscar Aluno (Nome, Nome Social, RA, CPF ou NRA)", key=f"{chave}_consulta")
+    if not consulta.strip():
+        st.caption("Digite parte do nome ou de um documento do aluno para buscar.")
+        return None
+
+    repo = obter_repositorio()
+    # A página vem do estado do widget (gravado antes do rerun): uma busca só traz
+    # a página e o total de resultados
+    chave_pagina = f"{chave}_pagina"
+    pagina = max(int(st.session_state.get(chave_pagina) or 1), 1)
+    ids, total = repo.buscar_alunos(consulta, limite=por_pagina, pagina=pagina - 1)
+    if total == 0:
+        st.info("Nenhum aluno encontrado.")
+        return None
+
+    paginas = (total + por_pagina - 1) // por_pagina
+    if pagina > paginas:
+        # A consulta mudou e a página guardada não existe mais: vai para a última
+        pagina = paginas
+        st.session_state[chave_pagina] = pagina
+        ids, _ = repo.buscar_alunos(consulta, limite=por_pagina, pagina=pagina - 1)
+    if paginas > 1:
+        st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1, key=chave_pagina)
+    st.caption(f"{total} aluno(s) encontrado(s).")
+
+    def formatar_aluno(a_id):
+        if a_id is None:
+            return "Selecione..."
+        a = repo.alunos[a_id]
+        return f"{a['id']} - {a['nome_completo']} (DN: {a['dt_nascimento']})"
+
+    return st.selectbox(rotulo_resultado, [None] + ids, format_func=formatar_aluno, key=f"{chave}_resultado")
+
+def tabela_paginada(tabela, colunas, chave, por_pagina=25, ocultas=(), preparar=None, column_config=None):
+    # Filtro, ordenação e paginação no servidor: só a página visível é serializada
+    # para o navegador, e o DataFrame base vem do cache versionado das listagens.
+    # preparar(página) pode acrescentar colunas calculadas só para as linhas visíveis,
+    # usando também as colunas ocultas, que não são exibidas nem enviadas.
+    col_filtro, col_ordem, col_sentido = st.columns([3, 2, 1])
+    filtro = col_filtro.text_input("Filtrar", key=f"{chave}_filtro")
+    ordenar_por = col_ordem.selectbox("Ordenar por", colunas, key=f"{chave}_ordem")
+    crescente = col_sentido.checkbox("Crescente", value=True, key=f"{chave}_crescente")
+
+    df = obter_listagens().consultar(tabela, list(colunas) + list(ocultas), filtro, ordenar_por, crescente)
+    total = len(df)
+    paginas = max((total + por_pagina - 1) // por_pagina, 1)
+    pagina = 1
+    if paginas > 1:
+        pagina = st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1, key=f"{chave}_pagina")
+    visivel = df.iloc[(pagina - 1) * por_pagina:pagina * por_pagina]
+    if preparar:
+        visivel = preparar(visivel)
+    visivel = visivel.drop(columns=list(ocultas))
+    # Linhas e bytes (tamanho em memória da página, aproximação do payload Arrow) enviados ao navegador
+    with medir(f"tabela: {tabela}", 'serializacao'):
+        st.dataframe(visivel, hide_index=True, column_config=column_config)
+    registrar_volume(f"tabela: {tabela}", len(visivel), int(visivel.memory_usage(index=False, deep=True).sum()))
+    st.caption(f"{total} registro(s).")
+
+# ==============================================================================
+# ACOMPANHAMENTO DE TAREFAS EM SEGUNDO PLANO
+# ==============================================================================
+# Intervalo (segundos) em que o painel relê o estado das tarefas no banco
+INTERVALO_TAREFAS = 1
+
+@st.fragment(run_every=INTERVALO_TAREFAS)
+def painel_tarefas(tipo, ao_concluir=None, limite=5):
+    # Últimas tarefas do tipo na escola, de qualquer sessão ou processo. Só este
+    # fragmento é refeito a cada intervalo; ao_concluir(tarefa) mostra o resultado.
+    fila = obter_fila()
+    tarefas = fila.listar(escola_atual(), tipo, limite)
+    if not tarefas:
+        return
+    st.subheader("Tarefas em Segundo Plano")
+    for tarefa in tarefas:
+        with st.container(border=True):
+            criada = datetime.fromtimestamp(tarefa['criada_em']).strftime('%d/%m/%Y %H:%M')
+            st.caption(f"#{tarefa['id']} · {tarefa['rotulo']} · {criada} · {ROTULOS_ESTADO[tarefa['estado']]}")
+            if tarefa['estado'] in ESTADOS_ATIVOS:
+                st.progress(tarefa['progresso'] or 0.0, text=tarefa['mensagem'] or ROTULOS_ESTADO[tarefa['estado']])
+                if tarefa['cancelamento']:
+                    st.caption("Cancelamento solicitado...")
+                elif st.button("Cancelar", key=f"cancelar_tarefa_{tarefa['id']}"):
+                    fila.cancelar(tarefa['id'])
+            elif tarefa['estado'] == CONCLUIDA:
+                if ao_concluir:
+                    ao_concluir(tarefa)
+                else:
+                    st.success("Tarefa concluída.")
+            else:
+                # Falhou, cancelada ou interrompida: retoma do último ponto gravado
+                if tarefa['estado'] == FALHOU:
+                    st.error(f"Falha: {tarefa['erro']}")
+                else:
+                    motivo = tarefa['mensagem'] or ROTULOS_ESTADO[tarefa['estado']]
+                    st.warning(f"{motivo} ({(tarefa['progresso'] or 0):.0%} concluído)")
+                if st.button("Retomar", key=f"retomar_tarefa_{tarefa['id']}"):
+                    fila.retomar(tarefa['id'])
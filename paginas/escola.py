@@ -0,0 +1,139 @@
+import base64
+
+import streamlit as st
+
+from sgde.anexos import TIPOS_IMAGEM, extensao, imagem_valida
+from sgde.banco import REGIONAIS
+from sgde.regras import validar_cnpj, calcular_capacidade_sala
+from paginas.comum import (
+    obter_banco, obter_anexos, repositorio_sincronizado, acompanhar_alteracoes, tabela_paginada, escola_atual,
+)
+
+banco = obter_banco()
+repo = repositorio_sincronizado()
+anexos = obter_anexos()
+
+# Miniatura como data URI para a coluna de imagem da listagem. O conteúdo de um hash
+# nunca muda, então o cache é compartilhado entre sessões e nunca fica desatualizado.
+@st.cache_data(max_entries=1000)
+def miniatura_anexo(anexo_hash, anexo_tipo):
+    png = anexos.miniatura(anexo_hash, anexo_tipo)
+    return f"data:image/png;base64,{base64.b64encode(png).decode('ascii')}" if png else None
+
+def com_miniaturas(pagina):
+    pagina = pagina.copy()
+    pagina.insert(0, 'anexo', [
+        miniatura_anexo(h, t) if isinstance(h, str) else None
+        for h, t in zip(pagina['anexo_hash'], pagina['anexo_tipo'])
+    ])
+    return pagina
+
+def view_cadastro_escola():
+    st.title("Cadastro de Escola")
+    
+    tab1, tab2 = st.tabs(["Institucional", "Dependências Físicas"])
+    
+    # --- 3.2.1 Subsistema Institucional ---
+    with tab1:
+        st.header("Dados da Instituição")
+        escola_info = banco.obter_escola_info(escola_atual())
+        with st.form("form_escola_inst"):
+            gestor = st.text_input("Gestor Responsável", value=escola_info.get('gestor',''))
+            nome_escola = st.text_input("Nome da Escola", value=escola_info.get('nome_escola',''))
+            razao_social = st.text_input("Razão Social", value=escola_info.get('razao_social',''))
+            cnpj = st.text_input("CNPJ (apenas números)", value=escola_info.get('cnpj',''), max_chars=14)
+            endereco = st.text_area("Endereço Completo", value=escola_info.get('endereco',''))
+            regional = st.selectbox(
+                "Unidade Regional", REGIONAIS,
+                index=REGIONAIS.index(escola_info['regional']) if escola_info.get('regional') in REGIONAIS else 0,
+            )
+            inep = st.number_input("Cód. INEP", min_value=0, step=1, value=escola_info.get('inep') or 0)
+            
+            if st.form_submit_button("Salvar Dados Institucionais"):
+                if not validar_cnpj(cnpj):
+                    st.error("CNPJ Inválido.")
+                else:
+                    repo.salvar_escola_info({
+                        'gestor': gestor, 'nome_escola': nome_escola, 'razao_social': razao_social,
+                        'cnpj': cnpj, 'endereco': endereco, 'regional': regional, 'inep': inep
+                    })
+                    st.success("Dados institucionais salvos com sucesso!")
+
+        # Cada escola da rede tem seus próprios alunos, turmas, dependências e matrículas
+        with st.expander("Cadastrar Nova Escola na Rede"):
+            with st.form("form_nova_escola", clear_on_submit=True):
+                nova_nome = st.text_input("Nome da Escola")
+                nova_regional = st.selectbox("Unidade Regional", REGIONAIS, key="nova_escola_regional")
+                if st.form_submit_button("Cadastrar Escola"):
+                    if not nova_nome.strip():
+                        st.warning("Informe o nome da escola.")
+                    else:
+                        repo.cadastrar_escola({'nome_escola': nova_nome.strip(), 'regional': nova_regional})
+                        st.success(f"Escola '{nova_nome}' cadastrada. Selecione-a na barra lateral para gerenciá-la.")
+
+    # --- 3.2.2 Subsistema de Dependências Físicas ---
+    with tab2:
+        st.header("Cadastrar Sala/Ambiente")
+        # clear_on_submit: o arquivo enviado é liberado da sessão logo após ser gravado em disco
+        with st.form("form_dependencia", clear_on_submit=True):
+            col1, col2 = st.columns(2)
+            with col1:
+                dep_nome = st.text_input("Nome da Dependência (Ex: Sala 01)")
+                dep_num = st.number_input("Número", min_value=0, max_value=999, step=1)
+                dep_clima = st.checkbox("Climatização?")
+            with col2:
+                dep_metragem = st.number_input("Metragem (m²)", min_value=0.0, format="%.2f", step=0.5)
+                # Regra: Capacidade calculada automaticamente
+                capacidade_calc = calcular_capacidade_sala(dep_metragem)
+                dep_capacidade = st.number_input(f"Capacidade Física Total (Sugerido: {capacidade_calc})", min_value=0, max_value=999, value=capacidade_calc)
+                dep_anexo = st.file_uploader("Anexos (Foto ou Planta)", type=["png", "jpg", "jpeg", "pdf"])
+
+            if st.form_submit_button("Adicionar Dependência"):
+                if dep_anexo and extensao(dep_anexo.name) in TIPOS_IMAGEM and not imagem_valida(dep_anexo):
+                    st.error("O anexo não é uma imagem válida (arquivo corrompido ou de outro tipo).")
+                elif dep_nome and dep_metragem > 0:
+                    nova_dep = {
+                        'nome': dep_nome, 'numero': dep_num, 'climatizacao': dep_clima,
+                        'metragem': dep_metragem, 'capacidade': dep_capacidade,
+                        'anexo_nome': None, 'anexo_hash': None, 'anexo_tipo': None, 'anexo_tamanho': None,
+                    }
+                    if dep_anexo:
+                        # Copiado em blocos para o armazém; arquivo repetido não ocupa espaço de novo
+                        anexo_hash, tamanho = anexos.guardar(dep_anexo)
+                        nova_dep.update({
+                            'anexo_nome': dep_anexo.name, 'anexo_hash': anexo_hash,
+                            'anexo_tipo': extensao(dep_anexo.name), 'anexo_tamanho': tamanho,
+                        })
+                    repo.inserir_dependencia(nova_dep)
+                    st.success(f"Dependência '{dep_nome}' adicionada!")
+                else:
+                    st.warning("Preencha o nome e a metragem corretamente.")
+        
+        # Exibir dependências cadastradas
+        if repo.dependencias:
+            st.subheader("Dependências Cadastradas")
+            tabela_paginada(
+                'dependencias', ['nome', 'numero', 'metragem', 'capacidade', 'climatizacao', 'anexo_nome'],
+                "lista_dependencias", ocultas=['anexo_hash', 'anexo_tipo'], preparar=com_miniaturas,
+                column_config={
+                    'anexo': st.column_config.ImageColumn("Anexo"),
+                    'anexo_nome': st.column_config.TextColumn("Arquivo"),
+                },
+            )
+
+            # Download sob demanda: o arquivo só é lido do disco quando o botão é clicado
+            com_anexo = [d for d in list(repo.dependencias.values()) if d.get('anexo_hash')]
+            if com_anexo:
+                dep_id = st.selectbox(
+                    "Baixar anexo da dependência", [d['id'] for d in com_anexo],
+                    format_func=lambda i: f"{repo.dependencias[i]['nome']} - {repo.dependencias[i]['anexo_nome']}",
+                )
+                dep = repo.obter_dependencia(dep_id)
+                st.download_button(
+                    f"Baixar {dep['anexo_nome']} ({dep['anexo_tamanho'] / 1024:.0f} KB)",
+                    data=lambda h=dep['anexo_hash']: anexos.ler(h), file_name=dep['anexo_nome'],
+                )
+
+
+view_cadastro_escola()
+acompanhar_alteracoes(['escola_info', 'dependencias'])
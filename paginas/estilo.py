@@ -0,0 +1,60 @@
+# ==============================================================================
+# CONFIGURAÇÃO E DESIGN (CSS)
+# ==============================================================================
+# Montado uma vez na importação do módulo; o app.py só reinjeta a string pronta a cada rerun.
+# Cores definidas no requisito
+COLOR_SIDEBAR_BG = "#ADD8E6" # Azul claro
+COLOR_SIDEBAR_TEXT = "#FFFFFF" # Branco
+COLOR_MAIN_TEXT = "#000000" # Preto
+COLOR_BORDER_BOX = "#ADD8E6" # Azul claro
+
+# CSS Personalizado para injetar no Streamlit (CORRIGIDO)
+CUSTOM_CSS = f"""
+<style>
+    /* Sidebar Background e Texto */
+    section[data-testid="stSidebar"] {{
+        background-color: {COLOR_SIDEBAR_BG};
+    }}
+    
+    /* Ajuste para classes dinâmicas do Streamlit na Sidebar */
+    section[data-testid="stSidebar"] .css-1d391kg, 
+    section[data-testid="stSidebar"] h1,
+    section[data-testid="stSidebar"] h2,
+    section[data-testid="stSidebar"] h3,
+    section[data-testid="stSidebar"] label,
+    section[data-testid="stSidebar"] .stRadio > div[role="radiogroup"] > label > div:first-child {{
+        color: {COLOR_SIDEBAR_TEXT} !important;
+    }}
+
+    /* Main Content Text */
+    .stApp, .stApp p, .stApp h1, .stApp h2, .stApp h3, .stApp label {{
+        color: {COLOR_MAIN_TEXT} !important;
+    }}
+
+    /* Caixas com borda Azul Claro (Inputs, Selects, etc.) */
+    .stTextInput > div > div[data-baseweb="input"],
+    .stSelectbox > div > div[data-baseweb="select"],
+    .stNumberInput > div > div[data-baseweb="input"],
+    .stTextArea > div > div[data-baseweb="textarea"],
+    .stDateInput > div > div[data-baseweb="input"] {{
+        border-color: {COLOR_BORDER_BOX} !important;
+    }}
+    
+    /* Ajuste fino para focar a borda também - CORRIGIDO AS CHAVES AQUI */
+    div[data-baseweb="input"]:focus-within, div[data-baseweb="select"]:focus-within {{
+        border-color: {COLOR_BORDER_BOX} !important;
+        box-shadow: 0 0 0 1px {COLOR_BORDER_BOX} !important;
+    }}
+
+    /* Centralizar a mensagem da Home */
+    .home-welcome {{
+        display: flex;
+        justify-content: center;
+        align-items: center;
+        height: 50vh;
+        font-size: 2.5rem;
+        font-weight: bold;
+        text-align: center;
+    }}
+</style>
+"""
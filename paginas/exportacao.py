@@ -0,0 +1,46 @@
+import os
+from datetime import datetime
+
+import streamlit as st
+
+from sgde.banco import REGIONAIS
+from sgde.exportacao import FORMATOS
+from paginas.comum import obter_banco, obter_fila, escola_atual, painel_tarefas, ler_arquivo
+
+banco = obter_banco()
+
+# ==============================================================================
+# EXPORTAÇÃO EDUCACENSO/INEP
+# ==============================================================================
+# A exportação é uma tarefa em segundo plano (sgde.tarefas): esta página só a
+# enfileira, acompanha o progresso e oferece o arquivo pronto para download.
+def view_exportacao():
+    st.title("Exportação Educacenso / INEP")
+    col_abrangencia, col_ano, col_formato = st.columns(3)
+    abrangencia = col_abrangencia.radio("Abrangência", ["Escola atual", "Regional", "Toda a rede"])
+    ano = col_ano.number_input("Ano Letivo", min_value=2024, max_value=2030, value=datetime.now().year, step=1)
+    formato = col_formato.selectbox("Formato", list(FORMATOS), format_func=FORMATOS.get)
+    regional = st.selectbox("Regional", REGIONAIS) if abrangencia == "Regional" else None
+
+    if st.button("Iniciar Exportação"):
+        if abrangencia == "Escola atual":
+            escola_ids = [escola_atual()]
+        else:
+            escola_ids = [e['id'] for e in banco.listar_escolas(regional)]
+        obter_fila().enfileirar(
+            'exportacao_educacenso', escola_atual(), formato=formato, escola_ids=escola_ids, ano_letivo=int(ano)
+        )
+    painel_tarefas('exportacao_educacenso', ao_concluir=arquivo_exportado)
+
+def arquivo_exportado(tarefa):
+    resultado = tarefa['resultado']
+    st.success(f"Exportação concluída: {resultado['registros']} matrícula(s).")
+    if os.path.exists(resultado['caminho']):
+        nome = os.path.basename(resultado['caminho'])
+        st.download_button(
+            f"Baixar {nome}", data=lambda c=resultado['caminho']: ler_arquivo(c), file_name=nome,
+            key=f"baixar_exportacao_{tarefa['id']}",
+        )
+
+
+view_exportacao()
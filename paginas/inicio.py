@@ -0,0 +1,7 @@
+import streamlit as st
+
+def view_home():
+    st.markdown('<div class="home-welcome">Seja bem-vindo ao sistema de gestão ágil</div>', unsafe_allow_html=True)
+
+
+view_home()
@@ -0,0 +1,55 @@
+import hmac
+import os
+
+import pandas as pd
+import streamlit as st
+
+from sgde import metricas
+
+# ==============================================================================
+# PAINEL DE MÉTRICAS (ADMINISTRAÇÃO)
+# ==============================================================================
+# Tempos p50/p95 por view, construção de DataFrames, validações e chamadas ao banco,
+# com as linhas/bytes enviados ao navegador. Os números são do processo inteiro
+# (todas as sessões), na janela das últimas metricas.AMOSTRAS_POR_MEDICAO chamadas.
+def view_metricas():
+    st.header("Métricas de Desempenho")
+
+    if not st.session_state.get('admin_metricas'):
+        senha = st.text_input("Senha de administração", type="password", key="senha_metricas")
+        if st.button("Entrar"):
+            if hmac.compare_digest(senha, os.environ.get("SGDE_SENHA_ADMIN", "")):
+                st.session_state['admin_metricas'] = True
+                st.rerun()
+            st.error("Senha incorreta.")
+        return
+
+    linhas = metricas.resumo()
+    if not linhas:
+        st.info("Nenhuma medição registrada ainda.")
+        return
+
+    df = pd.DataFrame(linhas)
+    categorias = sorted(df['categoria'].unique())
+    escolhidas = st.multiselect("Categorias", categorias, default=categorias)
+    df = df[df['categoria'].isin(escolhidas)].sort_values('p95_ms', ascending=False)
+
+    views = df[df['categoria'] == 'view']
+    if not views.empty:
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Pior p95 de view (ms)", f"{views['p95_ms'].max():.1f}")
+        c2.metric("Linhas enviadas", int(df['linhas_enviadas'].sum()))
+        c3.metric("Bytes enviados (aprox.)", int(df['bytes_enviados'].sum()))
+
+    st.dataframe(df, hide_index=True)
+
+    col_exportar, col_zerar = st.columns(2)
+    if col_exportar.button("Exportar para o log"):
+        n = metricas.exportar()
+        st.success(f"{n} medição(ões) gravada(s) em {metricas.CAMINHO_LOG_METRICAS}.")
+    if col_zerar.button("Zerar métricas"):
+        metricas.zerar()
+        st.rerun()
+
+
+view_metricas()
@@ -0,0 +1,65 @@
+import pandas as pd
+import streamlit as st
+
+from paginas.comum import INTERVALO_ALTERACOES, repositorio_sincronizado
+
+# ==============================================================================
+# PAINEL DE VAGAS (OCUPAÇÃO POR TURMA, ETAPA, HORÁRIO E REGIONAL)
+# ==============================================================================
+# Lê só os agregados mantidos pelo Repositorio (repo.ocupacao): nenhuma varredura
+# de matrículas, então o painel pode ficar aberto e se atualizando no pico de matrícula.
+ROTULOS = {
+    'turmas': "Turmas", 'capacidade': "Capacidade", 'ocupadas': "Matriculados", 'vagas': "Vagas",
+    'ocupacao': "Ocupação", 'capacidade_sala': "Capacidade das Salas", 'utilizacao_sala': "Uso das Salas",
+}
+
+def tabela_grupos(grupos, titulo_chave):
+    if not grupos:
+        st.caption("Sem turmas.")
+        return
+    df = pd.DataFrame.from_dict(grupos, orient='index').rename_axis(titulo_chave).reset_index()
+    df = df[[titulo_chave] + list(ROTULOS)].rename(columns=ROTULOS)
+    st.dataframe(df, hide_index=True, column_config={
+        "Ocupação": st.column_config.ProgressColumn("Ocupação", format="percent", min_value=0, max_value=1),
+        "Uso das Salas": st.column_config.NumberColumn("Uso das Salas", format="percent"),
+    })
+
+def view_painel_vagas():
+    st.title("Painel de Vagas")
+    repo = repositorio_sincronizado()
+    anos = repo.ocupacao.anos()
+    if not anos:
+        st.info("Nenhuma turma cadastrada.")
+        return
+    ano = st.selectbox("Ano Letivo", anos, index=len(anos) - 1)
+    painel_ano(ano)
+
+@st.fragment(run_every=INTERVALO_ALTERACOES)
+def painel_ano(ano):
+    # Refeito a cada intervalo com as matrículas de todas as sessões e processos
+    repo = repositorio_sincronizado()
+    total = repo.ocupacao.total(ano)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Vagas Livres", total['vagas'])
+    c2.metric("Matriculados", total['ocupadas'])
+    c3.metric("Ocupação", f"{total['ocupacao']:.0%}")
+    c4.metric("Uso das Salas", f"{total['utilizacao_sala']:.0%}" if total['utilizacao_sala'] is not None else "-")
+
+    col_etapa, col_horario = st.columns(2)
+    with col_etapa:
+        st.subheader("Por Etapa")
+        tabela_grupos(repo.ocupacao.grupos('etapa', ano), "Etapa")
+    with col_horario:
+        st.subheader("Por Horário")
+        tabela_grupos(repo.ocupacao.grupos('horario', ano), "Horário")
+    st.subheader("Por Regional")
+    tabela_grupos(repo.ocupacao.grupos('regional', ano), "Regional")
+
+    with st.expander("Por Turma"):
+        tabela_grupos({
+            t['codigo']: repo.ocupacao.turma(t['id'])
+            for t in list(repo.turmas.values()) if t['ano_letivo'] == ano
+        }, "Turma")
+
+
+view_painel_vagas()
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from sgde.banco import REGIONAIS
+from sgde.relatorios import relatorio_rede
+from paginas.comum import obter_banco
+
+banco = obter_banco()
+
+# ==============================================================================
+# RELATÓRIOS DA REDE (TODAS AS ESCOLAS, POR REGIONAL)
+# ==============================================================================
+# O resultado fica em cache pela posição do log de eventos: enquanto nenhuma escola
+# grava nada, reabrir a página não refaz as consultas.
+@st.cache_data(max_entries=16)
+def gerar_relatorio(ano_letivo, regional, ultimo_evento):
+    return relatorio_rede(banco, ano_letivo, regional)
+
+def view_relatorios_rede():
+    st.title("Relatórios da Rede")
+    col_ano, col_regional = st.columns(2)
+    ano = col_ano.number_input("Ano Letivo", min_value=2024, max_value=2030, value=datetime.now().year, step=1)
+    regional = col_regional.selectbox("Regional", ["Todas"] + REGIONAIS)
+
+    por_escola, por_regional, total = gerar_relatorio(
+        int(ano), None if regional == "Todas" else regional, banco.ultimo_evento()
+    )
+    if not por_escola:
+        st.info("Nenhuma escola cadastrada nesta regional.")
+        return
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Escolas", total['escolas'])
+    c2.metric("Alunos", total['alunos'])
+    c3.metric("Vagas Livres", total['vagas'])
+    c4.metric("Ocupação", f"{total['ocupacao']:.0%}")
+
+    st.subheader("Por Regional")
+    st.dataframe(pd.DataFrame.from_dict(por_regional, orient='index').rename_axis('regional').reset_index(), hide_index=True)
+
+    st.subheader("Por Escola")
+    st.dataframe(pd.DataFrame(por_escola).drop(columns=['escola_id']), hide_index=True)
+
+
+view_relatorios_rede()
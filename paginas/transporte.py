@@ -0,0 +1,82 @@
+import pandas as pd
+import streamlit as st
+
+from sgde.transporte import CAPACIDADE_VEICULO, DIGITOS_ZONA
+from paginas.comum import acompanhar_alteracoes, repositorio_sincronizado
+
+# ==============================================================================
+# TRANSPORTE ESCOLAR (ROTAS POR ZONA DE CEP, CAPACIDADE E TURNO)
+# ==============================================================================
+# As rotas vêm do planejador mantido pelo Repositorio (repo.planejador_transporte):
+# a página só consulta; matrículas, transferências e mudanças de endereço replanejam
+# apenas as zonas afetadas.
+COLUNAS_PARADAS = {
+    'nome_completo': "Aluno", 'end_logradouro': "Logradouro", 'end_numero': "Número",
+    'end_bairro': "Bairro", 'end_cep': "CEP", 'mobilidade_reduzida': "Mobilidade Reduzida",
+}
+
+def tabela_alunos(repo, aluno_ids):
+    df = pd.DataFrame([
+        {campo: repo.alunos[i].get(campo) for campo in COLUNAS_PARADAS}
+        for i in aluno_ids if i in repo.alunos
+    ], columns=list(COLUNAS_PARADAS))
+    st.dataframe(df.rename(columns=COLUNAS_PARADAS), hide_index=True)
+
+def view_transporte():
+    st.title("Transporte Escolar")
+    repo = repositorio_sincronizado()
+    planejador = repo.planejador_transporte()
+    anos = planejador.anos()
+    if not anos:
+        st.info("Nenhum aluno cursando com matrícula ativa.")
+        return
+
+    col_ano, col_cap, col_turno = st.columns(3)
+    ano = col_ano.selectbox("Ano Letivo", anos, index=len(anos) - 1)
+    capacidade = col_cap.number_input("Capacidade do Veículo", min_value=1, value=CAPACIDADE_VEICULO)
+    rotas = planejador.rotas(ano, capacidade)
+    turnos = sorted({rota['horario'] for rota in rotas})
+    turno = col_turno.selectbox("Turno", ["Todos"] + turnos)
+    if turno != "Todos":
+        rotas = [rota for rota in rotas if rota['horario'] == turno]
+    sem_endereco = planejador.alunos_sem_endereco(ano)
+
+    atendidos = sum(rota['lotacao'] for rota in rotas)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Alunos Atendidos", atendidos)
+    c2.metric("Rotas", len(rotas))
+    c3.metric("Ocupação Média", f"{atendidos / (len(rotas) * capacidade):.0%}" if rotas else "-")
+    c4.metric("Sem Endereço", len(sem_endereco))
+
+    if rotas:
+        st.subheader("Rotas")
+        st.dataframe(pd.DataFrame([{
+            'Rota': rota['codigo'], 'Turno': rota['horario'], 'Zonas': ", ".join(rota['zonas']),
+            'Alunos': rota['lotacao'], 'Ocupação': rota['lotacao'] / rota['capacidade'],
+            'Acessível': rota['acessivel'],
+        } for rota in rotas]), hide_index=True, column_config={
+            "Ocupação": st.column_config.ProgressColumn("Ocupação", format="percent", min_value=0, max_value=1),
+            "Acessível": st.column_config.CheckboxColumn("Veículo Acessível"),
+        })
+
+        por_codigo = {rota['codigo']: rota for rota in rotas}
+        codigo = st.selectbox("Paradas da Rota", list(por_codigo))
+        rota = por_codigo[codigo]
+        st.caption(f"{rota['lotacao']} alunos, {rota['horario']}, em ordem de CEP.")
+        tabela_alunos(repo, rota['alunos'])
+
+    st.subheader("Consulta por CEP")
+    prefixo = st.text_input("Início do CEP", max_chars=9, help=f"Os {DIGITOS_ZONA} primeiros dígitos formam a zona da rota.")
+    if prefixo:
+        encontrados = planejador.alunos_por_prefixo(ano, prefixo)
+        st.caption(f"{len(encontrados)} alunos com CEP iniciado por {prefixo}.")
+        tabela_alunos(repo, encontrados)
+
+    if sem_endereco:
+        with st.expander(f"Alunos sem Endereço ({len(sem_endereco)})"):
+            st.caption("Sem CEP nem bairro na ficha: ficam fora das rotas até o endereço ser preenchido.")
+            tabela_alunos(repo, sem_endereco)
+
+
+view_transporte()
+acompanhar_alteracoes(['alunos', 'matriculas', 'turmas'])
@@ -0,0 +1,238 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+from sgde.regras import validar_idade_etapa
+from sgde.sequencias import gerar_codigo_turma_unico
+from sgde.enturmacao import alunos_sem_turma, calcular_alocacao, confirmar_alocacao
+from paginas.comum import obter_banco, repositorio_sincronizado, acompanhar_alteracoes, seletor_aluno, tabela_paginada
+
+banco = obter_banco()
+repo = repositorio_sincronizado()
+
+def view_gestao_turmas():
+    st.title("Gestão de Turmas e Matrículas")
+    
+    tab_turma, tab_matricula, tab_lote, tab_movimentacao = st.tabs([
+        "Cadastro de Turma", "Matrícula (Enturmação)", "Enturmação em Lote", "Transferência e Cancelamento"
+    ])
+
+    # --- 3.4.1 Cadastro de Turma ---
+    with tab_turma:
+        st.header("Nova Turma")
+        
+        # Verificar se existem dependências físicas cadastradas
+        opcoes_dependencias = [None] + list(repo.dependencias)
+
+        def formatar_dependencia(dep_id):
+            if dep_id is None:
+                return "Selecione..."
+            d = repo.dependencias[dep_id]
+            return f"{d['id']} - {d['nome']} (Cap: {d['capacidade']})"
+        
+        with st.form("form_turma"):
+            ano_letivo = st.number_input("Ano Letivo", min_value=2024, max_value=2030, value=2025, step=1)
+            
+            # Códigos fictícios do MEC para o exemplo
+            etapas_mec = {
+                "101 - Infantil Creche": 101,
+                "102 - Infantil Pré-escola": 102,
+                "201 - Fundamental Anos Iniciais": 201,
+                "202 - Fundamental Anos Finais": 202
+            }
+            tipo_etapa_label = st.selectbox("Tipo de Etapa (MEC)", list(etapas_mec.keys()))
+            etapa_cod = etapas_mec[tipo_etapa_label]
+            
+            horario_oferta = st.selectbox("Horário da Oferta", ["Manhã", "Tarde", "Noite", "Integral"])
+            
+            dep_id = st.selectbox("Dependência Física (Sala)", opcoes_dependencias, format_func=formatar_dependencia)
+            
+            if st.form_submit_button("Criar Turma"):
+                if dep_id is None:
+                    st.error("Selecione uma Dependência Física.")
+                else:
+                    # Achar a dependência pelo id para obter a capacidade
+                    dep_obj = repo.obter_dependencia(dep_id)
+                    capacidade_turma = dep_obj['capacidade'] if dep_obj else 0
+                    
+                    # Sequencial reservado no alocador central (único entre sessões e processos)
+                    try:
+                        codigo_turma = gerar_codigo_turma_unico(banco, ano_letivo, etapa_cod)
+                    except ValueError as e:
+                        st.error(str(e))
+                        st.stop()
+                    
+                    nova_turma = {
+                        'codigo': codigo_turma,
+                        'ano_letivo': ano_letivo,
+                        'etapa_label': tipo_etapa_label,
+                        'horario': horario_oferta,
+                        'dependencia_id': dep_id,
+                        'capacidade_max': capacidade_turma,
+                        'alunos_matriculados': 0
+                    }
+                    repo.inserir_turma(nova_turma)
+                    st.success(f"Turma {codigo_turma} criada com capacidade para {capacidade_turma} alunos!")
+        
+        # Listar turmas
+        if repo.turmas:
+             st.subheader("Turmas Existentes")
+             tabela_paginada('turmas', ['codigo', 'etapa_label', 'horario', 'capacidade_max', 'alunos_matriculados'], "lista_turmas")
+
+
+    # --- 3.4.2 Matrícula (Enturmação) ---
+    with tab_matricula:
+        st.header("Enturmação de Alunos")
+        
+        if not repo.turmas or not repo.alunos:
+             st.warning("É necessário cadastrar Alunos e Turmas antes de realizar matrículas.")
+        else:
+            # Seleção de Turma
+            def formatar_turma(codigo):
+                t = repo.turmas_por_codigo[codigo]
+                return f"{t['codigo']} - {t['etapa_label']} (Vagas: {repo.ocupacao.turma(t['id'])['vagas']})"
+
+            turma_codigo = st.selectbox("Selecione a Turma Destino", list(repo.turmas_por_codigo), format_func=formatar_turma)
+            turma_obj = repo.turma_por_codigo(turma_codigo)
+
+            st.divider()
+
+            # Busca de Aluno (índice no servidor; só os resultados da página são enviados)
+            st.markdown("**Buscar Aluno para Matrícula**")
+            aluno_id = seletor_aluno("enturmacao", "Selecione o Aluno por Nome/ID")
+            
+            if aluno_id is not None and turma_obj:
+                aluno_obj = repo.obter_aluno(aluno_id)
+                
+                # --- Validação Etária (Regra de Negócio) ---
+                idade_compativel, msg_validacao = validar_idade_etapa(
+                    aluno_obj['dt_nascimento'], turma_obj['etapa_label'], turma_obj['ano_letivo']
+                )
+                
+                if not idade_compativel:
+                     st.error(f"BLOQUEIO: {msg_validacao}")
+                else:
+                    st.success(f"Validação: {msg_validacao}")
+                    
+                    # Verificar capacidade da turma
+                    if repo.ocupacao.turma(turma_obj['id'])['vagas'] <= 0:
+                        st.warning("Esta turma atingiu a capacidade máxima física.")
+                    else:
+                        if st.button(f"Confirmar Matrícula de {aluno_obj['nome_completo']} na turma {turma_obj['codigo']}"):
+                            # Registrar matrícula
+                            nova_matricula = {
+                                'aluno_id': aluno_id,
+                                'turma_id': turma_obj['id'],
+                                'turma_codigo': turma_obj['codigo'],
+                                'ano_letivo': turma_obj['ano_letivo'],
+                                'data_matricula': datetime.now().date(),
+                                'status_rendimento': 'Cursando' # Inicial
+                            }
+                            # Grava a matrícula e atualiza o contador da turma na mesma transação;
+                            # a vaga é conferida de novo ali (outra sessão pode ter ocupado a última)
+                            try:
+                                repo.registrar_matricula(nova_matricula)
+                            except ValueError as e:
+                                st.error(str(e))
+                            else:
+                                st.success("Matrícula realizada com sucesso! A ficha do aluno foi atualizada.")
+                                st.rerun()
+
+    # --- Enturmação em Lote (alocação automática de vários alunos) ---
+    with tab_lote:
+        st.header("Enturmação Automática")
+        st.caption(
+            "Distribui de uma vez os alunos sem turma no ano letivo, respeitando a idade por etapa, "
+            "as vagas de cada turma (limitadas pela capacidade física da sala) e o turno preferido."
+        )
+        ano_lote = st.number_input("Ano Letivo", min_value=2024, max_value=2030, value=2025, step=1, key="ano_lote")
+        respeitar_turno = st.checkbox("Alocar apenas no turno preferido (quando informado)")
+
+        if st.button("Calcular Alocação"):
+            pendentes = alunos_sem_turma(repo, ano_lote)
+            alocacao, nao_alocados = calcular_alocacao(repo, pendentes, ano_lote, respeitar_turno)
+            st.session_state['alocacao_lote'] = {'ano': ano_lote, 'alocacao': alocacao, 'nao_alocados': nao_alocados}
+
+        plano = st.session_state.get('alocacao_lote')
+        if plano and plano['ano'] == ano_lote:
+            total_alocados = sum(len(ids) for ids in plano['alocacao'].values())
+            st.write(f"**{total_alocados}** aluno(s) alocado(s), **{len(plano['nao_alocados'])}** sem turma.")
+            if plano['alocacao']:
+                st.dataframe(pd.DataFrame([
+                    {
+                        'codigo': repo.turmas[t_id]['codigo'], 'etapa_label': repo.turmas[t_id]['etapa_label'],
+                        'horario': repo.turmas[t_id]['horario'], 'novos_alunos': len(ids),
+                    }
+                    for t_id, ids in plano['alocacao'].items()
+                ]))
+            if plano['nao_alocados']:
+                with st.expander("Alunos não alocados"):
+                    st.dataframe(pd.DataFrame([
+                        {'id': a_id, 'nome_completo': repo.alunos[a_id]['nome_completo'], 'motivo': motivo}
+                        for a_id, motivo in plano['nao_alocados'].items()
+                    ]))
+            if plano['alocacao'] and st.button("Confirmar Alocação"):
+                try:
+                    matriculas, ja_enturmados = confirmar_alocacao(repo, plano['alocacao'])
+                except ValueError as e:
+                    st.error(str(e))
+                else:
+                    del st.session_state['alocacao_lote']
+                    st.success(f"{len(matriculas)} matrículas realizadas com sucesso!")
+                    if ja_enturmados:
+                        # Plano antigo ou confirmado em outra sessão: esses alunos já têm turma
+                        st.warning(f"{len(ja_enturmados)} aluno(s) já matriculado(s) no ano foram ignorados.")
+                    else:
+                        st.rerun()
+
+    # --- Transferência e cancelamento (liberam a vaga na turma de origem) ---
+    with tab_movimentacao:
+        st.header("Transferência e Cancelamento de Matrícula")
+        aluno_id = seletor_aluno("movimentacao", "Selecione o Aluno")
+        if aluno_id is not None:
+            ativas = [m for m in repo.matriculas_do_aluno(aluno_id) if m['status_rendimento'] == 'Cursando']
+            if not ativas:
+                st.info("O aluno não tem matrícula em curso.")
+            else:
+                matricula_id = st.selectbox(
+                    "Matrícula", [m['id'] for m in ativas],
+                    format_func=lambda m_id: f"{repo.matriculas[m_id]['turma_codigo']} ({repo.matriculas[m_id]['ano_letivo']})",
+                )
+                matricula = repo.matriculas[matricula_id]
+                acao = st.radio("Ação", ["Transferir para outra turma", "Cancelar matrícula"], horizontal=True)
+
+                if acao == "Transferir para outra turma":
+                    aluno_obj = repo.obter_aluno(aluno_id)
+                    # Turmas do mesmo ano com vaga e idade compatível com a etapa
+                    destinos = [
+                        t['id'] for t in list(repo.turmas.values())
+                        if t['ano_letivo'] == matricula['ano_letivo'] and t['id'] != matricula['turma_id']
+                        and repo.ocupacao.turma(t['id'])['vagas'] > 0
+                        and validar_idade_etapa(aluno_obj['dt_nascimento'], t['etapa_label'], t['ano_letivo'])[0]
+                    ]
+                    if not destinos:
+                        st.warning("Nenhuma turma do mesmo ano com vaga e etapa compatível.")
+                    else:
+                        destino_id = st.selectbox(
+                            "Turma de Destino", destinos,
+                            format_func=lambda t_id: (
+                                f"{repo.turmas[t_id]['codigo']} - {repo.turmas[t_id]['etapa_label']} "
+                                f"{repo.turmas[t_id]['horario']} (Vagas: {repo.ocupacao.turma(t_id)['vagas']})"
+                            ),
+                        )
+                        if st.button("Confirmar Transferência"):
+                            try:
+                                nova = repo.transferir_matricula(matricula_id, destino_id, datetime.now().date())
+                            except ValueError as e:
+                                st.error(str(e))
+                            else:
+                                st.success(f"Aluno transferido para a turma {nova['turma_codigo']}.")
+                                st.rerun()
+                elif st.button("Confirmar Cancelamento"):
+                    repo.cancelar_matricula(matricula_id)
+                    st.success("Matrícula cancelada e vaga liberada.")
+                    st.rerun()
+
+
+view_gestao_turmas()
+acompanhar_alteracoes(['dependencias', 'alunos', 'turmas', 'matriculas'])
@@ -0,0 +1,2 @@
+# Serviços compartilhados do SGDE (armazenamento, regras de negócio e afins).
+# Os módulos aqui não dependem do Streamlit para poderem ser usados por jobs em lote.
@@ -0,0 +1,128 @@
+import hashlib
+import io
+import os
+import tempfile
+
+# ==============================================================================
+# ARMAZÉM DE ANEXOS (FOTOS E PLANTAS DAS DEPENDÊNCIAS) ENDEREÇADO POR CONTEÚDO
+# ==============================================================================
+# Cada arquivo é gravado uma vez em disco com o nome igual ao SHA-256 do conteúdo
+# (blobs/ab/abcdef...): o mesmo arquivo enviado duas vezes ocupa espaço uma vez só.
+# As miniaturas são geradas na primeira vez que alguém pede e ficam em disco, então
+# a listagem nunca abre o arquivo original.
+CAMINHO_ANEXOS = os.environ.get("SGDE_ANEXOS", "anexos")
+
+# Bytes copiados por vez do upload para o disco
+TAMANHO_BLOCO_ANEXO = 1024 * 1024
+
+# Lado maior da miniatura, em pixels
+TAMANHO_MINIATURA = 160
+
+TIPOS_IMAGEM = ('png', 'jpg', 'jpeg')
+
+
+class ArmazemAnexos:
+    def __init__(self, raiz=CAMINHO_ANEXOS):
+        self.raiz = raiz
+        self._temporarios = os.path.join(raiz, 'tmp')
+        os.makedirs(self._temporarios, exist_ok=True)
+
+    def caminho(self, hash_anexo):
+        return os.path.join(self.raiz, 'blobs', hash_anexo[:2], hash_anexo)
+
+    def _caminho_miniatura(self, hash_anexo, tamanho):
+        return os.path.join(self.raiz, 'miniaturas', hash_anexo[:2], f"{hash_anexo}_{tamanho}.png")
+
+    def existe(self, hash_anexo):
+        return os.path.exists(self.caminho(hash_anexo))
+
+    def guardar(self, arquivo, tamanho_bloco=TAMANHO_BLOCO_ANEXO):
+        # Copia o arquivo em blocos para um temporário calculando o hash no caminho;
+        # no fim, o temporário vira o blob (os.replace é atômico) ou é descartado se
+        # o conteúdo já existia. Devolve (hash, tamanho em bytes).
+        sha = hashlib.sha256()
+        tamanho = 0
+        if hasattr(arquivo, 'seek'):
+            arquivo.seek(0)
+        descritor, temporario = tempfile.mkstemp(dir=self._temporarios)
+        try:
+            with os.fdopen(descritor, 'wb') as destino:
+                for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+                    sha.update(bloco)
+                    destino.write(bloco)
+                    tamanho += len(bloco)
+            hash_anexo = sha.hexdigest()
+            final = self.caminho(hash_anexo)
+            if os.path.exists(final):
+                os.remove(temporario)
+            else:
+                os.makedirs(os.path.dirname(final), exist_ok=True)
+                os.replace(temporario, final)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+        return hash_anexo, tamanho
+
+    def ler(self, hash_anexo):
+        with open(self.caminho(hash_anexo), 'rb') as f:
+            return f.read()
+
+    def miniatura(self, hash_anexo, tipo, tamanho=TAMANHO_MINIATURA):
+        # PNG da miniatura (bytes) ou None para PDFs e arquivos que não são imagem
+        if (tipo or '').lower() not in TIPOS_IMAGEM or not self.existe(hash_anexo):
+            return None
+        caminho = self._caminho_miniatura(hash_anexo, tamanho)
+        if not os.path.exists(caminho):
+            self._gerar_miniatura(hash_anexo, caminho, tamanho)
+        with open(caminho, 'rb') as f:
+            # Arquivo vazio: marcador de imagem ilegível, gravado na primeira tentativa
+            return f.read() or None
+
+    def _gerar_miniatura(self, hash_anexo, caminho, tamanho):
+        try:
+            from PIL import Image
+        except ImportError:
+            raise ImportError("As miniaturas dos anexos requerem o pacote Pillow (pip install Pillow).")
+
+        saida = io.BytesIO()
+        try:
+            with Image.open(self.caminho(hash_anexo)) as imagem:
+                # draft(): JPEGs grandes são decodificados já reduzidos, sem a imagem inteira em memória
+                imagem.draft('RGB', (tamanho * 2, tamanho * 2))
+                imagem.thumbnail((tamanho, tamanho))
+                if imagem.mode not in ('RGB', 'RGBA'):
+                    imagem = imagem.convert('RGBA')
+                imagem.save(saida, format='PNG', optimize=True)
+        except (Image.UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            # Corrompido ou não é imagem: grava o marcador vazio para não tentar de novo
+            saida = io.BytesIO()
+
+        # Grava num temporário e renomeia: outra sessão nunca lê uma miniatura pela metade
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=self._temporarios)
+        with os.fdopen(descritor, 'wb') as f:
+            f.write(saida.getvalue())
+        os.replace(temporario, caminho)
+
+
+def imagem_valida(arquivo):
+    # Confere no upload se o arquivo abre como imagem (só o cabeçalho e a estrutura,
+    # sem decodificar os pixels); sem Pillow não há como conferir e o arquivo passa
+    try:
+        from PIL import Image
+    except ImportError:
+        return True
+    arquivo.seek(0)
+    try:
+        with Image.open(arquivo) as imagem:
+            imagem.verify()
+        return True
+    except (Image.UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        return False
+    finally:
+        arquivo.seek(0)
+
+
+def extensao(nome_arquivo):
+    return os.path.splitext(nome_arquivo or '')[1].lstrip('.').lower()
@@ -0,0 +1,484 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date
+
+from sgde.metricas import medido
+from sgde.ocupacao import ocupa_vaga
+
+# ==============================================================================
+# ARMAZENAMENTO PERSISTENTE (SQLITE EM MODO WAL)
+# ==============================================================================
+# Caminho padrão do arquivo do banco; pode ser trocado pela variável de ambiente SGDE_DB
+CAMINHO_BANCO = os.environ.get("SGDE_DB", "sgde.db")
+
+# Retenção do log de eventos: ficam os RETENCAO_EVENTOS mais recentes, podados a cada
+# PODA_EVENTOS_A_CADA eventos gravados. Um processo que ficou para trás da poda
+# recarrega a escola inteira em vez de aplicar os eventos (ver Repositorio._sincronizar).
+RETENCAO_EVENTOS = 50000
+PODA_EVENTOS_A_CADA = 5000
+
+# Esquema lógico: tabela -> lista de (coluna, tipo). Os tipos DATE e BOOL são
+# convertidos de/para Python na leitura e escrita; o restante vai direto ao SQLite.
+TABELAS = {
+    'escola_info': [
+        ('id', 'INTEGER'), ('gestor', 'TEXT'), ('nome_escola', 'TEXT'), ('razao_social', 'TEXT'),
+        ('cnpj', 'TEXT'), ('endereco', 'TEXT'), ('regional', 'TEXT'), ('inep', 'INTEGER'),
+    ],
+    'dependencias': [
+        ('id', 'INTEGER'), ('escola_id', 'INTEGER'), ('nome', 'TEXT'), ('numero', 'INTEGER'), ('climatizacao', 'BOOL'),
+        ('metragem', 'REAL'), ('capacidade', 'INTEGER'), ('anexo_nome', 'TEXT'),
+        # Conteúdo do anexo fica no armazém em disco (sgde.anexos), referenciado pelo hash
+        ('anexo_hash', 'TEXT'), ('anexo_tipo', 'TEXT'), ('anexo_tamanho', 'INTEGER'),
+    ],
+    'alunos': [
+        ('id', 'INTEGER'), ('escola_id', 'INTEGER'), ('nome_completo', 'TEXT'), ('nome_social', 'TEXT'), ('dt_nascimento', 'DATE'),
+        ('ra', 'TEXT'), ('cpf', 'TEXT'), ('turno_preferido', 'TEXT'), ('nra_gerado', 'TEXT'),
+        # Ficha cadastral completa (em memória, ver sgde.ficha)
+        ('nome_afetivo', 'TEXT'), ('sexo', 'TEXT'), ('raca_cor', 'TEXT'), ('nacionalidade', 'TEXT'),
+        ('municipio_nascimento', 'TEXT'), ('educacenso', 'TEXT'),
+        ('rg_numero', 'TEXT'), ('rg_digito', 'TEXT'), ('rg_emissao', 'DATE'), ('rg_uf', 'TEXT'),
+        ('cert_matricula', 'TEXT'), ('cert_livro', 'TEXT'), ('cert_folha', 'TEXT'), ('cert_comarca', 'TEXT'),
+        ('cert_distrito', 'TEXT'), ('nis', 'TEXT'), ('cartao_sus', 'TEXT'),
+        ('filiacao1', 'TEXT'), ('filiacao2', 'TEXT'), ('bolsa_familia', 'BOOL'),
+        ('end_logradouro', 'TEXT'), ('end_numero', 'TEXT'), ('end_bairro', 'TEXT'), ('end_cep', 'TEXT'),
+        ('end_cidade', 'TEXT'), ('telefones', 'TEXT'), ('email', 'TEXT'),
+        ('deficiencia', 'BOOL'), ('tipo_deficiencia', 'TEXT'), ('tgd_tea', 'TEXT'), ('nivel_apoio', 'TEXT'),
+        ('laudo_medico', 'BOOL'), ('profissional_apoio', 'BOOL'), ('mobilidade_reduzida', 'BOOL'),
+    ],
+    'turmas': [
+        ('id', 'INTEGER'), ('escola_id', 'INTEGER'), ('codigo', 'TEXT'), ('ano_letivo', 'INTEGER'), ('etapa_label', 'TEXT'),
+        ('horario', 'TEXT'), ('dependencia_id', 'INTEGER'), ('capacidade_max', 'INTEGER'),
+        ('alunos_matriculados', 'INTEGER'),
+    ],
+    'matriculas': [
+        ('id', 'INTEGER'), ('escola_id', 'INTEGER'), ('aluno_id', 'INTEGER'), ('turma_id', 'INTEGER'), ('turma_codigo', 'TEXT'),
+        ('ano_letivo', 'INTEGER'), ('data_matricula', 'DATE'), ('status_rendimento', 'TEXT'),
+    ],
+}
+
+# Rede com várias escolas: cada linha de escola_info é uma escola, e as tabelas
+# abaixo são particionadas por escola_id (registros sem escola vão para a padrão)
+ESCOLA_PADRAO = 1
+REGIONAIS = ["Norte", "Sul", "Leste", "Oeste", "Centro"]
+TABELAS_POR_ESCOLA = ('dependencias', 'alunos', 'turmas', 'matriculas')
+
+# Chaves estrangeiras por tabela: coluna -> tabela referenciada
+CHAVES_ESTRANGEIRAS = {
+    'dependencias': {'escola_id': 'escola_info'},
+    'alunos': {'escola_id': 'escola_info'},
+    'turmas': {'escola_id': 'escola_info', 'dependencia_id': 'dependencias'},
+    'matriculas': {'escola_id': 'escola_info', 'aluno_id': 'alunos', 'turma_id': 'turmas'},
+}
+
+# Índices secundários (nome, tabela, colunas, único?)
+INDICES = [
+    ('idx_turmas_codigo', 'turmas', 'codigo', True),
+    ('idx_turmas_dependencia', 'turmas', 'dependencia_id', False),
+    ('idx_matriculas_aluno', 'matriculas', 'aluno_id', False),
+    ('idx_matriculas_turma', 'matriculas', 'turma_id', False),
+    ('idx_matriculas_turma_codigo', 'matriculas', 'turma_codigo', False),
+    ('idx_alunos_nra', 'alunos', 'nra_gerado', True),
+    # Partições: toda consulta de uma escola (ou regional) começa pelo índice dela
+    ('idx_escolas_regional', 'escola_info', 'regional', False),
+    ('idx_dependencias_escola', 'dependencias', 'escola_id', False),
+    ('idx_alunos_escola', 'alunos', 'escola_id', False),
+    ('idx_turmas_escola_ano', 'turmas', 'escola_id, ano_letivo', False),
+    ('idx_matriculas_escola_ano', 'matriculas', 'escola_id, ano_letivo, status_rendimento', False),
+    ('idx_matriculas_escola_ano_id', 'matriculas', 'escola_id, ano_letivo, id', False),
+    ('idx_eventos_escola', 'eventos', 'escola_id, id', False),
+    ('idx_tarefas_escola', 'tarefas', 'escola_id, id', False),
+    ('idx_tarefas_estado', 'tarefas', 'estado', False),
+]
+
+_TIPOS_SQL = {'INTEGER': 'INTEGER', 'REAL': 'REAL', 'TEXT': 'TEXT', 'DATE': 'TEXT', 'BOOL': 'INTEGER'}
+
+
+def _para_sql(tipo, valor):
+    if valor is None:
+        return None
+    if tipo == 'DATE':
+        return valor.isoformat() if isinstance(valor, date) else str(valor)
+    if tipo == 'BOOL':
+        return 1 if valor else 0
+    return valor
+
+
+def _de_sql(tipo, valor):
+    if valor is None:
+        return None
+    if tipo == 'DATE':
+        return date.fromisoformat(valor[:10])
+    if tipo == 'BOOL':
+        return bool(valor)
+    return valor
+
+
+class Banco:
+    # Um único objeto por processo: mantém um pool de conexões reaproveitadas entre
+    # as threads das sessões do Streamlit e serializa as escritas com um lock.
+    def __init__(self, caminho=CAMINHO_BANCO, tamanho_pool=8):
+        self.caminho = caminho
+        self.tamanho_pool = tamanho_pool
+        self._pool = queue.LifoQueue()
+        self._lock_escrita = threading.RLock()
+        self._local = threading.local()
+        self._tipos = {tabela: dict(colunas) for tabela, colunas in TABELAS.items()}
+        self._criar_esquema()
+
+    # --------------------------------------------------------------------------
+    # Conexões e transações
+    # --------------------------------------------------------------------------
+    def _abrir(self):
+        con = sqlite3.connect(self.caminho, check_same_thread=False, isolation_level=None, timeout=30)
+        con.row_factory = sqlite3.Row
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute("PRAGMA foreign_keys=ON")
+        return con
+
+    @contextmanager
+    def conexao(self):
+        # Dentro de uma transação da própria thread, as leituras usam a mesma conexão
+        con_transacao = getattr(self._local, 'con', None)
+        if con_transacao is not None:
+            yield con_transacao
+            return
+        try:
+            con = self._pool.get_nowait()
+        except queue.Empty:
+            con = self._abrir()
+        try:
+            yield con
+        finally:
+            if self._pool.qsize() < self.tamanho_pool:
+                self._pool.put(con)
+            else:
+                con.close()
+
+    @contextmanager
+    def transacao(self):
+        # Transação de escrita; reentrante na mesma thread (operações em lote
+        # podem chamar inserir() várias vezes dentro de um único commit).
+        with self._lock_escrita:
+            if getattr(self._local, 'con', None) is not None:
+                yield self._local.con
+                return
+            with self.conexao() as con:
+                con.execute("BEGIN IMMEDIATE")
+                self._local.con = con
+                try:
+                    yield con
+                    con.execute("COMMIT")
+                except BaseException:
+                    con.execute("ROLLBACK")
+                    raise
+                finally:
+                    self._local.con = None
+
+    def fechar(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    # --------------------------------------------------------------------------
+    # Esquema
+    # --------------------------------------------------------------------------
+    def _criar_esquema(self):
+        with self.transacao() as con:
+            for tabela, colunas in TABELAS.items():
+                fks = CHAVES_ESTRANGEIRAS.get(tabela, {})
+                defs = []
+                for coluna, tipo in colunas:
+                    if coluna == 'id':
+                        defs.append("id INTEGER PRIMARY KEY AUTOINCREMENT")
+                    elif coluna in fks:
+                        defs.append(f"{coluna} {_TIPOS_SQL[tipo]} REFERENCES {fks[coluna]}(id)")
+                    else:
+                        defs.append(f"{coluna} {_TIPOS_SQL[tipo]}")
+                con.execute(f"CREATE TABLE IF NOT EXISTS {tabela} ({', '.join(defs)})")
+
+                # Migração simples: colunas novas no esquema são adicionadas a bancos antigos
+                existentes = {r['name'] for r in con.execute(f"PRAGMA table_info({tabela})")}
+                for coluna, tipo in colunas:
+                    if coluna not in existentes:
+                        con.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {_TIPOS_SQL[tipo]}")
+
+            # Contadores nomeados do alocador de sequências (NRA, códigos de turma)
+            con.execute("CREATE TABLE IF NOT EXISTS sequencias (nome TEXT PRIMARY KEY, valor INTEGER NOT NULL)")
+
+            # Log de alterações: toda escrita registra (tabela, registro_id) na mesma
+            # transação, para outros processos/caches recarregarem só o que mudou
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS eventos (id INTEGER PRIMARY KEY AUTOINCREMENT, tabela TEXT NOT NULL, "
+                "registro_id INTEGER NOT NULL, escola_id INTEGER)"
+            )
+            if 'escola_id' not in {r['name'] for r in con.execute("PRAGMA table_info(eventos)")}:
+                con.execute("ALTER TABLE eventos ADD COLUMN escola_id INTEGER")
+
+            # Estado das tarefas em segundo plano (sgde.tarefas); parâmetros, ponto de
+            # retomada e resultado em JSON, horários em segundos desde a época
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS tarefas (id INTEGER PRIMARY KEY AUTOINCREMENT, tipo TEXT NOT NULL, "
+                "escola_id INTEGER, parametros TEXT, estado TEXT NOT NULL, progresso REAL, mensagem TEXT, "
+                "checkpoint TEXT, resultado TEXT, erro TEXT, cancelamento INTEGER NOT NULL DEFAULT 0, dono TEXT, "
+                "criada_em REAL, atualizada_em REAL)"
+            )
+
+            # Bancos de uma escola só: os dados existentes passam a ser da escola padrão
+            con.execute("INSERT OR IGNORE INTO escola_info (id, nome_escola) VALUES (?, 'Escola Principal')", (ESCOLA_PADRAO,))
+            for tabela in TABELAS_POR_ESCOLA:
+                con.execute(f"UPDATE {tabela} SET escola_id = ? WHERE escola_id IS NULL", (ESCOLA_PADRAO,))
+
+            for nome, tabela, colunas, unico in INDICES:
+                con.execute(f"CREATE {'UNIQUE ' if unico else ''}INDEX IF NOT EXISTS {nome} ON {tabela} ({colunas})")
+
+    # --------------------------------------------------------------------------
+    # Conversão de linhas
+    # --------------------------------------------------------------------------
+    def _linha_para_dict(self, tabela, linha):
+        tipos = self._tipos[tabela]
+        return {chave: _de_sql(tipos.get(chave, 'TEXT'), linha[chave]) for chave in linha.keys()}
+
+    def _valores(self, tabela, registro):
+        tipos = self._tipos[tabela]
+        colunas = [c for c in registro if c in tipos and c != 'id']
+        return colunas, [_para_sql(tipos[c], registro[c]) for c in colunas]
+
+    # --------------------------------------------------------------------------
+    # Operações genéricas
+    # --------------------------------------------------------------------------
+    @medido('banco')
+    def listar(self, tabela, onde=None, parametros=(), ordem="id"):
+        sql = f"SELECT * FROM {tabela}"
+        if onde:
+            sql += f" WHERE {onde}"
+        sql += f" ORDER BY {ordem}"
+        with self.conexao() as con:
+            return [self._linha_para_dict(tabela, linha) for linha in con.execute(sql, parametros)]
+
+    def iterar(self, tabela, onde=None, parametros=(), ordem="id", tamanho_bloco=5000):
+        # Como listar(), mas gera os registros aos poucos (fetchmany): quem monta uma
+        # estrutura própria não precisa da lista inteira de dicts em memória
+        sql = f"SELECT * FROM {tabela}"
+        if onde:
+            sql += f" WHERE {onde}"
+        sql += f" ORDER BY {ordem}"
+        with self.conexao() as con:
+            cursor = con.execute(sql, parametros)
+            while linhas := cursor.fetchmany(tamanho_bloco):
+                for linha in linhas:
+                    yield self._linha_para_dict(tabela, linha)
+
+    @medido('banco')
+    def obter(self, tabela, registro_id):
+        with self.conexao() as con:
+            linha = con.execute(f"SELECT * FROM {tabela} WHERE id = ?", (registro_id,)).fetchone()
+        return self._linha_para_dict(tabela, linha) if linha else None
+
+    # --------------------------------------------------------------------------
+    # Log de alterações
+    # --------------------------------------------------------------------------
+    def _registrar_eventos(self, con, tabela, registro_ids):
+        # A escola do evento vem do próprio registro (em escola_info, é o id da escola)
+        coluna_escola = 'id' if tabela == 'escola_info' else 'escola_id'
+        con.executemany(
+            f"INSERT INTO eventos (tabela, registro_id, escola_id) SELECT ?, id, {coluna_escola} FROM {tabela} WHERE id = ?",
+            [(tabela, r) for r in registro_ids],
+        )
+        ultimo = con.execute("SELECT last_insert_rowid()").fetchone()[0]
+        if ultimo // PODA_EVENTOS_A_CADA != (ultimo - len(registro_ids)) // PODA_EVENTOS_A_CADA:
+            self._podar_eventos(con, ultimo - RETENCAO_EVENTOS)
+
+    def _podar_eventos(self, con, ate_id):
+        # Apaga os eventos até ate_id (intervalo da chave primária) e guarda a marca
+        # d'água em `sequencias`: quem sincronizou antes dela perdeu eventos
+        if ate_id <= 0:
+            return
+        con.execute("DELETE FROM eventos WHERE id <= ?", (ate_id,))
+        con.execute(
+            "INSERT INTO sequencias (nome, valor) VALUES ('eventos_podados', ?) "
+            "ON CONFLICT(nome) DO UPDATE SET valor = MAX(valor, excluded.valor)",
+            (ate_id,),
+        )
+
+    @medido('banco')
+    def ultimo_evento(self):
+        with self.conexao() as con:
+            return con.execute("SELECT COALESCE(MAX(id), 0) FROM eventos").fetchone()[0]
+
+    @medido('banco')
+    def eventos_desde(self, evento_id, escola_id=None):
+        # Lista de (id, tabela, registro_id) posteriores a evento_id; com escola_id,
+        # só os da escola (índice (escola_id, id), sem ler eventos das outras).
+        # None se eventos posteriores a evento_id já foram podados.
+        with self.conexao() as con:
+            podados = con.execute("SELECT valor FROM sequencias WHERE nome = 'eventos_podados'").fetchone()
+            if podados and podados[0] > evento_id:
+                return None
+            if escola_id is None:
+                return con.execute(
+                    "SELECT id, tabela, registro_id FROM eventos WHERE id > ? ORDER BY id", (evento_id,)
+                ).fetchall()
+            return con.execute(
+                "SELECT id, tabela, registro_id FROM eventos WHERE escola_id = ? AND id > ? ORDER BY id",
+                (escola_id, evento_id),
+            ).fetchall()
+
+    @medido('banco')
+    def inserir(self, tabela, registro):
+        # Insere um registro e devolve o id gerado pelo banco (também gravado no dict)
+        if tabela in TABELAS_POR_ESCOLA:
+            registro.setdefault('escola_id', ESCOLA_PADRAO)
+        colunas, valores = self._valores(tabela, registro)
+        with self.transacao() as con:
+            cur = con.execute(
+                f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})", valores
+            )
+            registro['id'] = cur.lastrowid
+            self._registrar_eventos(con, tabela, [registro['id']])
+        return registro['id']
+
+    @medido('banco')
+    def inserir_varios(self, tabela, registros):
+        # Inserção em lote numa única transação (executemany). Os ids são atribuídos
+        # aqui, a partir do maior id atual, já com o lock de escrita do banco obtido.
+        if not registros:
+            return []
+        colunas = [c for c, _ in TABELAS[tabela] if c != 'id']
+        tipos = self._tipos[tabela]
+        with self.transacao() as con:
+            proximo = con.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabela}").fetchone()[0] + 1
+            linhas = []
+            for registro in registros:
+                registro['id'] = proximo
+                proximo += 1
+                for c in colunas:
+                    registro.setdefault(c, None)
+                if tabela in TABELAS_POR_ESCOLA and registro['escola_id'] is None:
+                    registro['escola_id'] = ESCOLA_PADRAO
+                linhas.append([registro['id']] + [_para_sql(tipos[c], registro.get(c)) for c in colunas])
+            con.executemany(
+                f"INSERT INTO {tabela} (id, {', '.join(colunas)}) VALUES ({', '.join('?' * (len(colunas) + 1))})", linhas
+            )
+            self._registrar_eventos(con, tabela, [r['id'] for r in registros])
+        return [r['id'] for r in registros]
+
+    @medido('banco')
+    def atualizar(self, tabela, registro_id, campos):
+        colunas, valores = self._valores(tabela, campos)
+        if not colunas:
+            return
+        with self.transacao() as con:
+            con.execute(
+                f"UPDATE {tabela} SET {', '.join(f'{c} = ?' for c in colunas)} WHERE id = ?", valores + [registro_id]
+            )
+            self._registrar_eventos(con, tabela, [registro_id])
+
+    @medido('banco')
+    def reservar_sequencia(self, nome, quantidade=1, semente=None):
+        # Avança o contador `nome` em `quantidade` e devolve o range reservado. O
+        # BEGIN IMMEDIATE torna a operação atômica também entre processos. Na primeira
+        # vez, `semente(con)` pode informar o último valor já usado (dados antigos).
+        with self.transacao() as con:
+            if con.execute("SELECT 1 FROM sequencias WHERE nome = ?", (nome,)).fetchone() is None:
+                inicial = semente(con) if semente else 0
+                con.execute("INSERT INTO sequencias (nome, valor) VALUES (?, ?)", (nome, inicial or 0))
+            fim = con.execute(
+                "UPDATE sequencias SET valor = valor + ? WHERE nome = ? RETURNING valor", (quantidade, nome)
+            ).fetchone()[0]
+        return range(fim - quantidade + 1, fim + 1)
+
+    @medido('banco')
+    def avancar_sequencia(self, nome, valor, semente=None):
+        # Garante que o contador `nome` está em pelo menos `valor` (números vindos de
+        # fora, como NRAs importados), para a próxima reserva não repeti-los
+        with self.transacao() as con:
+            if con.execute("SELECT 1 FROM sequencias WHERE nome = ?", (nome,)).fetchone() is None:
+                inicial = semente(con) if semente else 0
+                con.execute("INSERT INTO sequencias (nome, valor) VALUES (?, ?)", (nome, inicial or 0))
+            con.execute("UPDATE sequencias SET valor = MAX(valor, ?) WHERE nome = ?", (valor, nome))
+
+    # --------------------------------------------------------------------------
+    # Consultas específicas
+    # --------------------------------------------------------------------------
+    def nras_existentes(self, nras):
+        # NRAs da lista já usados em qualquer escola da rede (idx_alunos_nra é único na rede)
+        nras = list(nras)
+        existentes = set()
+        with self.conexao() as con:
+            for i in range(0, len(nras), 500):
+                lote = nras[i:i + 500]
+                existentes.update(r[0] for r in con.execute(
+                    f"SELECT nra_gerado FROM alunos WHERE nra_gerado IN ({', '.join('?' * len(lote))})", lote
+                ))
+        return existentes
+
+    def listar_escolas(self, regional=None):
+        if regional:
+            return self.listar('escola_info', "regional = ?", (regional,), ordem="nome_escola, id")
+        return self.listar('escola_info', ordem="nome_escola, id")
+
+    def obter_escola_info(self, escola_id=ESCOLA_PADRAO):
+        escola = self.obter('escola_info', escola_id)
+        if not escola:
+            return {}
+        escola.pop('id')
+        return escola
+
+    def salvar_escola_info(self, dados, escola_id=ESCOLA_PADRAO):
+        colunas, valores = self._valores('escola_info', dados)
+        with self.transacao() as con:
+            con.execute(
+                f"INSERT OR REPLACE INTO escola_info (id, {', '.join(colunas)}) VALUES (?, {', '.join('?' * len(colunas))})",
+                [escola_id] + valores,
+            )
+            self._registrar_eventos(con, 'escola_info', [escola_id])
+
+    def registrar_matriculas(self, matriculas):
+        # Versão em lote: um executemany para as matrículas e um para os contadores
+        por_turma = {}
+        for m in matriculas:
+            por_turma[m['turma_id']] = por_turma.get(m['turma_id'], 0) + 1
+        with self.transacao() as con:
+            self.inserir_varios('matriculas', matriculas)
+            con.executemany(
+                "UPDATE turmas SET alunos_matriculados = alunos_matriculados + ? WHERE id = ?",
+                [(n, turma_id) for turma_id, n in por_turma.items()],
+            )
+            self._registrar_eventos(con, 'turmas', list(por_turma))
+        return [m['id'] for m in matriculas]
+
+    def registrar_matricula(self, matricula):
+        # Grava a matrícula e incrementa o contador da turma na mesma transação
+        with self.transacao() as con:
+            self.inserir('matriculas', matricula)
+            con.execute(
+                "UPDATE turmas SET alunos_matriculados = alunos_matriculados + 1 WHERE id = ?", (matricula['turma_id'],)
+            )
+            self._registrar_eventos(con, 'turmas', [matricula['turma_id']])
+        return matricula['id']
+
+    def alterar_status_matricula(self, matricula_id, status):
+        # Troca o status e ajusta o contador da turma quando a matrícula passa a
+        # ocupar ou deixa de ocupar a vaga (transferência, cancelamento, reativação)
+        with self.transacao() as con:
+            linha = con.execute(
+                "SELECT turma_id, status_rendimento FROM matriculas WHERE id = ?", (matricula_id,)
+            ).fetchone()
+            if linha is None:
+                raise ValueError(f"Matrícula {matricula_id} não encontrada.")
+            con.execute("UPDATE matriculas SET status_rendimento = ? WHERE id = ?", (status, matricula_id))
+            self._registrar_eventos(con, 'matriculas', [matricula_id])
+            delta = ocupa_vaga(status) - ocupa_vaga(linha['status_rendimento'])
+            if delta:
+                con.execute(
+                    "UPDATE turmas SET alunos_matriculados = alunos_matriculados + ? WHERE id = ?",
+                    (delta, linha['turma_id']),
+                )
+                self._registrar_eventos(con, 'turmas', [linha['turma_id']])
+        return delta
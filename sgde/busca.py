@@ -0,0 +1,185 @@
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+# ==============================================================================
+# ÍNDICE DE BUSCA DE ALUNOS (PREFIXO + TRIGRAMAS, SEM ACENTOS)
+# ==============================================================================
+# Campos do aluno considerados na busca
+CAMPOS_BUSCA = ['nome_completo', 'nome_social', 'ra', 'cpf', 'nra_gerado']
+
+# Fração mínima de trigramas de um token da consulta que um termo precisa ter no fallback aproximado
+LIMIAR_TRIGRAMAS = 0.5
+
+_NAO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+_NAO_DIGITO = re.compile(r'\D')
+
+
+def normalizar(texto):
+    # "José da Conceição" -> "jose da conceicao"
+    texto = str(texto or '')
+    if not texto.isascii():
+        texto = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(_NAO_ALFANUMERICO.sub(' ', texto.lower()).split())
+
+
+def _trigramas(termo):
+    termo = f"  {termo} "
+    return {termo[i:i + 3] for i in range(len(termo) - 2)}
+
+
+def termos_do_aluno(aluno):
+    termos = set()
+    for campo in CAMPOS_BUSCA:
+        valor = aluno.get(campo)
+        if not valor or valor == "N/A":
+            continue
+        termos.update(normalizar(valor).split())
+        # Documentos também são indexados só com dígitos ("123.456.789-00" -> "12345678900")
+        digitos = _NAO_DIGITO.sub('', str(valor))
+        if len(digitos) >= 3:
+            termos.add(digitos)
+    return termos
+
+
+class IndiceBusca:
+    # Índice invertido incremental: termo -> ids (lista ordenada de termos para
+    # busca por prefixo via bisect) e trigrama -> termos para tolerar erros de
+    # digitação. Os trigramas ficam no nível do termo, então nomes repetidos
+    # ("silva", "santos") não custam nada a mais por aluno.
+    #
+    # O índice é compartilhado pelas sessões do processo: buscas e reindexações
+    # passam pelo lock do próprio índice (curto, sem esperar as transações do
+    # Repositorio), então uma busca nunca vê um aluno pela metade.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._termos_ordenados = []
+        self._ids_por_termo = defaultdict(set)
+        self._termos_por_trigrama = defaultdict(set)
+        self._termos_por_id = {}
+        self._rotulo_ordem = {}
+
+    def __len__(self):
+        return len(self._termos_por_id)
+
+    def adicionar(self, aluno):
+        with self._lock:
+            for termo in self._indexar(aluno):
+                bisect.insort(self._termos_ordenados, termo)
+
+    def adicionar_varios(self, alunos):
+        # Em lote, os termos novos são ordenados uma vez no fim, em vez de um insort por termo
+        alunos = list(alunos)
+        with self._lock:
+            novos = []
+            for aluno in alunos:
+                novos.extend(self._indexar(aluno))
+            if novos:
+                self._termos_ordenados.extend(novos)
+                self._termos_ordenados.sort()
+
+    def _indexar(self, aluno):
+        # Atualiza os mapas do aluno e devolve os termos que ainda não existiam no índice
+        aluno_id = aluno['id']
+        if aluno_id in self._termos_por_id:
+            self._remover(aluno_id)
+        termos = termos_do_aluno(aluno)
+        self._termos_por_id[aluno_id] = termos
+        self._rotulo_ordem[aluno_id] = normalizar(aluno.get('nome_completo'))
+        novos = []
+        for termo in termos:
+            if termo not in self._ids_por_termo:
+                novos.append(termo)
+                for tri in _trigramas(termo):
+                    self._termos_por_trigrama[tri].add(termo)
+            self._ids_por_termo[termo].add(aluno_id)
+        return novos
+
+    def remover(self, aluno_id):
+        with self._lock:
+            self._remover(aluno_id)
+
+    def _remover(self, aluno_id):
+        for termo in self._termos_por_id.pop(aluno_id, ()):
+            ids = self._ids_por_termo[termo]
+            ids.discard(aluno_id)
+            if not ids:
+                del self._ids_por_termo[termo]
+                pos = bisect.bisect_left(self._termos_ordenados, termo)
+                del self._termos_ordenados[pos]
+                for tri in _trigramas(termo):
+                    self._termos_por_trigrama[tri].discard(termo)
+        self._rotulo_ordem.pop(aluno_id, None)
+
+    def _ids_com_prefixo(self, prefixo):
+        ids = set()
+        inicio = bisect.bisect_left(self._termos_ordenados, prefixo)
+        for termo in self._termos_ordenados[inicio:]:
+            if not termo.startswith(prefixo):
+                break
+            ids |= self._ids_por_termo[termo]
+        return ids
+
+    def _pontuar_trigramas(self, consulta):
+        # Para cada token, os termos parecidos (trigramas em comum) dão a pontuação
+        # dos seus alunos; o aluno precisa ter um termo parecido para todos os tokens.
+        pontos = None
+        for token in consulta.split():
+            tris = _trigramas(token)
+            contagem = defaultdict(int)
+            for tri in tris:
+                for termo in self._termos_por_trigrama.get(tri, ()):
+                    contagem[termo] += 1
+            minimo = max(1, int(len(tris) * LIMIAR_TRIGRAMAS))
+            pontos_token = {}
+            for termo, n in contagem.items():
+                if n < minimo:
+                    continue
+                for aluno_id in self._ids_por_termo[termo]:
+                    if n > pontos_token.get(aluno_id, 0):
+                        pontos_token[aluno_id] = n
+            if pontos is None:
+                pontos = pontos_token
+            else:
+                pontos = {a_id: p + pontos_token[a_id] for a_id, p in pontos.items() if a_id in pontos_token}
+            if not pontos:
+                return {}
+        return pontos or {}
+
+    def buscar(self, consulta, limite=10, pagina=0):
+        # Devolve (ids da página pedida, total de resultados). Cada token da consulta
+        # precisa casar como prefixo de algum termo do aluno; sem nenhum resultado,
+        # cai para a similaridade por trigramas.
+        consulta = normalizar(consulta)
+        if not consulta:
+            return [], 0
+        with self._lock:
+            return self._buscar(consulta, limite, pagina)
+
+    def _buscar(self, consulta, limite, pagina):
+        candidatos = None
+        for token in consulta.split():
+            ids = self._ids_com_prefixo(token)
+            candidatos = ids if candidatos is None else candidatos & ids
+            if not candidatos:
+                break
+
+        if candidatos:
+            tokens = consulta.split()
+            # Alunos com termos idênticos aos da consulta vêm antes dos que só casam por prefixo
+            chave = lambda a_id: (
+                -sum(t in self._termos_por_id[a_id] for t in tokens), self._rotulo_ordem[a_id], a_id
+            )
+        else:
+            pontos = self._pontuar_trigramas(consulta)
+            candidatos = pontos.keys()
+            chave = lambda a_id: (-pontos[a_id], self._rotulo_ordem[a_id], a_id)
+
+        total = len(candidatos)
+        fim = (pagina + 1) * limite
+        # Só ordena o necessário para a página pedida (top-k), não todos os candidatos
+        primeiros = heapq.nsmallest(fim, candidatos, key=chave)
+        return primeiros[pagina * limite:fim], total
@@ -0,0 +1,114 @@
+import heapq
+from collections import defaultdict
+from datetime import datetime
+
+from sgde.ocupacao import contribuicao_da_turma
+from sgde.regras_etarias import tabela_cortes
+
+# ==============================================================================
+# ENTURMAÇÃO EM LOTE (ALOCAÇÃO DE VÁRIOS ALUNOS EM TURMAS DE UMA VEZ)
+# ==============================================================================
+
+
+def vagas_da_turma(turma, dependencia=None):
+    # Vagas livres: o limite é a capacidade da turma, sem passar da capacidade física
+    # da sala (metragem / 1.2) quando a dependência é conhecida.
+    return contribuicao_da_turma(turma, dependencia)['vagas']
+
+
+def alunos_sem_turma(repo, ano_letivo, aluno_ids=None):
+    # Alunos sem matrícula "Cursando" no ano letivo informado (entre aluno_ids, se dado)
+    return [
+        aluno_id for aluno_id in (list(repo.alunos) if aluno_ids is None else aluno_ids)
+        if not any(
+            m['ano_letivo'] == ano_letivo and m['status_rendimento'] == 'Cursando'
+            for m in repo.matriculas_do_aluno(aluno_id)
+        )
+    ]
+
+
+def calcular_alocacao(repo, aluno_ids, ano_letivo, respeitar_turno=False):
+    # Distribui os alunos nas turmas do ano respeitando idade x etapa, vagas e turno
+    # preferido. Guloso com heaps: cada grupo (etapa, horário) entrega sempre a turma
+    # com mais vagas restantes, o que equilibra as turmas. Custo O(N log T).
+    # Devolve (alocacao {turma_id: [aluno_id]}, nao_alocados {aluno_id: motivo}).
+    turmas = [t for t in list(repo.turmas.values()) if t['ano_letivo'] == ano_letivo]
+    grupos = defaultdict(list)
+    for turma in turmas:
+        vagas = vagas_da_turma(turma, repo.obter_dependencia(turma['dependencia_id']))
+        if vagas > 0:
+            grupos[(turma['etapa_label'], turma['horario'])].append([-vagas, turma['id']])
+    for heap in grupos.values():
+        heapq.heapify(heap)
+    etapas = sorted({etapa for etapa, _ in grupos})
+
+    alocacao = defaultdict(list)
+    nao_alocados = {}
+    alunos = [repo.obter_aluno(aluno_id) for aluno_id in aluno_ids]
+    # Elegibilidade de todos os alunos x etapas numa única comparação vetorizada
+    elegibilidade = tabela_cortes().classificar(
+        [a['dt_nascimento'] for a in alunos], [(etapa, ano_letivo) for etapa in etapas]
+    )
+    for aluno, elegivel in zip(alunos, elegibilidade):
+        aluno_id = aluno['id']
+        etapas_aluno = [etapa for etapa, ok in zip(etapas, elegivel) if ok]
+        if not etapas_aluno:
+            nao_alocados[aluno_id] = "Nenhuma turma do ano compatível com a idade."
+            continue
+
+        turno = aluno.get('turno_preferido')
+        candidatos = [(e, h) for (e, h) in grupos if e in etapas_aluno and grupos[(e, h)]]
+        if turno:
+            preferidos = [g for g in candidatos if g[1] == turno]
+            if preferidos or respeitar_turno:
+                candidatos = preferidos
+        if not candidatos:
+            nao_alocados[aluno_id] = "Sem vagas em turmas compatíveis" + (f" no turno {turno}." if turno else ".")
+            continue
+
+        # Grupo cuja melhor turma tem mais vagas
+        grupo = min(candidatos, key=lambda g: grupos[g][0][0])
+        heap = grupos[grupo]
+        negativo_vagas, turma_id = heapq.heappop(heap)
+        alocacao[turma_id].append(aluno_id)
+        if negativo_vagas + 1 < 0:
+            heapq.heappush(heap, [negativo_vagas + 1, turma_id])
+
+    return dict(alocacao), nao_alocados
+
+
+def confirmar_alocacao(repo, alocacao):
+    # Grava todas as matrículas da alocação numa única transação. Vagas e alunos são
+    # conferidos de novo com o lock de escrita obtido, pois outra sessão pode ter
+    # matriculado alunos depois do cálculo (ou confirmado o mesmo plano): quem já tem
+    # turma no ano fica de fora. Devolve (matrículas gravadas, ids já enturmados).
+    hoje = datetime.now().date()
+    with repo.transacao():
+        ja_enturmados = []
+        pendentes = {}
+        for turma_id, aluno_ids in alocacao.items():
+            ano_letivo = repo.obter_turma(turma_id)['ano_letivo']
+            sem_turma = set(alunos_sem_turma(repo, ano_letivo, aluno_ids))
+            ja_enturmados.extend(a for a in aluno_ids if a not in sem_turma)
+            if sem_turma:
+                pendentes[turma_id] = [a for a in aluno_ids if a in sem_turma]
+        alocacao = pendentes
+
+        for turma_id, aluno_ids in alocacao.items():
+            turma = repo.obter_turma(turma_id)
+            if len(aluno_ids) > vagas_da_turma(turma, repo.obter_dependencia(turma['dependencia_id'])):
+                raise ValueError(f"A turma {turma['codigo']} não tem mais vagas suficientes. Recalcule a alocação.")
+
+        matriculas = []
+        for turma_id, aluno_ids in alocacao.items():
+            turma = repo.obter_turma(turma_id)
+            for aluno_id in aluno_ids:
+                matriculas.append({
+                    'aluno_id': aluno_id,
+                    'turma_id': turma_id,
+                    'turma_codigo': turma['codigo'],
+                    'ano_letivo': turma['ano_letivo'],
+                    'data_matricula': hoje,
+                    'status_rendimento': 'Cursando',
+                })
+        return (repo.registrar_matriculas(matriculas) if matriculas else []), ja_enturmados
@@ -0,0 +1,204 @@
+import csv
+import os
+import re
+import time
+from datetime import date
+
+from sgde.banco import TABELAS
+from sgde.ficha import SEXOS, RACAS
+from sgde.ocupacao import STATUS_SEM_VAGA
+from sgde.regras_etarias import codigo_da_etapa
+
+# ==============================================================================
+# EXPORTAÇÃO EDUCACENSO/INEP (LEIAUTE DO CENSO, CSV E PARQUET EM BLOCOS)
+# ==============================================================================
+# Pipeline de geradores: registros() lê as matrículas do banco bloco a bloco, o
+# escritor do formato grava cada bloco assim que ele chega e devolve quantas linhas
+# gravou. Em memória fica só um bloco por vez, qualquer que seja o tamanho da rede.
+CAMINHO_EXPORTACOES = os.environ.get("SGDE_EXPORTACOES", "exportacoes")
+
+# Matrículas lidas e gravadas por vez
+TAMANHO_BLOCO_EXPORTACAO = 5000
+
+FORMATOS = {'censo': "Leiaute do Censo (.txt)", 'csv': "CSV (.csv)", 'parquet': "Parquet (.parquet)"}
+_EXTENSOES = {'censo': '.txt', 'csv': '.csv', 'parquet': '.parquet'}
+
+# Colunas de matrícula, turma e escola que acompanham cada aluno: (nome, expressão SQL, tipo)
+_COLUNAS_VINCULO = [
+    ('matricula_id', 'm.id', 'INTEGER'), ('escola_id', 'm.escola_id', 'INTEGER'),
+    ('inep_escola', 'e.inep', 'INTEGER'), ('nome_escola', 'e.nome_escola', 'TEXT'), ('regional', 'e.regional', 'TEXT'),
+    ('turma_codigo', 't.codigo', 'TEXT'), ('etapa_label', 't.etapa_label', 'TEXT'), ('horario', 't.horario', 'TEXT'),
+    ('ano_letivo', 'm.ano_letivo', 'INTEGER'), ('data_matricula', 'm.data_matricula', 'DATE'),
+    ('status_rendimento', 'm.status_rendimento', 'TEXT'),
+]
+
+# Arquivo de migração do Educacenso (campos separados por "|"): para cada escola o
+# registro 00 e, para cada matrícula, o 30 (pessoa física) e o 60 (vínculo com a
+# turma). Os campos vêm da ficha do aluno; os vazios na ficha saem vazios.
+LEIAUTE_CENSO = {
+    '00': ['inep_escola', 'nome_escola', 'regional'],
+    '30': [
+        'inep_escola', 'aluno_id', 'educacenso', 'nome_completo', 'nome_social', 'dt_nascimento', 'sexo',
+        'raca_cor', 'nacionalidade', 'municipio_nascimento', 'cpf', 'ra', 'nra_gerado', 'rg_numero', 'rg_uf',
+        'cert_matricula', 'nis', 'cartao_sus', 'deficiencia', 'tipo_deficiencia',
+    ],
+    '60': ['inep_escola', 'aluno_id', 'educacenso', 'turma_codigo', 'etapa_cod', 'horario', 'data_matricula'],
+}
+
+# Campos que o leiaute pede como código (sexo 1/2, cor/raça 0 a 5, na ordem dos formulários)
+CODIGOS_CENSO = {
+    'sexo': {valor: str(i + 1) for i, valor in enumerate(SEXOS)},
+    'raca_cor': {valor: str(i) for i, valor in enumerate(RACAS)},
+}
+
+
+def colunas_exportacao():
+    # Vínculo + todas as colunas do aluno no esquema (campos novos da ficha entram sozinhos)
+    return _COLUNAS_VINCULO + [('aluno_id', 'a.id', 'INTEGER')] + [
+        (coluna, f"a.{coluna}", tipo) for coluna, tipo in TABELAS['alunos'] if coluna not in ('id', 'escola_id')
+    ]
+
+
+def _converter(tipo, valor):
+    if valor is None:
+        return None
+    if tipo == 'DATE':
+        return date.fromisoformat(valor)
+    if tipo == 'BOOL':
+        return bool(valor)
+    return valor
+
+
+def _filtro_matriculas():
+    # Matrículas do ano que ocupam vaga (transferidas/canceladas não vão para o censo)
+    return (
+        f"m.escola_id = ? AND m.ano_letivo = ? "
+        f"AND m.status_rendimento NOT IN ({', '.join('?' * len(STATUS_SEM_VAGA))})"
+    )
+
+
+def contar_registros(banco, escola_ids, ano_letivo):
+    total = 0
+    with banco.conexao() as con:
+        for escola_id in escola_ids:
+            total += con.execute(
+                f"SELECT COUNT(*) FROM matriculas m WHERE {_filtro_matriculas()}",
+                (escola_id, ano_letivo, *STATUS_SEM_VAGA),
+            ).fetchone()[0]
+    return total
+
+
+def registros(banco, escola_id, ano_letivo, tamanho_bloco=TAMANHO_BLOCO_EXPORTACAO):
+    # Gera blocos (listas de dicts) das matrículas da escola no ano, com aluno, turma
+    # e escola. Paginação por chave (m.id > último) pelo índice (escola_id, ano_letivo,
+    # id): cada bloco é uma consulta curta, sem cursor aberto a exportação inteira.
+    colunas = colunas_exportacao()
+    sql = (
+        f"SELECT {', '.join(f'{expressao} AS {nome}' for nome, expressao, _ in colunas)} "
+        "FROM matriculas m JOIN alunos a ON a.id = m.aluno_id JOIN turmas t ON t.id = m.turma_id "
+        "JOIN escola_info e ON e.id = m.escola_id "
+        f"WHERE {_filtro_matriculas()} AND m.id > ? ORDER BY m.id LIMIT ?"
+    )
+    ultimo = 0
+    while True:
+        with banco.conexao() as con:
+            linhas = con.execute(sql, (escola_id, ano_letivo, *STATUS_SEM_VAGA, ultimo, tamanho_bloco)).fetchall()
+        if not linhas:
+            return
+        yield [{nome: _converter(tipo, linha[nome]) for nome, _, tipo in colunas} for linha in linhas]
+        ultimo = linhas[-1]['matricula_id']
+
+
+# ==============================================================================
+# ESCRITORES (CONSOMEM BLOCOS E DEVOLVEM QUANTAS LINHAS GRAVARAM)
+# ==============================================================================
+def escrever_csv(blocos, caminho):
+    with open(caminho, 'w', encoding='utf-8-sig', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=[nome for nome, _, _ in colunas_exportacao()], delimiter=';')
+        escritor.writeheader()
+        for bloco in blocos:
+            escritor.writerows(bloco)
+            yield len(bloco)
+
+
+def escrever_parquet(blocos, caminho):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("A exportação em Parquet requer o pacote pyarrow (pip install pyarrow).")
+
+    tipos = {'INTEGER': pa.int64(), 'REAL': pa.float64(), 'TEXT': pa.string(), 'DATE': pa.date32(), 'BOOL': pa.bool_()}
+    esquema = pa.schema([(nome, tipos[tipo]) for nome, _, tipo in colunas_exportacao()])
+    # Um row group por bloco: o arquivo cresce sem montar a tabela inteira em memória
+    with pq.ParquetWriter(caminho, esquema) as escritor:
+        for bloco in blocos:
+            escritor.write_table(pa.Table.from_pylist(bloco, schema=esquema))
+            yield len(bloco)
+
+
+def _campo_censo(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return '1' if valor else '0'
+    if isinstance(valor, date):
+        return valor.strftime('%d/%m/%Y')
+    return re.sub(r'[|\r\n]+', ' ', str(valor)).strip()
+
+
+def escrever_censo(blocos, caminho):
+    with open(caminho, 'w', encoding='utf-8', newline='') as f:
+        escola_atual = None
+        for bloco in blocos:
+            linhas = []
+            for registro in bloco:
+                registro = dict(registro, etapa_cod=codigo_da_etapa(registro['etapa_label']))
+                if registro.get('cpf'):
+                    registro['cpf'] = re.sub(r'\D', '', registro['cpf'])
+                for campo, codigos in CODIGOS_CENSO.items():
+                    registro[campo] = codigos.get(registro.get(campo), registro.get(campo))
+                if registro['escola_id'] != escola_atual:
+                    escola_atual = registro['escola_id']
+                    linhas.append('|'.join(['00'] + [_campo_censo(registro.get(c)) for c in LEIAUTE_CENSO['00']]))
+                for tipo in ('30', '60'):
+                    linhas.append('|'.join([tipo] + [_campo_censo(registro.get(c)) for c in LEIAUTE_CENSO[tipo]]))
+            f.write('\n'.join(linhas) + '\n')
+            yield len(bloco)
+
+
+ESCRITORES = {'censo': escrever_censo, 'csv': escrever_csv, 'parquet': escrever_parquet}
+
+
+def exportar(banco, formato, escola_ids, ano_letivo, caminho=None, ao_progresso=None, cancelado=None,
+             tamanho_bloco=TAMANHO_BLOCO_EXPORTACAO):
+    # Grava num arquivo ".parcial" e só renomeia no fim: um arquivo com o nome final
+    # está sempre completo. Devolve {'caminho', 'registros'} ou None se cancelada.
+    if caminho is None:
+        os.makedirs(CAMINHO_EXPORTACOES, exist_ok=True)
+        caminho = os.path.join(
+            CAMINHO_EXPORTACOES, f"educacenso_{ano_letivo}_{time.strftime('%Y%m%d_%H%M%S')}{_EXTENSOES[formato]}"
+        )
+    total = contar_registros(banco, escola_ids, ano_letivo)
+    parcial = caminho + '.parcial'
+    blocos = (bloco for escola_id in escola_ids for bloco in registros(banco, escola_id, ano_letivo, tamanho_bloco))
+    escritor = ESCRITORES[formato](blocos, parcial)
+
+    gravados = 0
+    try:
+        for quantidade in escritor:
+            gravados += quantidade
+            if ao_progresso:
+                ao_progresso(gravados, total)
+            if cancelado and cancelado():
+                escritor.close()
+                os.remove(parcial)
+                return None
+    except BaseException:
+        escritor.close()
+        if os.path.exists(parcial):
+            os.remove(parcial)
+        raise
+    os.replace(parcial, caminho)
+    return {'caminho': caminho, 'registros': gravados}
+
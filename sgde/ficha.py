@@ -0,0 +1,196 @@
+from array import array
+from collections.abc import Mapping
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from sgde.banco import TABELAS
+
+# ==============================================================================
+# FICHA CADASTRAL DO ALUNO (ARMAZENAMENTO COLUNAR EM MEMÓRIA)
+# ==============================================================================
+# A ficha tem ~40 campos por aluno; um dict por aluno custa ~2 KB só de estrutura.
+# FichasAlunos guarda cada campo numa coluna própria: campos de domínio fechado ou
+# muito repetidos viram códigos inteiros (categorias), datas viram ordinais em
+# array('i'), booleanos array('b') e o restante fica numa lista simples. Para o
+# resto do código continua parecendo um dict id -> registro: fichas[id] devolve uma
+# vista da linha que se lê como um dict (aluno['nome_completo'], aluno.get(...)).
+
+# Valores dos campos de domínio fechado, na ordem dos formulários (para sexo e
+# raça/cor, é também a ordem dos códigos do Educacenso)
+SEXOS = ["Masculino", "Feminino"]
+RACAS = ["Não declarado", "Branca", "Preta", "Parda", "Amarela", "Indígena"]
+UFS = [
+    "AC", "AL", "AP", "AM", "BA", "CE", "DF", "ES", "GO", "MA", "MT", "MS", "MG", "PA", "PB", "PR", "PE", "PI",
+    "RJ", "RN", "RS", "RO", "RR", "SC", "SP", "SE", "TO",
+]
+NIVEIS_APOIO = ["Nível 1", "Nível 2", "Nível 3"]
+TURNOS = ["Manhã", "Tarde", "Noite", "Integral"]
+
+CATEGORIAS = {
+    'sexo': SEXOS, 'raca_cor': RACAS, 'rg_uf': UFS, 'nivel_apoio': NIVEIS_APOIO, 'turno_preferido': TURNOS,
+}
+# Texto livre, mas com poucos valores distintos na rede: também codificado, com o
+# dicionário de valores montado conforme aparecem
+CAMPOS_REPETIDOS = ('nacionalidade', 'municipio_nascimento', 'cert_comarca', 'end_bairro', 'end_cidade')
+
+# Valores nulos nas colunas de array (datas: o ordinal 0 não existe; booleanos: -1)
+_DATA_NULA = 0
+_BOOL_NULO = -1
+_EPOCA = date(1970, 1, 1).toordinal()
+
+
+class RegistroAluno(Mapping):
+    # Vista de uma linha das fichas: sem dict próprio, lê as colunas sob demanda
+    __slots__ = ('_fichas', '_linha')
+
+    def __init__(self, fichas, linha):
+        self._fichas = fichas
+        self._linha = linha
+
+    def __getitem__(self, campo):
+        return self._fichas._valor(self._linha, campo)
+
+    def __iter__(self):
+        return iter(self._fichas.campos)
+
+    def __len__(self):
+        return len(self._fichas.campos)
+
+    def update(self, campos):
+        self._fichas.atualizar(self['id'], campos)
+
+    def __repr__(self):
+        return f"RegistroAluno({dict(self)!r})"
+
+
+class FichasAlunos(Mapping):
+    def __init__(self, colunas=TABELAS['alunos']):
+        self.campos = [campo for campo, _ in colunas]
+        self._tipos = dict(colunas)
+        self._linhas = {}
+        self._colunas = {}
+        # campo -> (valores por código, código por valor); o código 0 é o nulo
+        self._categorias = {}
+        for campo, tipo in colunas:
+            if campo in CATEGORIAS or campo in CAMPOS_REPETIDOS:
+                valores = [None] + list(CATEGORIAS.get(campo, ()))
+                self._categorias[campo] = (valores, {v: i for i, v in enumerate(valores)})
+                self._colunas[campo] = array('H' if campo in CATEGORIAS else 'I')
+            elif tipo == 'DATE':
+                self._colunas[campo] = array('i')
+            elif tipo == 'BOOL':
+                self._colunas[campo] = array('b')
+            else:
+                self._colunas[campo] = []
+
+    # --------------------------------------------------------------------------
+    # Codificação dos valores
+    # --------------------------------------------------------------------------
+    def _codificar(self, campo, valor):
+        if campo in self._categorias:
+            valores, codigos = self._categorias[campo]
+            if valor is None or valor == '':
+                return 0
+            codigo = codigos.get(valor)
+            if codigo is None:
+                # Valor fora da lista (importação, dado antigo): entra como nova categoria
+                codigo = codigos[valor] = len(valores)
+                valores.append(valor)
+            return codigo
+        tipo = self._tipos[campo]
+        if tipo == 'DATE':
+            if not valor:
+                return _DATA_NULA
+            return (valor if isinstance(valor, date) else date.fromisoformat(str(valor)[:10])).toordinal()
+        if tipo == 'BOOL':
+            return _BOOL_NULO if valor is None else int(bool(valor))
+        return valor
+
+    def _valor(self, linha, campo):
+        bruto = self._colunas[campo][linha]
+        if campo in self._categorias:
+            return self._categorias[campo][0][bruto]
+        tipo = self._tipos[campo]
+        if tipo == 'DATE':
+            return date.fromordinal(bruto) if bruto != _DATA_NULA else None
+        if tipo == 'BOOL':
+            return bool(bruto) if bruto != _BOOL_NULO else None
+        return bruto
+
+    # --------------------------------------------------------------------------
+    # Mapping id -> registro
+    # --------------------------------------------------------------------------
+    def __getitem__(self, aluno_id):
+        return RegistroAluno(self, self._linhas[aluno_id])
+
+    def __iter__(self):
+        # Itera uma cópia das chaves (list(dict) é uma cópia só, em C): values()/items()
+        # do Mapping passam por aqui e não quebram com inserções de outra thread
+        return iter(list(self._linhas))
+
+    def __len__(self):
+        return len(self._linhas)
+
+    def __contains__(self, aluno_id):
+        return aluno_id in self._linhas
+
+    def __setitem__(self, aluno_id, registro):
+        self.adicionar(dict(registro, id=aluno_id))
+
+    # --------------------------------------------------------------------------
+    # Escritas
+    # --------------------------------------------------------------------------
+    def adicionar(self, registro):
+        # Campos ausentes no registro ficam nulos; id repetido atualiza a linha
+        if registro['id'] in self._linhas:
+            self.atualizar(registro['id'], registro)
+            return
+        linha = len(self._colunas[self.campos[0]])
+        for campo in self.campos:
+            self._colunas[campo].append(self._codificar(campo, registro.get(campo)))
+        # O id só é publicado com todas as colunas preenchidas: quem o enxerga já lê a linha
+        self._linhas[registro['id']] = linha
+
+    def adicionar_varios(self, registros):
+        for registro in registros:
+            self.adicionar(registro)
+
+    def atualizar(self, aluno_id, campos):
+        linha = self._linhas[aluno_id]
+        for campo, valor in campos.items():
+            if campo in self._colunas:
+                self._colunas[campo][linha] = self._codificar(campo, valor)
+
+    # --------------------------------------------------------------------------
+    # Listagens
+    # --------------------------------------------------------------------------
+    def dataframe(self, campos=None):
+        # Monta o DataFrame direto das colunas, sem passar por um dict por aluno:
+        # categorias viram pd.Categorical, datas datetime64 e booleanos o tipo
+        # booleano anulável do pandas.
+        #
+        # Outra thread pode estar inserindo: o número de linhas é fixado antes (as
+        # colunas são preenchidas antes do id ser publicado, então todas têm ao menos n
+        # valores) e cada coluna é copiada por fatia, numa operação só. O numpy lê a
+        # cópia, nunca o buffer do array que ainda cresce.
+        n = len(self._linhas)
+        dados = {}
+        for campo in campos or self.campos:
+            coluna = self._colunas[campo][:n]
+            if campo in self._categorias:
+                codigos = np.frombuffer(coluna, dtype=np.uint16 if coluna.typecode == 'H' else np.uint32)
+                dados[campo] = pd.Categorical.from_codes(
+                    codigos.astype(np.int64) - 1, categories=self._categorias[campo][0][1:]
+                )
+            elif self._tipos[campo] == 'DATE':
+                ordinais = np.frombuffer(coluna, dtype=np.int32).astype(np.int64)
+                dias = np.where(ordinais == _DATA_NULA, np.iinfo(np.int64).min, ordinais - _EPOCA)
+                dados[campo] = dias.view('datetime64[D]')
+            elif self._tipos[campo] == 'BOOL':
+                valores = np.frombuffer(coluna, dtype=np.int8)
+                dados[campo] = pd.arrays.BooleanArray(valores == 1, valores == _BOOL_NULO)
+            else:
+                dados[campo] = coluna
+        return pd.DataFrame(dados)
@@ -0,0 +1,252 @@
+import csv
+import io
+import os
+import re
+import tempfile
+from functools import lru_cache
+
+import pandas as pd
+
+from sgde.busca import normalizar
+from sgde.regras import converter_data, validar_cpf, validar_idade_etapa, validar_nra, validar_ra
+from sgde.sequencias import registrar_nras_usados, reservar_nras
+
+# ==============================================================================
+# IMPORTAÇÃO EM LOTE DE FICHAS DE ALUNOS (CSV / EXCEL)
+# ==============================================================================
+# Linhas lidas, validadas e gravadas por vez; a memória usada fica limitada ao bloco
+TAMANHO_BLOCO = 2000
+
+# Cabeçalho normalizado (sem acento, minúsculo, "_" no lugar de espaço) -> campo do aluno
+CABECALHOS = {
+    'nome_completo': 'nome_completo', 'nome': 'nome_completo', 'nome_do_aluno': 'nome_completo',
+    'nome_social': 'nome_social',
+    'dt_nascimento': 'dt_nascimento', 'data_nascimento': 'dt_nascimento',
+    'data_de_nascimento': 'dt_nascimento', 'nascimento': 'dt_nascimento',
+    'ra': 'ra', 'registro_do_aluno': 'ra', 'nra': 'nra_gerado', 'nra_gerado': 'nra_gerado',
+    'cpf': 'cpf',
+    'etapa': 'etapa', 'tipo_etapa': 'etapa', 'etapa_mec': 'etapa', 'etapa_nome': 'etapa',
+    'turno': 'turno_preferido', 'turno_preferido': 'turno_preferido',
+    'ano_letivo': 'ano_letivo', 'ano': 'ano_letivo',
+    'sexo': 'sexo', 'raca_cor': 'raca_cor', 'cor_raca': 'raca_cor', 'raca': 'raca_cor',
+    'nacionalidade': 'nacionalidade', 'municipio_nascimento': 'municipio_nascimento', 'naturalidade': 'municipio_nascimento',
+    'educacenso': 'educacenso', 'id_educacenso': 'educacenso', 'nis': 'nis', 'cartao_sus': 'cartao_sus',
+    'filiacao_1': 'filiacao1', 'filiacao1': 'filiacao1', 'mae': 'filiacao1', 'nome_da_mae': 'filiacao1',
+    'filiacao_2': 'filiacao2', 'filiacao2': 'filiacao2', 'pai': 'filiacao2', 'nome_do_pai': 'filiacao2',
+    'logradouro': 'end_logradouro', 'endereco': 'end_logradouro', 'numero': 'end_numero', 'bairro': 'end_bairro',
+    'cep': 'end_cep', 'cidade': 'end_cidade', 'telefone': 'telefones', 'telefones': 'telefones',
+    'email': 'email', 'e_mail': 'email',
+}
+
+# Campos da ficha copiados da planilha como texto, sem regra de validação própria
+CAMPOS_TEXTO = (
+    'sexo', 'raca_cor', 'nacionalidade', 'municipio_nascimento', 'educacenso', 'nis', 'cartao_sus', 'filiacao1',
+    'filiacao2', 'end_logradouro', 'end_numero', 'end_bairro', 'end_cep', 'end_cidade', 'telefones', 'email',
+)
+
+
+@lru_cache(maxsize=256)
+def _campo_do_cabecalho(cabecalho):
+    return CABECALHOS.get(normalizar(cabecalho).replace(' ', '_'))
+
+
+def _tamanho(arquivo):
+    posicao = arquivo.tell()
+    arquivo.seek(0, io.SEEK_END)
+    tamanho = arquivo.tell()
+    arquivo.seek(posicao)
+    return tamanho or 1
+
+
+def _ler_blocos_csv(arquivo, tamanho_bloco):
+    # Detecta codificação e separador pelo começo do arquivo (planilhas brasileiras usam ";")
+    inicio = arquivo.read(8192)
+    arquivo.seek(0)
+    try:
+        amostra = inicio.decode('utf-8-sig')
+        codificacao = 'utf-8-sig'
+    except UnicodeDecodeError:
+        amostra = inicio.decode('latin-1')
+        codificacao = 'latin-1'
+    try:
+        separador = csv.Sniffer().sniff(amostra.split('\n', 1)[0], delimiters=';,\t|').delimiter
+    except csv.Error:
+        separador = ','
+
+    tamanho = _tamanho(arquivo)
+    leitor = pd.read_csv(
+        arquivo, sep=separador, dtype=str, encoding=codificacao, chunksize=tamanho_bloco, keep_default_na=False
+    )
+    for bloco in leitor:
+        yield bloco.to_dict('records'), arquivo.tell() / tamanho
+
+
+def _ler_blocos_excel(arquivo, tamanho_bloco):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("A importação de Excel requer o pacote openpyxl (pip install openpyxl).")
+
+    # read_only: as linhas são lidas sob demanda, sem montar a planilha inteira em memória
+    planilha = load_workbook(arquivo, read_only=True, data_only=True).active
+    linhas = planilha.iter_rows(values_only=True)
+    cabecalho = [str(c) if c is not None else '' for c in next(linhas, ())]
+    total = max((planilha.max_row or 1) - 1, 1)
+    bloco, lidas = [], 0
+    for valores in linhas:
+        if not any(v not in (None, '') for v in valores):
+            continue
+        bloco.append(dict(zip(cabecalho, valores)))
+        lidas += 1
+        if len(bloco) >= tamanho_bloco:
+            yield bloco, lidas / total
+            bloco = []
+    if bloco:
+        yield bloco, 1.0
+
+
+def ler_blocos(arquivo, nome_arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    # Gera (linhas do bloco como dicts, fração aproximada do arquivo já lida)
+    if nome_arquivo.lower().endswith(('.xlsx', '.xlsm')):
+        return _ler_blocos_excel(arquivo, tamanho_bloco)
+    return _ler_blocos_csv(arquivo, tamanho_bloco)
+
+
+def validar_linha(linha, documentos_vistos):
+    # Aplica as mesmas regras do formulário; devolve (aluno, lista de erros)
+    dados = {}
+    for cabecalho, valor in linha.items():
+        campo = _campo_do_cabecalho(cabecalho)
+        if campo and valor not in (None, ''):
+            dados[campo] = valor if not isinstance(valor, str) else valor.strip()
+
+    erros = []
+    nome = str(dados.get('nome_completo', '')).strip()
+    if not nome:
+        erros.append("Nome Completo obrigatório.")
+    dt_nascimento = converter_data(dados.get('dt_nascimento'))
+    if not dt_nascimento:
+        erros.append("Data de Nascimento ausente ou inválida.")
+
+    cpf = str(dados.get('cpf', '') or '')
+    if cpf:
+        if not validar_cpf(cpf):
+            erros.append("CPF inválido.")
+        elif ('cpf', re.sub(r'\D', '', cpf)) in documentos_vistos:
+            erros.append("CPF já cadastrado.")
+    ra = str(dados.get('ra', '') or '')
+    if ra:
+        if not validar_ra(ra):
+            erros.append("RA em formato inválido.")
+        elif ('ra', ra) in documentos_vistos:
+            erros.append("RA já cadastrado.")
+    # NRA vindo de outro sistema da rede: conferido pelo dígito verificador
+    nra = str(dados.get('nra_gerado', '') or '').upper()
+    if nra:
+        if not validar_nra(nra):
+            erros.append("NRA inválido.")
+        elif ('nra', nra) in documentos_vistos:
+            erros.append("NRA já cadastrado.")
+
+    if dt_nascimento and dados.get('etapa'):
+        ano_letivo = dados.get('ano_letivo')
+        ano_letivo = int(ano_letivo) if str(ano_letivo or '').strip().isdigit() else None
+        compativel, msg = validar_idade_etapa(dt_nascimento, str(dados['etapa']), ano_letivo)
+        if not compativel:
+            erros.append(msg)
+
+    if erros:
+        return None, erros
+
+    if cpf:
+        documentos_vistos.add(('cpf', re.sub(r'\D', '', cpf)))
+    if ra:
+        documentos_vistos.add(('ra', ra))
+    if nra:
+        documentos_vistos.add(('nra', nra))
+    return {
+        'nome_completo': nome, 'nome_social': dados.get('nome_social') or None,
+        'dt_nascimento': dt_nascimento, 'ra': ra or "N/A", 'cpf': cpf or None,
+        'turno_preferido': dados.get('turno_preferido') or None, 'nra_gerado': nra or None,
+        **{campo: str(dados[campo]) for campo in CAMPOS_TEXTO if campo in dados},
+    }, []
+
+
+def importar_alunos(repo, arquivo, nome_arquivo, tamanho_bloco=TAMANHO_BLOCO, ao_progresso=None, gerar_nras=False,
+                    retomar_de=None, cancelado=None):
+    # Lê, valida e grava bloco a bloco (um commit por bloco). As linhas rejeitadas vão
+    # para um CSV temporário em disco, que vira o relatório de erros para download.
+    # Com gerar_nras, cada bloco reserva de uma vez os NRAs de todos os seus alunos.
+    #
+    # ao_progresso(fração, estado) é chamado dentro da transação de cada bloco, e o
+    # estado (contadores e posição no relatório) serve de ponto de retomada:
+    # retomar_de=estado pula as linhas já gravadas e continua o mesmo relatório.
+    # Se cancelado() ficar verdadeiro, para depois do bloco atual e devolve None.
+    documentos_vistos = repo.documentos_alunos()
+
+    estado = dict(retomar_de or {'lidas': 0, 'importadas': 0, 'rejeitadas': 0, 'relatorio_erros': None})
+    if estado['relatorio_erros'] and os.path.exists(estado['relatorio_erros']):
+        # Descarta o que foi escrito no relatório depois do último bloco gravado
+        os.truncate(estado['relatorio_erros'], estado['posicao_relatorio'])
+        relatorio = open(estado['relatorio_erros'], 'a', encoding='utf-8-sig', newline='')
+        escritor = csv.writer(relatorio, delimiter=';')
+    else:
+        relatorio = tempfile.NamedTemporaryFile(
+            'w', suffix='.csv', prefix='erros_importacao_', delete=False, encoding='utf-8-sig', newline=''
+        )
+        escritor = csv.writer(relatorio, delimiter=';')
+        escritor.writerow(['linha', 'nome_completo', 'erros'])
+        estado['relatorio_erros'] = relatorio.name
+
+    pular = estado['lidas']
+    with relatorio:
+        for linhas, fracao in ler_blocos(arquivo, nome_arquivo, tamanho_bloco):
+            if pular >= len(linhas):
+                pular -= len(linhas)
+                continue
+            linhas, pular = linhas[pular:], 0
+            with repo.transacao():
+                validos = []
+                rejeitadas = []
+                for linha in linhas:
+                    estado['lidas'] += 1
+                    # +1 pelo cabeçalho: o número bate com a linha vista na planilha
+                    numero = estado['lidas'] + 1
+                    aluno, erros = validar_linha(linha, documentos_vistos)
+                    if erros:
+                        nome = next((v for k, v in linha.items() if _campo_do_cabecalho(k) == 'nome_completo'), '')
+                        rejeitadas.append((numero, nome, erros))
+                    else:
+                        validos.append((numero, aluno))
+                # NRAs da planilha: únicos na rede inteira, não só nesta escola
+                importados = {aluno['nra_gerado'] for _, aluno in validos if aluno['nra_gerado']}
+                em_uso = repo.banco.nras_existentes(importados) if importados else set()
+                if em_uso:
+                    for numero, aluno in validos:
+                        if aluno['nra_gerado'] in em_uso:
+                            rejeitadas.append((numero, aluno['nome_completo'], ["NRA já cadastrado na rede."]))
+                    validos = [(n, a) for n, a in validos if a['nra_gerado'] not in em_uso]
+                    rejeitadas.sort(key=lambda r: r[0])
+                for numero, nome, erros in rejeitadas:
+                    escritor.writerow([numero, nome, '; '.join(erros)])
+                estado['rejeitadas'] += len(rejeitadas)
+                validos = [aluno for _, aluno in validos]
+                if importados - em_uso:
+                    registrar_nras_usados(repo.banco, importados - em_uso)
+                sem_nra = [aluno for aluno in validos if not aluno['nra_gerado']]
+                if gerar_nras and sem_nra:
+                    for aluno, nra in zip(sem_nra, reservar_nras(repo.banco, len(sem_nra))):
+                        aluno['nra_gerado'] = nra
+                repo.inserir_alunos(validos)
+                estado['importadas'] += len(validos)
+                relatorio.flush()
+                estado['posicao_relatorio'] = relatorio.tell()
+                if ao_progresso:
+                    ao_progresso(fracao, dict(estado))
+            if cancelado and cancelado():
+                return None
+
+    return {
+        'lidas': estado['lidas'], 'importadas': estado['importadas'], 'rejeitadas': estado['rejeitadas'],
+        'relatorio_erros': estado['relatorio_erros'] if estado['rejeitadas'] else None,
+    }
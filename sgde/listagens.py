@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from sgde.metricas import medir
+
+# ==============================================================================
+# LISTAGENS EM CACHE (DATAFRAMES VERSIONADOS + FILTRO/ORDENAÇÃO NO SERVIDOR)
+# ==============================================================================
+# Quantas combinações (tabela, filtro, ordenação) filtradas/ordenadas ficam guardadas
+MAX_CONSULTAS_EM_CACHE = 32
+
+
+class CacheListagens:
+    # Guarda o DataFrame de cada tabela junto com a versão do Repositorio que o
+    # gerou: enquanto a tabela não muda, nenhum rerun reconstrói o DataFrame.
+    # Os DataFrames são compartilhados entre sessões e não devem ser alterados.
+    def __init__(self, repo):
+        self.repo = repo
+        self._lock = threading.Lock()
+        self._frames = {}
+        self._consultas = OrderedDict()
+
+    def dataframe(self, tabela):
+        versao = self.repo.versoes[tabela]
+        atual = self._frames.get(tabela)
+        if atual and atual[0] == versao:
+            return atual[1]
+        with self._lock, medir(f"dataframe: {tabela}", 'dataframe'):
+            fonte = getattr(self.repo, tabela)
+            # As fichas dos alunos já estão em colunas e montam o próprio DataFrame
+            if hasattr(fonte, 'dataframe'):
+                df = fonte.dataframe()
+            else:
+                df = pd.DataFrame.from_records(list(fonte.values()))
+            self._frames[tabela] = (versao, df)
+        return df
+
+    def historico_do_aluno(self, aluno_id):
+        # Linhas de matrícula do aluno direto do índice por aluno do Repositorio (O(k)
+        # nas matrículas dele): não depende do DataFrame da escola, que seria refeito a
+        # cada nova matrícula justamente no pico em que os históricos são consultados.
+        return pd.DataFrame.from_records(list(self.repo.matriculas_do_aluno(aluno_id)))
+
+    def consultar(self, tabela, colunas, filtro="", ordenar_por=None, crescente=True):
+        # Filtro (texto contido em qualquer coluna, sem diferenciar maiúsculas) e
+        # ordenação vetorizados no pandas; o resultado fica em cache por versão.
+        filtro = filtro.strip().lower()
+        chave = (tabela, self.repo.versoes[tabela], tuple(colunas), filtro, ordenar_por, crescente)
+        with self._lock:
+            if chave in self._consultas:
+                self._consultas.move_to_end(chave)
+                return self._consultas[chave]
+
+        with medir(f"consulta: {tabela}", 'dataframe'):
+            df = self._filtrar_ordenar(self.dataframe(tabela), colunas, filtro, ordenar_por, crescente)
+
+        with self._lock:
+            self._consultas[chave] = df
+            while len(self._consultas) > MAX_CONSULTAS_EM_CACHE:
+                self._consultas.popitem(last=False)
+        return df
+
+    def _filtrar_ordenar(self, df, colunas, filtro, ordenar_por, crescente):
+        if df.empty:
+            return pd.DataFrame(columns=colunas)
+        # reindex: registros antigos/novos podem não ter todas as colunas do esquema
+        df = df.reindex(columns=colunas)
+        if filtro:
+            mascara = pd.Series(False, index=df.index)
+            for coluna in colunas:
+                mascara |= df[coluna].astype(str).str.lower().str.contains(filtro, regex=False)
+            df = df[mascara]
+        if ordenar_por:
+            df = df.sort_values(ordenar_por, ascending=crescente, kind='stable')
+        return df
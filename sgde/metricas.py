@@ -0,0 +1,109 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# ==============================================================================
+# MÉTRICAS DE DESEMPENHO (TEMPOS POR VIEW, DATAFRAMES, VALIDAÇÕES E BANCO)
+# ==============================================================================
+# Coletor por processo: guarda as últimas amostras de cada medição (janela fixa,
+# memória constante) e os volumes enviados ao navegador. O painel de administração
+# lê o resumo; exportar() grava o resumo como JSON lines no log de métricas.
+AMOSTRAS_POR_MEDICAO = 1000
+CAMINHO_LOG_METRICAS = os.environ.get("SGDE_METRICAS_LOG", "sgde_metricas.log")
+
+logger = logging.getLogger("sgde.metricas")
+
+_lock = threading.Lock()
+_tempos = defaultdict(lambda: deque(maxlen=AMOSTRAS_POR_MEDICAO))
+_categorias = {}
+_chamadas = defaultdict(int)
+_volumes = defaultdict(lambda: [0, 0])  # nome -> [linhas, bytes]
+
+
+def registrar(nome, categoria, segundos):
+    with _lock:
+        _tempos[nome].append(segundos)
+        _chamadas[nome] += 1
+        _categorias[nome] = categoria
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s %s %.3f ms", categoria, nome, segundos * 1000)
+
+
+def registrar_volume(nome, linhas, tamanho_bytes):
+    # Linhas e bytes serializados para o navegador por uma listagem
+    with _lock:
+        volume = _volumes[nome]
+        volume[0] += linhas
+        volume[1] += tamanho_bytes
+
+
+@contextmanager
+def medir(nome, categoria):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(nome, categoria, time.perf_counter() - inicio)
+
+
+def medido(categoria, nome=None):
+    # Decorador: mede cada chamada da função com o nome qualificado dela
+    def decorador(funcao):
+        rotulo = nome or funcao.__qualname__
+
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                registrar(rotulo, categoria, time.perf_counter() - inicio)
+        return envoltorio
+    return decorador
+
+
+def _percentil(ordenados, fracao):
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * fracao))]
+
+
+def resumo():
+    # Uma linha por medição: chamadas, p50/p95/máximo (ms) da janela e volumes enviados
+    with _lock:
+        tempos = {nome: sorted(amostras) for nome, amostras in _tempos.items()}
+        chamadas = dict(_chamadas)
+        categorias = dict(_categorias)
+        volumes = {nome: tuple(v) for nome, v in _volumes.items()}
+    linhas = []
+    for nome, ordenados in tempos.items():
+        linhas_env, bytes_env = volumes.get(nome, (0, 0))
+        linhas.append({
+            'categoria': categorias[nome], 'nome': nome, 'chamadas': chamadas[nome],
+            'p50_ms': round(_percentil(ordenados, 0.50) * 1000, 3),
+            'p95_ms': round(_percentil(ordenados, 0.95) * 1000, 3),
+            'max_ms': round(ordenados[-1] * 1000, 3),
+            'linhas_enviadas': linhas_env, 'bytes_enviados': bytes_env,
+        })
+    return sorted(linhas, key=lambda l: (l['categoria'], l['nome']))
+
+
+def exportar(caminho=CAMINHO_LOG_METRICAS):
+    # Acrescenta o resumo atual ao log (uma linha JSON por medição, com timestamp)
+    agora = time.strftime("%Y-%m-%dT%H:%M:%S")
+    linhas = resumo()
+    with open(caminho, 'a', encoding='utf-8') as f:
+        for linha in linhas:
+            f.write(json.dumps(dict(linha, timestamp=agora), ensure_ascii=False) + "\n")
+    return len(linhas)
+
+
+def zerar():
+    with _lock:
+        _tempos.clear()
+        _categorias.clear()
+        _chamadas.clear()
+        _volumes.clear()
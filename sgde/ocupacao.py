@@ -0,0 +1,93 @@
+from collections import defaultdict
+
+from sgde.regras import calcular_capacidade_sala
+
+# ==============================================================================
+# OCUPAÇÃO E VAGAS AGREGADAS (POR TURMA, ETAPA, HORÁRIO E REGIONAL)
+# ==============================================================================
+# Status de matrícula que liberam a vaga na turma; os demais (Cursando, Aprovado,
+# Reprovado...) continuam contando em alunos_matriculados.
+STATUS_SEM_VAGA = ('Transferido', 'Cancelado')
+
+# Dimensões de agrupamento: nome -> função (turma, regional) -> chave do grupo
+DIMENSOES = {
+    'etapa': lambda turma, regional: turma['etapa_label'],
+    'horario': lambda turma, regional: turma['horario'],
+    'regional': lambda turma, regional: regional or "Não informada",
+}
+
+_CAMPOS = ('turmas', 'capacidade', 'capacidade_sala', 'ocupadas', 'vagas')
+
+
+def ocupa_vaga(status):
+    return status not in STATUS_SEM_VAGA
+
+
+def contribuicao_da_turma(turma, dependencia=None):
+    # Números da turma que entram nas somas dos grupos. A capacidade efetiva é a da
+    # turma limitada pela sala (metragem / 1.2) quando a dependência é conhecida.
+    capacidade = turma['capacidade_max'] or 0
+    capacidade_sala = 0
+    if dependencia and dependencia.get('metragem'):
+        capacidade_sala = calcular_capacidade_sala(dependencia['metragem'])
+        capacidade = min(capacidade, capacidade_sala)
+    ocupadas = turma['alunos_matriculados'] or 0
+    return {
+        'turmas': 1, 'capacidade': capacidade, 'capacidade_sala': capacidade_sala,
+        'ocupadas': ocupadas, 'vagas': max(capacidade - ocupadas, 0),
+    }
+
+
+def _com_taxas(numeros):
+    # Ocupação sobre a capacidade efetiva e uso da sala sobre a capacidade física
+    numeros = dict(numeros)
+    numeros['ocupacao'] = numeros['ocupadas'] / numeros['capacidade'] if numeros['capacidade'] else 0.0
+    numeros['utilizacao_sala'] = (
+        numeros['ocupadas'] / numeros['capacidade_sala'] if numeros['capacidade_sala'] else None
+    )
+    return numeros
+
+
+class AgregadosOcupacao:
+    # Somas mantidas incrementalmente: cada alteração de turma (nova turma, contador
+    # de matriculados, capacidade, sala) retira a contribuição antiga da turma dos
+    # seus grupos e soma a nova. Custo O(1) por alteração e leitura O(1) por grupo,
+    # sem varrer matrículas.
+    def __init__(self):
+        self._por_turma = {}
+        # (dimensão, ano) -> {chave do grupo: somas}
+        self._grupos = defaultdict(lambda: defaultdict(lambda: dict.fromkeys(_CAMPOS, 0)))
+        self._totais = defaultdict(lambda: dict.fromkeys(_CAMPOS, 0))
+
+    def _somar(self, turma_id, sinal):
+        ano, chaves, numeros = self._por_turma[turma_id]
+        for destino in [self._totais[ano]] + [self._grupos[(dimensao, ano)][chave] for dimensao, chave in chaves]:
+            for campo in _CAMPOS:
+                destino[campo] += sinal * numeros[campo]
+
+    def atualizar_turma(self, turma, dependencia=None, regional=None):
+        if turma['id'] in self._por_turma:
+            self._somar(turma['id'], -1)
+        chaves = tuple((dimensao, chave(turma, regional)) for dimensao, chave in DIMENSOES.items())
+        self._por_turma[turma['id']] = (turma['ano_letivo'], chaves, contribuicao_da_turma(turma, dependencia))
+        self._somar(turma['id'], 1)
+
+    # --------------------------------------------------------------------------
+    # Leitura
+    # --------------------------------------------------------------------------
+    def turma(self, turma_id):
+        registro = self._por_turma.get(turma_id)
+        return _com_taxas(registro[2]) if registro else None
+
+    def total(self, ano_letivo):
+        return _com_taxas(self._totais[ano_letivo]) if ano_letivo in self._totais else _com_taxas(dict.fromkeys(_CAMPOS, 0))
+
+    def grupos(self, dimensao, ano_letivo):
+        # {chave do grupo: números} da dimensão no ano, só com grupos que têm turmas
+        return {
+            chave: _com_taxas(numeros) for chave, numeros in list(self._grupos[(dimensao, ano_letivo)].items())
+            if numeros['turmas']
+        }
+
+    def anos(self):
+        return sorted(ano for ano, numeros in list(self._totais.items()) if numeros['turmas'])
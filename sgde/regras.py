@@ -0,0 +1,90 @@
+from datetime import date, datetime
+import re
+
+from sgde.metricas import medido
+from sgde.regras_etarias import tabela_cortes
+
+# ==============================================================================
+# FUNÇÕES AUXILIARES E REGRAS DE NEGÓCIO
+# ==============================================================================
+@medido('validacao')
+def validar_cnpj(cnpj):
+    # Validação simplificada para MVP (apenas numérico e tamanho)
+    cnpj_limpo = re.sub(r'\D', '', str(cnpj))
+    return len(cnpj_limpo) == 14 and cnpj_limpo.isdigit()
+
+@medido('validacao')
+def validar_cpf(cpf):
+    # 11 dígitos, não todos iguais, com os dois dígitos verificadores corretos
+    cpf_limpo = re.sub(r'\D', '', str(cpf))
+    if len(cpf_limpo) != 11 or cpf_limpo == cpf_limpo[0] * 11:
+        return False
+    for tamanho in (9, 10):
+        soma = sum(int(d) * peso for d, peso in zip(cpf_limpo[:tamanho], range(tamanho + 1, 1, -1)))
+        digito = (soma * 10) % 11 % 10
+        if digito != int(cpf_limpo[tamanho]):
+            return False
+    return True
+
+@medido('validacao')
+def validar_ra(ra):
+    # RA opcional; quando informado, de 4 a 15 caracteres alfanuméricos (hífen/ponto/barra permitidos)
+    if not ra or ra == "N/A":
+        return True
+    return re.fullmatch(r'[0-9A-Za-z][0-9A-Za-z.\-/]{3,14}', str(ra).strip()) is not None
+
+def converter_data(valor):
+    # Aceita date/datetime, "dd/mm/aaaa" e "aaaa-mm-dd" (planilhas do Educacenso/secretaria)
+    if not valor:
+        return None
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = str(valor).strip()[:10]
+    for formato in ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    return None
+
+def calcular_capacidade_sala(metragem):
+    # Regra: Metragem / 1.2
+    if metragem and metragem > 0:
+        return int(float(metragem) / 1.2)
+    return 0
+
+def gerar_codigo_turma(ano, etapa_cod, sequencial):
+    # Padrão XXX.YYY.ZZZ
+    xxx = str(ano)[-3:]
+    yyy = str(etapa_cod).zfill(3)
+    zzz = str(sequencial).zfill(3)
+    return f"{xxx}.{yyy}.{zzz}"
+
+def digito_verificador(numero):
+    # Módulo 11 com pesos 2..9 da direita para a esquerda (restos 0 e 1 viram 0)
+    soma = sum(int(d) * (2 + i % 8) for i, d in enumerate(reversed(str(numero))))
+    resto = soma % 11
+    return 0 if resto < 2 else 11 - resto
+
+def formatar_nra(ano, sequencial):
+    # NRA + ano (4) + sequencial do ano (7) + dígito verificador. O sequencial vem do
+    # alocador central (sgde.sequencias), então não há colisão entre sessões/processos.
+    corpo = f"{ano}{str(sequencial).zfill(7)}"
+    return f"NRA{corpo}{digito_verificador(corpo)}"
+
+@medido('validacao')
+def validar_nra(nra):
+    m = re.fullmatch(r'NRA(\d{11})(\d)', str(nra or ''))
+    return bool(m) and digito_verificador(m.group(1)) == int(m.group(2))
+
+@medido('validacao')
+def validar_idade_etapa(data_nascimento, tipo_etapa, ano_letivo=None):
+    # Regra etária do MEC pela tabela de datas de corte (sgde/dados/cortes_etarios.csv).
+    # tipo_etapa aceita o código ou o rótulo da etapa; sem ano letivo, usa o ano atual.
+    if not data_nascimento or not tipo_etapa:
+        return False, "Dados incompletos."
+    if isinstance(data_nascimento, datetime):
+        data_nascimento = data_nascimento.date()
+    return tabela_cortes().validar(data_nascimento, tipo_etapa, int(ano_letivo or datetime.now().year))
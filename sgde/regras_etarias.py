@@ -0,0 +1,144 @@
+import csv
+import os
+import re
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+from sgde.busca import normalizar
+
+# ==============================================================================
+# REGRAS ETÁRIAS DO MEC (TABELA DE DATAS DE CORTE POR ETAPA E ANO LETIVO)
+# ==============================================================================
+# Cada linha da tabela: etapa_cod, etapa_nome, ano_letivo, data_corte, idade_min, idade_max.
+# O aluno é elegível se, na data de corte, tiver entre idade_min e idade_max anos
+# completos (Resolução CNE/CEB nº 2/2018: corte em 31 de março do ano letivo).
+CAMINHO_CORTES = os.path.join(os.path.dirname(__file__), 'dados', 'cortes_etarios.csv')
+
+# Limites "sem restrição" para etapas que não estão na tabela
+_NASCIMENTO_MIN = np.datetime64('1900-01-01', 'D')
+_NASCIMENTO_MAX = np.datetime64('2999-12-31', 'D')
+
+# Palavras que não distinguem etapas: "Ensino Fundamental - Anos Iniciais" e
+# "Fundamental Anos Iniciais" têm a mesma chave
+_PALAVRAS_GENERICAS = {'educacao', 'ensino', 'de', 'da', 'do'}
+
+
+def codigo_da_etapa(etapa):
+    # Aceita o código (201) ou o rótulo usado nas turmas ("201 - Fundamental Anos Iniciais")
+    if isinstance(etapa, (int, np.integer)):
+        return int(etapa)
+    m = re.match(r'\s*(\d+)', str(etapa or ''))
+    return int(m.group(1)) if m else None
+
+
+def chave_do_nome(nome):
+    return ' '.join(p for p in normalizar(nome).split() if p not in _PALAVRAS_GENERICAS)
+
+
+def _anos_antes(data, anos):
+    try:
+        return data.replace(year=data.year - anos)
+    except ValueError:  # 29/02 em ano não bissexto
+        return data.replace(year=data.year - anos, day=28)
+
+
+def idade_na_data(data_nascimento, data_referencia):
+    return data_referencia.year - data_nascimento.year - (
+        (data_referencia.month, data_referencia.day) < (data_nascimento.month, data_nascimento.day)
+    )
+
+
+class TabelaCortes:
+    # As faixas de idade viram, na carga, faixas de data de nascimento:
+    # elegível  <=>  limite_inferior < nascimento <= limite_superior.
+    # Assim a consulta individual é um lookup em dict + duas comparações, e a
+    # consulta em lote compara arrays datetime64 de uma vez (broadcasting).
+    def __init__(self, linhas):
+        self._regras = {}
+        self._anos_por_etapa = {}
+        self._codigo_por_nome = {}
+        for linha in linhas:
+            chave = (int(linha['etapa_cod']), int(linha['ano_letivo']))
+            regra = {
+                'etapa_nome': linha['etapa_nome'],
+                'data_corte': date.fromisoformat(linha['data_corte']),
+                'idade_min': int(linha['idade_min']),
+                'idade_max': int(linha['idade_max']),
+            }
+            regra['nascimento_ate'] = _anos_antes(regra['data_corte'], regra['idade_min'])
+            regra['nascimento_depois_de'] = _anos_antes(regra['data_corte'], regra['idade_max'] + 1)
+            self._regras[chave] = regra
+            self._anos_por_etapa.setdefault(chave[0], []).append(chave[1])
+            self._codigo_por_nome[chave_do_nome(linha['etapa_nome'])] = chave[0]
+
+    @classmethod
+    def do_arquivo(cls, caminho=CAMINHO_CORTES):
+        with open(caminho, encoding='utf-8', newline='') as f:
+            return cls(list(csv.DictReader(f)))
+
+    def codigo(self, etapa):
+        # Código da etapa pelo número no início do rótulo ou, sem ele, pelo nome
+        # ("Ensino Fundamental - Anos Iniciais", "Infantil Creche"); None se não reconhecida
+        etapa_cod = codigo_da_etapa(etapa)
+        if etapa_cod is None:
+            etapa_cod = self._codigo_por_nome.get(chave_do_nome(etapa))
+        return etapa_cod
+
+    def regra(self, etapa, ano_letivo):
+        # Regra da etapa no ano; para anos fora da tabela, usa a do ano mais próximo
+        # com a data de corte trazida para o ano pedido.
+        etapa_cod = self.codigo(etapa)
+        regra = self._regras.get((etapa_cod, ano_letivo))
+        if regra is not None or etapa_cod not in self._anos_por_etapa:
+            return regra
+        mais_proximo = min(self._anos_por_etapa[etapa_cod], key=lambda ano: abs(ano - ano_letivo))
+        base = self._regras[(etapa_cod, mais_proximo)]
+        regra = dict(base, data_corte=base['data_corte'].replace(year=ano_letivo))
+        regra['nascimento_ate'] = _anos_antes(regra['data_corte'], regra['idade_min'])
+        regra['nascimento_depois_de'] = _anos_antes(regra['data_corte'], regra['idade_max'] + 1)
+        self._regras[(etapa_cod, ano_letivo)] = regra
+        return regra
+
+    def validar(self, data_nascimento, etapa, ano_letivo):
+        # Caminho individual: devolve (compatível?, mensagem)
+        if self.codigo(etapa) is None:
+            return False, f"Etapa não reconhecida: {etapa}."
+        regra = self.regra(etapa, ano_letivo)
+        if regra is None:
+            return True, "Idade compatível (etapa sem regra de corte cadastrada)."
+        if regra['nascimento_depois_de'] < data_nascimento <= regra['nascimento_ate']:
+            return True, "Idade compatível."
+        idade = idade_na_data(data_nascimento, regra['data_corte'])
+        corte = regra['data_corte'].strftime('%d/%m/%Y')
+        if data_nascimento > regra['nascimento_ate']:
+            return False, f"Aluno com {idade} anos em {corte}. Muito jovem para {regra['etapa_nome']}."
+        return False, f"Aluno com {idade} anos em {corte}. Idade acima do limite para {regra['etapa_nome']}."
+
+    def limites(self, chaves):
+        # Arrays (depois_de, ate) em datetime64[D] para uma lista de (etapa, ano_letivo)
+        depois_de = np.empty(len(chaves), dtype='datetime64[D]')
+        ate = np.empty(len(chaves), dtype='datetime64[D]')
+        for i, (etapa, ano_letivo) in enumerate(chaves):
+            if self.codigo(etapa) is None:
+                # Etapa não reconhecida: faixa vazia, ninguém é elegível
+                depois_de[i], ate[i] = _NASCIMENTO_MAX, _NASCIMENTO_MIN
+                continue
+            regra = self.regra(etapa, ano_letivo)
+            depois_de[i] = regra['nascimento_depois_de'] if regra else _NASCIMENTO_MIN
+            ate[i] = regra['nascimento_ate'] if regra else _NASCIMENTO_MAX
+        return depois_de, ate
+
+    def classificar(self, datas_nascimento, chaves):
+        # Caminho em lote: matriz booleana N x K (aluno x (etapa, ano_letivo)).
+        # Datas ausentes (None/NaT) nunca são elegíveis.
+        nascimentos = np.asarray(datas_nascimento, dtype='datetime64[D]')[:, None]
+        depois_de, ate = self.limites(chaves)
+        return (nascimentos > depois_de[None, :]) & (nascimentos <= ate[None, :])
+
+
+@lru_cache(maxsize=1)
+def tabela_cortes():
+    # Carregada uma vez por processo
+    return TabelaCortes.do_arquivo()
@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sgde.metricas import medir
+from sgde.ocupacao import contribuicao_da_turma
+
+# ==============================================================================
+# RELATÓRIOS DA REDE (AGREGAÇÃO PARALELA POR ESCOLA)
+# ==============================================================================
+# Cada escola é agregada à parte, com consultas restritas pelos índices de escola_id,
+# numa thread do pool e numa conexão própria do Banco (o SQLite libera o GIL enquanto
+# executa). Depois os resumos das escolas são somados por regional e para a rede.
+PARALELISMO_RELATORIOS = 8
+
+CAMPOS_SOMADOS = ('alunos', 'turmas', 'capacidade', 'ocupadas', 'vagas', 'transferidos', 'cancelados')
+
+
+def resumo_da_escola(banco, escola, ano_letivo):
+    escola_id = escola['id']
+    with banco.conexao() as con:
+        alunos = con.execute("SELECT COUNT(*) FROM alunos WHERE escola_id = ?", (escola_id,)).fetchone()[0]
+        turmas = con.execute(
+            "SELECT t.capacidade_max, t.alunos_matriculados, d.metragem FROM turmas t "
+            "LEFT JOIN dependencias d ON d.id = t.dependencia_id WHERE t.escola_id = ? AND t.ano_letivo = ?",
+            (escola_id, ano_letivo),
+        ).fetchall()
+        por_status = dict(con.execute(
+            "SELECT status_rendimento, COUNT(*) FROM matriculas WHERE escola_id = ? AND ano_letivo = ? "
+            "GROUP BY status_rendimento",
+            (escola_id, ano_letivo),
+        ).fetchall())
+
+    resumo = dict.fromkeys(CAMPOS_SOMADOS, 0)
+    resumo.update({
+        'escola_id': escola_id, 'escola': escola.get('nome_escola') or f"Escola {escola_id}",
+        'regional': escola.get('regional') or "Não informada", 'alunos': alunos,
+        'transferidos': por_status.get('Transferido', 0), 'cancelados': por_status.get('Cancelado', 0),
+    })
+    # Mesma regra de capacidade efetiva (turma x sala) do painel de vagas
+    for capacidade_max, matriculados, metragem in turmas:
+        numeros = contribuicao_da_turma(
+            {'capacidade_max': capacidade_max, 'alunos_matriculados': matriculados}, {'metragem': metragem}
+        )
+        for campo in ('turmas', 'capacidade', 'ocupadas', 'vagas'):
+            resumo[campo] += numeros[campo]
+    return resumo
+
+
+def _somar(resumos):
+    total = dict.fromkeys(CAMPOS_SOMADOS, 0)
+    for resumo in resumos:
+        for campo in CAMPOS_SOMADOS:
+            total[campo] += resumo[campo]
+    total['escolas'] = len(resumos)
+    total['ocupacao'] = total['ocupadas'] / total['capacidade'] if total['capacidade'] else 0.0
+    return total
+
+
+def relatorio_rede(banco, ano_letivo, regional=None, paralelismo=PARALELISMO_RELATORIOS):
+    # Devolve (resumo por escola, {regional: totais}, totais da rede)
+    escolas = banco.listar_escolas(regional)
+    with medir("relatorio_rede", 'relatorio'), ThreadPoolExecutor(max_workers=paralelismo) as executor:
+        por_escola = list(executor.map(lambda escola: resumo_da_escola(banco, escola, ano_letivo), escolas))
+
+    grupos = {}
+    for resumo in por_escola:
+        grupos.setdefault(resumo['regional'], []).append(resumo)
+    por_regional = {nome: _somar(resumos) for nome, resumos in sorted(grupos.items())}
+    return por_escola, por_regional, _somar(por_escola)
@@ -0,0 +1,397 @@
+import re
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from sgde.banco import ESCOLA_PADRAO
+from sgde.busca import IndiceBusca
+from sgde.ficha import FichasAlunos
+from sgde.metricas import medido
+from sgde.ocupacao import AgregadosOcupacao, contribuicao_da_turma
+from sgde.transporte import PlanejadorRotas
+
+# ==============================================================================
+# REPOSITÓRIO COM ÍNDICES EM MEMÓRIA (BUSCAS O(1) POR ID E CÓDIGO)
+# ==============================================================================
+# Carrega as tabelas do Banco uma vez e mantém dicionários id -> registro,
+# codigo -> turma, aluno_id -> matrículas e o índice de busca de alunos. Toda
+# escrita passa por aqui: grava no banco e atualiza os índices de forma
+# incremental, sem recarregar nada.
+#
+# Uma instância é compartilhada por todas as sessões do processo. Escritas e
+# sincronizações são serializadas por um lock; alterações feitas por outros
+# processos chegam pelo log de eventos do banco (sincronizar()), que recarrega
+# só os registros alterados e incrementa a versão das tabelas afetadas.
+#
+# Cada instância é a partição de uma escola: carrega, indexa e sincroniza só os
+# registros (e eventos) com o seu escola_id, e grava os novos já com ele.
+
+# Quantos ids por consulta "id IN (...)" ao recarregar registros alterados
+TAMANHO_LOTE_SINCRONIZACAO = 500
+
+
+class Repositorio:
+    def __init__(self, banco, escola_id=ESCOLA_PADRAO):
+        self.banco = banco
+        self.escola_id = escola_id
+        self.dependencias = {}
+        # Fichas dos alunos em colunas (sgde.ficha); lidas como um dict id -> registro
+        self.alunos = FichasAlunos()
+        self.turmas = {}
+        self.turmas_por_codigo = {}
+        self.matriculas = {}
+        self.matriculas_por_aluno = defaultdict(list)
+        self.busca = IndiceBusca()
+        # Ocupação/vagas somadas por turma, etapa, horário e regional (painel de vagas)
+        self.ocupacao = AgregadosOcupacao()
+        self.regional = None
+        # Rotas do transporte escolar: montadas na primeira consulta (planejador_transporte)
+        # e, daí em diante, replanejadas só para os alunos com matrícula ou endereço alterados
+        self._transporte = None
+        # Versão de cada tabela: incrementada a cada escrita, serve de chave para caches
+        self.versoes = defaultdict(int)
+        self._lock = threading.RLock()
+        self._profundidade = 0
+        self._ultimo_evento = 0
+        self.recarregar()
+
+    @medido('carga')
+    def recarregar(self):
+        # Eventos gravados durante a carga serão reaplicados no próximo sincronizar (idempotente)
+        self._ultimo_evento = self.banco.ultimo_evento()
+        self.dependencias = {d['id']: d for d in self._listar('dependencias')}
+        # Fichas carregadas em fluxo, sem a lista inteira de dicts em memória
+        self.alunos = FichasAlunos()
+        self.alunos.adicionar_varios(self.banco.iterar('alunos', "escola_id = ?", (self.escola_id,)))
+        self.busca = IndiceBusca()
+        self.busca.adicionar_varios(self.alunos.values())
+        self.turmas = {t['id']: t for t in self._listar('turmas')}
+        self.turmas_por_codigo = {t['codigo']: t for t in self.turmas.values()}
+        self.matriculas = {}
+        self.matriculas_por_aluno = defaultdict(list)
+        for m in self._listar('matriculas'):
+            self._indexar_matricula(m)
+        self.regional = self.banco.obter_escola_info(self.escola_id).get('regional')
+        self._reagregar()
+        self._transporte = None
+        self._alterou('dependencias', 'alunos', 'turmas', 'matriculas')
+
+    def _agregar_turma(self, turma):
+        self.ocupacao.atualizar_turma(turma, self.dependencias.get(turma['dependencia_id']), self.regional)
+
+    def _reagregar(self):
+        self.ocupacao = AgregadosOcupacao()
+        for turma in self.turmas.values():
+            self._agregar_turma(turma)
+
+    def _replanejar(self, aluno_ids, planejador=None):
+        # Turno da turma em curso de cada ano letivo do aluno -> planejador de rotas
+        planejador = planejador or self._transporte
+        if planejador is None:
+            return
+        for aluno_id in aluno_ids:
+            turnos = {}
+            for m in self.matriculas_do_aluno(aluno_id):
+                turma = self.turmas.get(m['turma_id'])
+                if m['status_rendimento'] == 'Cursando' and turma:
+                    turnos[m['ano_letivo']] = turma['horario']
+            planejador.atualizar_aluno(aluno_id, self.alunos.get(aluno_id), turnos)
+
+    def planejador_transporte(self):
+        with self._lock:
+            if self._transporte is None:
+                planejador = PlanejadorRotas()
+                # Só alunos com alguma matrícula podem ter turno e, portanto, rota
+                self._replanejar(list(self.matriculas_por_aluno), planejador)
+                self._transporte = planejador
+            return self._transporte
+
+    def _listar(self, tabela):
+        return self.banco.listar(tabela, "escola_id = ?", (self.escola_id,))
+
+    def _da_escola(self, registro):
+        registro['escola_id'] = self.escola_id
+        return registro
+
+    def _alterou(self, *tabelas):
+        for tabela in tabelas:
+            self.versoes[tabela] += 1
+
+    def _indexar_matricula(self, matricula):
+        self.matriculas[matricula['id']] = matricula
+        self.matriculas_por_aluno[matricula['aluno_id']].append(matricula)
+
+    # --------------------------------------------------------------------------
+    # Sincronização com o log de eventos do banco
+    # --------------------------------------------------------------------------
+    def sincronizar(self):
+        # Aplica as alterações gravadas por outros processos desde a última
+        # sincronização; devolve o conjunto de tabelas alteradas.
+        with self._lock:
+            return self._sincronizar()
+
+    def _sincronizar(self):
+        eventos = self.banco.eventos_desde(self._ultimo_evento, self.escola_id)
+        if eventos is None:
+            # O log foi podado além do último evento visto: recarrega a partição toda
+            self.recarregar()
+            return {'dependencias', 'alunos', 'turmas', 'matriculas', 'escola_info'}
+        if not eventos:
+            return set()
+        ids_por_tabela = defaultdict(set)
+        for _, tabela, registro_id in eventos:
+            ids_por_tabela[tabela].add(registro_id)
+        for tabela, ids in ids_por_tabela.items():
+            if tabela in ('dependencias', 'alunos', 'turmas', 'matriculas'):
+                self._aplicar(tabela, self._carregar(tabela, sorted(ids)))
+        if 'escola_info' in ids_por_tabela:
+            # A regional é da escola inteira: se mudou, todas as turmas trocam de grupo
+            self.regional = self.banco.obter_escola_info(self.escola_id).get('regional')
+            self._reagregar()
+        self._ultimo_evento = eventos[-1][0]
+        self._alterou(*ids_por_tabela)
+        return set(ids_por_tabela)
+
+    def _carregar(self, tabela, ids):
+        registros = []
+        for i in range(0, len(ids), TAMANHO_LOTE_SINCRONIZACAO):
+            lote = ids[i:i + TAMANHO_LOTE_SINCRONIZACAO]
+            registros.extend(self.banco.listar(tabela, f"id IN ({', '.join('?' * len(lote))})", tuple(lote)))
+        return registros
+
+    def _aplicar(self, tabela, registros):
+        # Atualiza os registros existentes no lugar (quem guarda referência vê o dado
+        # novo) e indexa os que ainda não existiam
+        mapa = getattr(self, tabela)
+        novos_alunos = []
+        replanejar = set()
+        turmas_outro_turno = set()
+        for registro in registros:
+            atual = mapa.get(registro['id'])
+            if tabela == 'turmas' and atual is not None and atual['codigo'] != registro['codigo']:
+                self.turmas_por_codigo.pop(atual['codigo'], None)
+            if tabela == 'turmas' and atual is not None and atual['horario'] != registro['horario']:
+                turmas_outro_turno.add(registro['id'])
+            if atual is not None:
+                atual.update(registro)
+            elif tabela == 'matriculas':
+                self._indexar_matricula(registro)
+            else:
+                mapa[registro['id']] = atual = registro
+            if tabela == 'turmas':
+                self.turmas_por_codigo[atual['codigo']] = atual
+                self._agregar_turma(atual)
+            elif tabela == 'alunos':
+                novos_alunos.append(atual)
+                replanejar.add(registro['id'])
+            elif tabela == 'matriculas':
+                replanejar.add(registro['aluno_id'])
+        if novos_alunos:
+            self.busca.adicionar_varios(novos_alunos)
+        if turmas_outro_turno and self._transporte is not None:
+            # Turma mudou de turno: os alunos dela mudam de rota
+            replanejar.update(m['aluno_id'] for m in list(self.matriculas.values()) if m['turma_id'] in turmas_outro_turno)
+        self._replanejar(replanejar)
+        if tabela == 'dependencias':
+            # Metragem da sala muda a capacidade efetiva das turmas que a usam
+            alteradas = {r['id'] for r in registros}
+            for turma in list(self.turmas.values()):
+                if turma['dependencia_id'] in alteradas:
+                    self._agregar_turma(turma)
+
+    @contextmanager
+    def transacao(self):
+        # Transação de escrita do repositório: antes de escrever, aplica os eventos
+        # de outros processos (já com o lock do banco obtido, então nada se intercala)
+        # e, ao final, marca os próprios eventos como vistos. Se algo falhar depois de
+        # alguma escrita, o banco faz rollback e os índices em memória são recarregados;
+        # erros de validação levantados antes da primeira escrita (turma sem vagas)
+        # só fazem o rollback, sem recarregar a escola.
+        with self._lock:
+            if self._profundidade:
+                self._profundidade += 1
+                try:
+                    with self.banco.transacao() as con:
+                        yield con
+                finally:
+                    self._profundidade -= 1
+                return
+
+            self._profundidade = 1
+            alteracoes = None
+            try:
+                with self.banco.transacao() as con:
+                    self._sincronizar()
+                    alteracoes = con.total_changes
+                    yield con
+                    self._ultimo_evento = con.execute("SELECT COALESCE(MAX(id), 0) FROM eventos").fetchone()[0]
+            except BaseException:
+                # Sem nenhuma linha gravada, os índices (que só mudam depois do banco) estão intactos
+                if alteracoes is None or con.total_changes != alteracoes:
+                    self.recarregar()
+                raise
+            finally:
+                self._profundidade = 0
+
+    # --------------------------------------------------------------------------
+    # Consultas
+    # --------------------------------------------------------------------------
+    def obter_aluno(self, aluno_id):
+        return self.alunos.get(aluno_id)
+
+    def obter_dependencia(self, dependencia_id):
+        return self.dependencias.get(dependencia_id)
+
+    def obter_turma(self, turma_id):
+        return self.turmas.get(turma_id)
+
+    def turma_por_codigo(self, codigo):
+        return self.turmas_por_codigo.get(codigo)
+
+    @medido('busca')
+    def buscar_alunos(self, consulta, limite=10, pagina=0):
+        return self.busca.buscar(consulta, limite, pagina)
+
+    def documentos_alunos(self):
+        # CPFs (só dígitos), RAs e NRAs já cadastrados, lidos sob o lock para não cruzar
+        # com um cadastro em andamento
+        with self._lock:
+            documentos = set()
+            for aluno in self.alunos.values():
+                if aluno.get('cpf'):
+                    documentos.add(('cpf', re.sub(r'\D', '', aluno['cpf'])))
+                if aluno.get('ra') and aluno['ra'] != "N/A":
+                    documentos.add(('ra', aluno['ra']))
+                if aluno.get('nra_gerado'):
+                    documentos.add(('nra', aluno['nra_gerado']))
+            return documentos
+
+    def matriculas_do_aluno(self, aluno_id):
+        # Usa .get para não criar listas vazias no defaultdict a cada consulta
+        return self.matriculas_por_aluno.get(aluno_id, [])
+
+    # --------------------------------------------------------------------------
+    # Escritas (banco + índices)
+    # --------------------------------------------------------------------------
+    def inserir_dependencia(self, dependencia):
+        with self.transacao():
+            self.banco.inserir('dependencias', self._da_escola(dependencia))
+            self.dependencias[dependencia['id']] = dependencia
+            self._alterou('dependencias')
+        return dependencia
+
+    def salvar_escola_info(self, dados):
+        with self.transacao():
+            self.banco.salvar_escola_info(dados, self.escola_id)
+            if dados.get('regional') != self.regional:
+                # A regional é da escola inteira: todas as turmas trocam de grupo
+                self.regional = dados.get('regional')
+                self._reagregar()
+            self._alterou('escola_info')
+        return dados
+
+    def cadastrar_escola(self, escola):
+        # A nova escola tem partição própria; passar pela transação do repositório só
+        # mantém o evento gravado fora do que esta sessão trata como alteração alheia
+        with self.transacao():
+            self.banco.inserir('escola_info', escola)
+        return escola
+
+    def inserir_aluno(self, aluno):
+        with self.transacao():
+            self.banco.inserir('alunos', self._da_escola(aluno))
+            self.alunos.adicionar(aluno)
+            self.busca.adicionar(aluno)
+            self._alterou('alunos')
+        return aluno
+
+    def inserir_alunos(self, alunos):
+        # Lote de alunos num único commit (importação de planilhas)
+        with self.transacao():
+            self.banco.inserir_varios('alunos', [self._da_escola(aluno) for aluno in alunos])
+            self.alunos.adicionar_varios(alunos)
+            self.busca.adicionar_varios(alunos)
+            self._alterou('alunos')
+        return alunos
+
+    def atualizar_aluno(self, aluno_id, campos):
+        with self.transacao():
+            self.banco.atualizar('alunos', aluno_id, campos)
+            self.alunos.atualizar(aluno_id, campos)
+            self.busca.adicionar(self.alunos[aluno_id])
+            self._replanejar([aluno_id])
+            self._alterou('alunos')
+
+    def inserir_turma(self, turma):
+        with self.transacao():
+            self.banco.inserir('turmas', self._da_escola(turma))
+            self.turmas[turma['id']] = turma
+            self.turmas_por_codigo[turma['codigo']] = turma
+            self._agregar_turma(turma)
+            self._alterou('turmas')
+        return turma
+
+    def _conferir_vagas(self, turma, quantidade=1):
+        # Chamado dentro da transação e antes de qualquer escrita: com o lock de escrita
+        # obtido e os eventos de outros processos aplicados, o contador da turma é o
+        # definitivo, e a recusa não obriga a recarregar a escola
+        if quantidade > contribuicao_da_turma(turma, self.obter_dependencia(turma['dependencia_id']))['vagas']:
+            raise ValueError(f"A turma {turma['codigo']} não tem mais vagas.")
+
+    def registrar_matricula(self, matricula):
+        with self.transacao():
+            turma = self.turmas[matricula['turma_id']]
+            self._conferir_vagas(turma)
+            self.banco.registrar_matricula(self._da_escola(matricula))
+            self._indexar_matricula(matricula)
+            turma['alunos_matriculados'] += 1
+            self._agregar_turma(turma)
+            self._replanejar([matricula['aluno_id']])
+            self._alterou('matriculas', 'turmas')
+        return matricula
+
+    def registrar_matriculas(self, matriculas):
+        with self.transacao():
+            self.banco.registrar_matriculas([self._da_escola(m) for m in matriculas])
+            for matricula in matriculas:
+                self._indexar_matricula(matricula)
+                self.turmas[matricula['turma_id']]['alunos_matriculados'] += 1
+            for turma_id in {m['turma_id'] for m in matriculas}:
+                self._agregar_turma(self.turmas[turma_id])
+            self._replanejar({m['aluno_id'] for m in matriculas})
+            self._alterou('matriculas', 'turmas')
+        return matriculas
+
+    def alterar_status_matricula(self, matricula_id, status):
+        # Transferido/Cancelado liberam a vaga; o contador e os agregados acompanham
+        with self.transacao():
+            delta = self.banco.alterar_status_matricula(matricula_id, status)
+            matricula = self.matriculas[matricula_id]
+            matricula['status_rendimento'] = status
+            if delta:
+                turma = self.turmas[matricula['turma_id']]
+                turma['alunos_matriculados'] += delta
+                self._agregar_turma(turma)
+            self._replanejar([matricula['aluno_id']])
+            self._alterou('matriculas', 'turmas')
+        return matricula
+
+    def cancelar_matricula(self, matricula_id):
+        return self.alterar_status_matricula(matricula_id, 'Cancelado')
+
+    def transferir_matricula(self, matricula_id, turma_destino_id, data_matricula):
+        # Encerra a matrícula atual como "Transferido" e abre outra na turma de
+        # destino, as duas na mesma transação; sem vaga no destino, nenhuma das duas fica
+        with self.transacao():
+            destino = self.turmas[turma_destino_id]
+            if self.matriculas[matricula_id]['turma_id'] != turma_destino_id:
+                self._conferir_vagas(destino)
+            origem = self.alterar_status_matricula(matricula_id, 'Transferido')
+            return self.registrar_matricula({
+                'aluno_id': origem['aluno_id'],
+                'turma_id': destino['id'],
+                'turma_codigo': destino['codigo'],
+                'ano_letivo': destino['ano_letivo'],
+                'data_matricula': data_matricula,
+                'status_rendimento': 'Cursando',
+            })
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from sgde.regras import formatar_nra, gerar_codigo_turma
+
+# ==============================================================================
+# ALOCADOR CENTRAL DE SEQUÊNCIAS (NRA E CÓDIGO DE TURMA)
+# ==============================================================================
+# Os números vêm da tabela `sequencias` do banco, e não de len(lista) + 1 ou do
+# relógio: cada reserva é atômica entre threads e processos. Jobs em lote
+# reservam um bloco inteiro de uma vez (uma transação para milhares de números).
+
+
+def _semente_nra(ano):
+    # Maior sequencial de NRA do ano já gravado (bancos anteriores ao contador)
+    def ultimo_sequencial(con):
+        linha = con.execute(
+            "SELECT MAX(CAST(substr(nra_gerado, 8, 7) AS INTEGER)) FROM alunos WHERE nra_gerado LIKE ?",
+            (f"NRA{ano}%",),
+        ).fetchone()
+        return linha[0] or 0
+    return ultimo_sequencial
+
+
+def reservar_nras(banco, quantidade, ano=None):
+    ano = ano or datetime.now().year
+    return [
+        formatar_nra(ano, seq)
+        for seq in banco.reservar_sequencia(f"nra:{ano}", quantidade, semente=_semente_nra(ano))
+    ]
+
+
+def registrar_nras_usados(banco, nras):
+    # NRAs que não saíram do alocador (importados de outro sistema): o contador de
+    # cada ano passa do maior sequencial usado. NRA = "NRA" + ano (4) + sequencial (7) + DV
+    maiores = {}
+    for nra in nras:
+        ano, sequencial = int(nra[3:7]), int(nra[7:14])
+        maiores[ano] = max(maiores.get(ano, 0), sequencial)
+    for ano, sequencial in maiores.items():
+        banco.avancar_sequencia(f"nra:{ano}", sequencial, semente=_semente_nra(ano))
+
+
+def gerar_nra(banco, ano=None):
+    return reservar_nras(banco, 1, ano)[0]
+
+
+# ZZZ tem três dígitos: o maior sequencial de turma por ano e etapa. O código
+# XXX.YYY.ZZZ não tem a escola e é único na rede (idx_turmas_codigo), então o
+# limite vale para a rede inteira, somadas todas as escolas
+MAX_SEQUENCIAL_TURMA = 999
+
+
+def gerar_codigo_turma_unico(banco, ano, etapa_cod):
+    # Sequência própria para cada ano e etapa (o prefixo XXX.YYY do código),
+    # compartilhada pelas escolas da rede; na primeira vez, parte do maior ZZZ já
+    # usado com esse prefixo
+    prefixo = gerar_codigo_turma(ano, etapa_cod, 0)[:-3]
+
+    def ultimo_sequencial(con):
+        linha = con.execute(
+            "SELECT MAX(CAST(substr(codigo, ?) AS INTEGER)) FROM turmas WHERE codigo LIKE ?",
+            (len(prefixo) + 1, prefixo + '%'),
+        ).fetchone()
+        return linha[0] or 0
+
+    sequencial = banco.reservar_sequencia(f"turma:{ano}:{etapa_cod}", 1, semente=ultimo_sequencial)[0]
+    if sequencial > MAX_SEQUENCIAL_TURMA:
+        raise ValueError(
+            f"A rede atingiu o limite de {MAX_SEQUENCIAL_TURMA} turmas para o ano {ano} e a etapa {etapa_cod} "
+            f"(códigos {prefixo}001 a {prefixo}{MAX_SEQUENCIAL_TURMA}), somadas todas as escolas."
+        )
+    return gerar_codigo_turma(ano, etapa_cod, sequencial)
@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sgde.exportacao import exportar
+from sgde.importacao import importar_alunos
+from sgde.metricas import medir
+
+# ==============================================================================
+# FILA DE TAREFAS EM SEGUNDO PLANO (ESTADO PERSISTIDO NO BANCO)
+# ==============================================================================
+# Operações pesadas (importação, exportação) rodam num pool de threads do processo,
+# fora da execução do script do Streamlit: a página só enfileira a tarefa e acompanha
+# o progresso lendo a tabela `tarefas`. Como o estado fica no banco, qualquer sessão
+# ou processo vê as tarefas da escola, pode pedir o cancelamento e retomar uma tarefa
+# cancelada, que falhou ou que foi interrompida (processo reiniciado) a partir do
+# último ponto de retomada gravado por ela.
+CAMINHO_TAREFAS = os.environ.get("SGDE_TAREFAS", "tarefas")
+
+# Threads do pool: o trabalho pesado (SQLite, leitura de planilhas, escrita de
+# Parquet) roda em código nativo que libera o GIL, então as tarefas usam vários núcleos
+TRABALHADORES_TAREFAS = min(os.cpu_count() or 1, 4)
+
+# Cada processo renova periodicamente o sinal de vida das tarefas que executa; uma
+# tarefa ativa sem sinal há mais que o prazo é de um processo que morreu
+INTERVALO_SINAL = 10
+PRAZO_SEM_SINAL = 60
+
+PENDENTE, EXECUTANDO, CONCLUIDA = 'pendente', 'executando', 'concluida'
+FALHOU, CANCELADA, INTERROMPIDA = 'falhou', 'cancelada', 'interrompida'
+ESTADOS_ATIVOS = (PENDENTE, EXECUTANDO)
+ESTADOS_RETOMAVEIS = (FALHOU, CANCELADA, INTERROMPIDA)
+ROTULOS_ESTADO = {
+    PENDENTE: "Na fila", EXECUTANDO: "Em execução", CONCLUIDA: "Concluída",
+    FALHOU: "Falhou", CANCELADA: "Cancelada", INTERROMPIDA: "Interrompida",
+}
+
+# Tipo -> (rótulo, função(contexto, **parametros)); a função devolve o resultado
+# (serializável em JSON) ou None quando parou por um pedido de cancelamento
+TIPOS_TAREFA = {}
+
+_JSON = ('parametros', 'checkpoint', 'resultado')
+
+logger = logging.getLogger("sgde.tarefas")
+
+
+def tipo_tarefa(nome, rotulo):
+    def registrar(funcao):
+        TIPOS_TAREFA[nome] = (rotulo, funcao)
+        return funcao
+    return registrar
+
+
+def guardar_arquivo(arquivo, nome):
+    # Cópia em disco (em blocos) de um arquivo enviado, para a tarefa ler depois da
+    # sessão e poder ser retomada
+    pasta = os.path.join(CAMINHO_TAREFAS, "entradas")
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, f"{uuid.uuid4().hex}_{os.path.basename(nome)}")
+    arquivo.seek(0)
+    with open(caminho, 'wb') as destino:
+        shutil.copyfileobj(arquivo, destino, 1024 * 1024)
+    return caminho
+
+
+def _tarefa(linha):
+    tarefa = dict(linha)
+    for campo in _JSON:
+        tarefa[campo] = json.loads(tarefa[campo]) if tarefa[campo] else None
+    tarefa['rotulo'] = TIPOS_TAREFA[tarefa['tipo']][0] if tarefa['tipo'] in TIPOS_TAREFA else tarefa['tipo']
+    return tarefa
+
+
+class ContextoTarefa:
+    # Entregue à função da tarefa: ponto de retomada anterior, progresso e cancelamento
+    def __init__(self, fila, tarefa):
+        self.fila = fila
+        self.banco = fila.banco
+        self.tarefa_id = tarefa['id']
+        self.escola_id = tarefa['escola_id']
+        self.checkpoint = tarefa['checkpoint']
+        self._cancelamento = bool(tarefa['cancelamento'])
+
+    def repositorio(self):
+        return self.fila.repositorio(self.escola_id)
+
+    def progresso(self, fracao, mensagem=None, checkpoint=None):
+        # Chamado dentro da transação de um bloco, o ponto de retomada é gravado no
+        # mesmo commit do bloco: ao retomar, nada é gravado duas vezes nem perdido.
+        # Também traz o pedido de cancelamento feito por outra sessão ou processo.
+        if checkpoint is not None:
+            self.checkpoint = checkpoint
+        with self.banco.transacao() as con:
+            self._cancelamento = bool(con.execute(
+                "UPDATE tarefas SET progresso = ?, mensagem = COALESCE(?, mensagem), "
+                "checkpoint = COALESCE(?, checkpoint), atualizada_em = ? WHERE id = ? RETURNING cancelamento",
+                (min(max(fracao, 0.0), 1.0), mensagem, json.dumps(checkpoint) if checkpoint is not None else None,
+                 time.time(), self.tarefa_id),
+            ).fetchone()[0])
+
+    def cancelado(self):
+        return self._cancelamento or self.tarefa_id in self.fila._cancelamentos
+
+
+class FilaTarefas:
+    # Um objeto por processo (cacheado pelo app). repositorio(escola_id) devolve o
+    # Repositorio compartilhado da escola, para as escritas das tarefas atualizarem
+    # os mesmos índices em memória usados pelas sessões.
+    def __init__(self, banco, repositorio, trabalhadores=TRABALHADORES_TAREFAS):
+        self.banco = banco
+        self.repositorio = repositorio
+        self.dono = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="sgde-tarefa")
+        self._cancelamentos = set()
+        self._marcar_abandonadas()
+        threading.Thread(target=self._sinal_de_vida, daemon=True, name="sgde-tarefas-sinal").start()
+
+    # --------------------------------------------------------------------------
+    # Sinal de vida e tarefas abandonadas
+    # --------------------------------------------------------------------------
+    def _marcar_abandonadas(self):
+        with self.banco.transacao() as con:
+            con.execute(
+                f"UPDATE tarefas SET estado = ?, mensagem = 'Processo encerrado durante a execução.' "
+                f"WHERE estado IN ({', '.join('?' * len(ESTADOS_ATIVOS))}) AND atualizada_em < ?",
+                (INTERROMPIDA, *ESTADOS_ATIVOS, time.time() - PRAZO_SEM_SINAL),
+            )
+
+    def _sinal_de_vida(self):
+        while True:
+            time.sleep(INTERVALO_SINAL)
+            try:
+                with self.banco.transacao() as con:
+                    con.execute(
+                        f"UPDATE tarefas SET atualizada_em = ? WHERE dono = ? "
+                        f"AND estado IN ({', '.join('?' * len(ESTADOS_ATIVOS))})",
+                        (time.time(), self.dono, *ESTADOS_ATIVOS),
+                    )
+                self._marcar_abandonadas()
+            except Exception:
+                logger.exception("Falha ao renovar o sinal de vida das tarefas")
+
+    # --------------------------------------------------------------------------
+    # Operações
+    # --------------------------------------------------------------------------
+    def enfileirar(self, tipo, escola_id, **parametros):
+        if tipo not in TIPOS_TAREFA:
+            raise ValueError(f"Tipo de tarefa desconhecido: {tipo}")
+        agora = time.time()
+        with self.banco.transacao() as con:
+            tarefa_id = con.execute(
+                "INSERT INTO tarefas (tipo, escola_id, parametros, estado, progresso, dono, criada_em, atualizada_em) "
+                "VALUES (?, ?, ?, ?, 0, ?, ?, ?)",
+                (tipo, escola_id, json.dumps(parametros), PENDENTE, self.dono, agora, agora),
+            ).lastrowid
+        self._executor.submit(self._executar, tarefa_id)
+        return tarefa_id
+
+    def cancelar(self, tarefa_id):
+        # Na fila, é cancelada na hora; em execução, para no próximo ponto de retomada
+        self._cancelamentos.add(tarefa_id)
+        with self.banco.transacao() as con:
+            con.execute(
+                "UPDATE tarefas SET cancelamento = 1, estado = CASE WHEN estado = ? THEN ? ELSE estado END, "
+                "atualizada_em = ? WHERE id = ?",
+                (PENDENTE, CANCELADA, time.time(), tarefa_id),
+            )
+
+    def retomar(self, tarefa_id):
+        # O UPDATE condicional garante que só uma sessão/processo retoma a tarefa
+        with self.banco.transacao() as con:
+            retomada = con.execute(
+                f"UPDATE tarefas SET estado = ?, cancelamento = 0, erro = NULL, dono = ?, atualizada_em = ? "
+                f"WHERE id = ? AND estado IN ({', '.join('?' * len(ESTADOS_RETOMAVEIS))})",
+                (PENDENTE, self.dono, time.time(), tarefa_id, *ESTADOS_RETOMAVEIS),
+            ).rowcount
+        if retomada:
+            self._cancelamentos.discard(tarefa_id)
+            self._executor.submit(self._executar, tarefa_id)
+        return bool(retomada)
+
+    def obter(self, tarefa_id):
+        with self.banco.conexao() as con:
+            linha = con.execute("SELECT * FROM tarefas WHERE id = ?", (tarefa_id,)).fetchone()
+        return _tarefa(linha) if linha else None
+
+    def listar(self, escola_id, tipo=None, limite=5):
+        # Tarefas mais recentes da escola (pelo índice (escola_id, id))
+        sql, parametros = "SELECT * FROM tarefas WHERE escola_id = ?", [escola_id]
+        if tipo:
+            sql += " AND tipo = ?"
+            parametros.append(tipo)
+        with self.banco.conexao() as con:
+            linhas = con.execute(sql + " ORDER BY id DESC LIMIT ?", parametros + [limite]).fetchall()
+        return [_tarefa(linha) for linha in linhas]
+
+    # --------------------------------------------------------------------------
+    # Execução (threads do pool)
+    # --------------------------------------------------------------------------
+    def _finalizar(self, tarefa_id, estado, **campos):
+        campos.update(estado=estado, atualizada_em=time.time())
+        if 'resultado' in campos:
+            campos['resultado'] = json.dumps(campos['resultado'])
+        with self.banco.transacao() as con:
+            con.execute(
+                f"UPDATE tarefas SET {', '.join(f'{c} = ?' for c in campos)} WHERE id = ?",
+                list(campos.values()) + [tarefa_id],
+            )
+
+    def _executar(self, tarefa_id):
+        with self.banco.transacao() as con:
+            linha = con.execute(
+                "UPDATE tarefas SET estado = ?, atualizada_em = ? WHERE id = ? AND estado = ? AND dono = ? RETURNING *",
+                (EXECUTANDO, time.time(), tarefa_id, PENDENTE, self.dono),
+            ).fetchone()
+        if linha is None:
+            # Cancelada enquanto esperava na fila (ou retomada por outro processo)
+            return
+        tarefa = _tarefa(linha)
+        contexto = ContextoTarefa(self, tarefa)
+        try:
+            with medir(f"tarefa: {tarefa['tipo']}", 'tarefa'):
+                resultado = TIPOS_TAREFA[tarefa['tipo']][1](contexto, **tarefa['parametros'])
+            if resultado is None and contexto.cancelado():
+                self._finalizar(tarefa_id, CANCELADA, mensagem="Cancelada pelo usuário.")
+            else:
+                self._finalizar(tarefa_id, CONCLUIDA, progresso=1.0, resultado=resultado)
+        except Exception as e:
+            logger.exception("Falha na tarefa %s (%s)", tarefa_id, tarefa['tipo'])
+            self._finalizar(tarefa_id, FALHOU, erro=str(e))
+        finally:
+            self._cancelamentos.discard(tarefa_id)
+
+
+# ==============================================================================
+# TIPOS DE TAREFA
+# ==============================================================================
+@tipo_tarefa('importacao_alunos', "Importação de alunos")
+def tarefa_importacao_alunos(contexto, arquivo, nome_arquivo, gerar_nras=False):
+    def ao_progresso(fracao, estado):
+        contexto.progresso(
+            fracao, f"{estado['lidas']} linhas lidas, {estado['importadas']} importadas", checkpoint=estado
+        )
+
+    with open(arquivo, 'rb') as f:
+        resumo = importar_alunos(
+            contexto.repositorio(), f, nome_arquivo, ao_progresso=ao_progresso, gerar_nras=gerar_nras,
+            retomar_de=contexto.checkpoint, cancelado=contexto.cancelado,
+        )
+    if resumo is not None:
+        os.remove(arquivo)
+    return resumo
+
+
+@tipo_tarefa('exportacao_educacenso', "Exportação Educacenso")
+def tarefa_exportacao_educacenso(contexto, formato, escola_ids, ano_letivo):
+    # O arquivo parcial é descartado ao cancelar, então retomar refaz a exportação
+    def ao_progresso(gravados, total):
+        contexto.progresso(gravados / total if total else 1.0, f"{gravados} de {total} matrícula(s)")
+
+    return exportar(
+        contexto.banco, formato, escola_ids, ano_letivo, ao_progresso=ao_progresso, cancelado=contexto.cancelado
+    )
@@ -0,0 +1,179 @@
+import bisect
+import re
+import threading
+from collections import defaultdict
+
+from sgde.busca import normalizar
+
+# ==============================================================================
+# TRANSPORTE ESCOLAR (ZONAS POR CEP/BAIRRO E ROTAS POR CAPACIDADE E TURNO)
+# ==============================================================================
+# Sem mapas nem geocodificação: a proximidade vem do próprio CEP, cujos dígitos vão
+# do geral ao específico (região, sub-região, setor, subsetor, divisão e sufixo).
+# Os alunos de cada ano e turno são agrupados em zonas pelos primeiros DIGITOS_ZONA
+# dígitos do CEP (sem CEP, pela cidade/bairro); cada zona é dividida em rotas até a
+# capacidade do veículo, na ordem do CEP, e as sobras de zonas vizinhas (na ordem
+# dos CEPs) são juntadas enquanto couberem num veículo. Uma alteração de aluno ou
+# matrícula marca só as zonas dele para replanejar.
+CAPACIDADE_VEICULO = 44
+DIGITOS_ZONA = 5
+
+_NAO_DIGITO = re.compile(r'\D')
+
+
+def cep_normalizado(cep):
+    digitos = _NAO_DIGITO.sub('', str(cep or ''))
+    return digitos if len(digitos) == 8 else None
+
+
+def parada_do_aluno(aluno):
+    # (zona, chave de ordenação dentro da zona) do endereço do aluno, ou None sem endereço
+    cep = cep_normalizado(aluno.get('end_cep'))
+    logradouro = normalizar(aluno.get('end_logradouro'))
+    if cep:
+        return cep[:DIGITOS_ZONA], (cep, logradouro)
+    bairro = normalizar(aluno.get('end_bairro'))
+    if bairro:
+        # "~" ordena depois dos dígitos: zonas por bairro ficam após as zonas por CEP
+        return f"~{normalizar(aluno.get('end_cidade'))}/{bairro}", ('', logradouro)
+    return None
+
+
+class PlanejadorRotas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (aluno_id, ano) -> (turno, zona, chave, mobilidade reduzida)
+        self._entradas = {}
+        self._anos_do_aluno = defaultdict(set)
+        # (ano, turno, zona) -> {aluno_id: (chave, mobilidade)}
+        self._zonas = defaultdict(dict)
+        # (ano, turno, zona) -> (capacidade usada, rotas cheias, sobra)
+        self._rotas_da_zona = {}
+        # (ano, turno) -> (capacidade, rotas consolidadas); apagado quando uma zona muda
+        self._rotas_do_turno = {}
+        # Índice de prefixo: ano -> lista ordenada de (cep, aluno_id)
+        self._ceps = defaultdict(list)
+        self.sem_endereco = defaultdict(set)
+
+    # --------------------------------------------------------------------------
+    # Atualização incremental
+    # --------------------------------------------------------------------------
+    def atualizar_aluno(self, aluno_id, aluno, turnos_por_ano):
+        # turnos_por_ano: {ano_letivo: horário da turma em curso}; {} tira o aluno do plano
+        with self._lock:
+            for ano in list(self._anos_do_aluno.get(aluno_id, ())):
+                self._remover(aluno_id, ano)
+            if aluno is None:
+                return
+            parada = parada_do_aluno(aluno)
+            for ano, turno in turnos_por_ano.items():
+                turno = turno or "Sem turno"
+                self._anos_do_aluno[aluno_id].add(ano)
+                if parada is None:
+                    self.sem_endereco[ano].add(aluno_id)
+                    self._entradas[(aluno_id, ano)] = None
+                    continue
+                zona, chave = parada
+                mobilidade = bool(aluno.get('mobilidade_reduzida'))
+                self._entradas[(aluno_id, ano)] = (turno, zona, chave, mobilidade)
+                self._zonas[(ano, turno, zona)][aluno_id] = (chave, mobilidade)
+                self._sujar(ano, turno, zona)
+                if chave[0]:
+                    bisect.insort(self._ceps[ano], (chave[0], aluno_id))
+
+    def _remover(self, aluno_id, ano):
+        entrada = self._entradas.pop((aluno_id, ano), None)
+        self._anos_do_aluno[aluno_id].discard(ano)
+        self.sem_endereco[ano].discard(aluno_id)
+        if entrada is None:
+            return
+        turno, zona, chave, _ = entrada
+        alunos = self._zonas[(ano, turno, zona)]
+        alunos.pop(aluno_id, None)
+        if not alunos:
+            del self._zonas[(ano, turno, zona)]
+        self._sujar(ano, turno, zona)
+        if chave[0]:
+            ceps = self._ceps[ano]
+            posicao = bisect.bisect_left(ceps, (chave[0], aluno_id))
+            if posicao < len(ceps) and ceps[posicao] == (chave[0], aluno_id):
+                del ceps[posicao]
+
+    def _sujar(self, ano, turno, zona):
+        self._rotas_da_zona.pop((ano, turno, zona), None)
+        self._rotas_do_turno.pop((ano, turno), None)
+
+    # --------------------------------------------------------------------------
+    # Planejamento
+    # --------------------------------------------------------------------------
+    def _planejar_zona(self, chave_zona, capacidade):
+        plano = self._rotas_da_zona.get(chave_zona)
+        if plano and plano[0] == capacidade:
+            return plano[1], plano[2]
+        alunos = sorted(self._zonas[chave_zona].items(), key=lambda item: (item[1][0], item[0]))
+        ids = [aluno_id for aluno_id, _ in alunos]
+        mobilidade = {aluno_id for aluno_id, (_, reduzida) in alunos if reduzida}
+        blocos = [ids[i:i + capacidade] for i in range(0, len(ids), capacidade)]
+        sobra = blocos.pop() if blocos and len(blocos[-1]) < capacidade else []
+        cheias = [(bloco, bool(mobilidade.intersection(bloco))) for bloco in blocos]
+        sobra = (sobra, bool(mobilidade.intersection(sobra)))
+        self._rotas_da_zona[chave_zona] = (capacidade, cheias, sobra)
+        return cheias, sobra
+
+    def _planejar_turno(self, ano, turno, capacidade):
+        planejado = self._rotas_do_turno.get((ano, turno))
+        if planejado and planejado[0] == capacidade:
+            return planejado[1]
+        rotas = []
+        aberta = None
+        zonas = sorted(zona for a, t, zona in self._zonas if a == ano and t == turno)
+        for zona in zonas:
+            cheias, (sobra, acessivel) = self._planejar_zona((ano, turno, zona), capacidade)
+            rotas.extend({'zonas': [zona], 'alunos': bloco, 'acessivel': reduzida} for bloco, reduzida in cheias)
+            if not sobra:
+                continue
+            # Sobras de zonas vizinhas dividem o veículo enquanto couberem
+            if aberta and len(aberta['alunos']) + len(sobra) <= capacidade:
+                aberta['zonas'].append(zona)
+                aberta['alunos'] = aberta['alunos'] + sobra
+                aberta['acessivel'] = aberta['acessivel'] or acessivel
+            else:
+                aberta = {'zonas': [zona], 'alunos': list(sobra), 'acessivel': acessivel}
+                rotas.append(aberta)
+        rotas.sort(key=lambda rota: rota['zonas'][0])
+        for numero, rota in enumerate(rotas, start=1):
+            rota.update({
+                'codigo': f"{turno[:1].upper()}{numero:03d}", 'ano_letivo': ano, 'horario': turno,
+                'lotacao': len(rota['alunos']), 'capacidade': capacidade,
+            })
+        self._rotas_do_turno[(ano, turno)] = (capacidade, rotas)
+        return rotas
+
+    def rotas(self, ano_letivo, capacidade=CAPACIDADE_VEICULO, turno=None):
+        # Lista de rotas {codigo, horario, zonas, alunos (em ordem de CEP), lotacao,
+        # capacidade, acessivel}; só as zonas alteradas desde a última consulta são
+        # refeitas. As rotas ficam em cache e são compartilhadas: não devem ser alteradas.
+        with self._lock:
+            turnos = sorted({t for a, t, _ in self._zonas if a == ano_letivo and (turno is None or t == turno)})
+            return [rota for t in turnos for rota in self._planejar_turno(ano_letivo, t, capacidade)]
+
+    def anos(self):
+        with self._lock:
+            return sorted({ano for ano, _, _ in self._zonas} | {ano for ano, ids in self.sem_endereco.items() if ids})
+
+    def alunos_sem_endereco(self, ano_letivo):
+        with self._lock:
+            return sorted(self.sem_endereco.get(ano_letivo, ()))
+
+    def alunos_por_prefixo(self, ano_letivo, prefixo):
+        # Ids dos alunos do ano com CEP começando por `prefixo` (bisect no índice ordenado)
+        prefixo = _NAO_DIGITO.sub('', str(prefixo or ''))
+        with self._lock:
+            ceps = self._ceps.get(ano_letivo, [])
+            inicio = bisect.bisect_left(ceps, (prefixo,))
+            ids = []
+            for cep, aluno_id in ceps[inicio:]:
+                if not cep.startswith(prefixo):
+                    break
+                ids.append(aluno_id)
+            return ids
@@ -0,0 +1,39 @@
+import threading
+
+from sgde.busca import IndiceBusca
+
+NOMES = ["Ana Silva", "Bruno Santos", "Carla Souza", "Daniel Lima", "Eduarda Costa"]
+
+
+def test_busca_com_reindexacao_concorrente():
+    indice = IndiceBusca()
+    indice.adicionar_varios({'id': i, 'nome_completo': f"{NOMES[i % 5]} {i}"} for i in range(3000))
+    parar = threading.Event()
+    erros = []
+
+    def reindexar():
+        # Mesmo caminho de atualizar_aluno/_aplicar: remove e indexa de novo
+        for rodada in range(20):
+            for i in range(0, 3000, 7):
+                indice.adicionar({'id': i, 'nome_completo': f"{NOMES[(i + rodada) % 5]} {i}"})
+        parar.set()
+
+    def buscar():
+        try:
+            while not parar.is_set():
+                indice.buscar("silva", limite=10)
+                indice.buscar("ana sil", limite=10, pagina=3)
+                indice.buscar("sauza", limite=10)  # sem prefixo: cai nos trigramas
+        except Exception as erro:
+            erros.append(erro)
+
+    escritor = threading.Thread(target=reindexar)
+    leitores = [threading.Thread(target=buscar) for _ in range(2)]
+    escritor.start()
+    for leitor in leitores:
+        leitor.start()
+    escritor.join()
+    for leitor in leitores:
+        leitor.join()
+    assert not erros, erros
+    assert indice.buscar("silva 35")[1] >= 1
@@ -0,0 +1,73 @@
+import threading
+from datetime import date
+
+from sgde.ficha import FichasAlunos
+
+
+def ficha(i):
+    return {'id': i, 'nome_completo': f"Aluno {i}", 'dt_nascimento': date(2015, 1, 1), 'ra': "N/A", 'sexo': "Feminino"}
+
+
+def test_iteracao_com_insercoes_concorrentes():
+    fichas = FichasAlunos()
+    fichas.adicionar_varios(ficha(i) for i in range(2000))
+    parar = threading.Event()
+    erros = []
+
+    def inserir():
+        for i in range(2000, 20000):
+            fichas.adicionar(ficha(i))
+        parar.set()
+
+    def ler():
+        try:
+            while not parar.is_set():
+                for aluno in list(fichas.values()):
+                    aluno['nome_completo']
+                for aluno_id in list(fichas):
+                    fichas[aluno_id]['sexo']
+        except Exception as erro:
+            erros.append(erro)
+
+    escritor = threading.Thread(target=inserir)
+    leitores = [threading.Thread(target=ler) for _ in range(2)]
+    escritor.start()
+    for leitor in leitores:
+        leitor.start()
+    escritor.join()
+    for leitor in leitores:
+        leitor.join()
+    assert not erros, erros
+    assert all(fichas[i]['nome_completo'] == f"Aluno {i}" for i in fichas)
+
+
+def test_dataframe_com_insercoes_concorrentes():
+    fichas = FichasAlunos()
+    fichas.adicionar_varios(ficha(i) for i in range(2000))
+    parar = threading.Event()
+    erros = []
+
+    def inserir():
+        try:
+            for i in range(2000, 30000):
+                fichas.adicionar(ficha(i))
+        except Exception as erro:
+            erros.append(erro)
+        parar.set()
+
+    def montar():
+        try:
+            while not parar.is_set():
+                df = fichas.dataframe()
+                assert df['nome_completo'].notna().all()
+        except Exception as erro:
+            erros.append(erro)
+
+    escritor = threading.Thread(target=inserir)
+    leitor = threading.Thread(target=montar)
+    escritor.start()
+    leitor.start()
+    escritor.join()
+    leitor.join()
+    assert not erros, erros
+    assert len(fichas.dataframe()) == 30000
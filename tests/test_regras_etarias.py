@@ -0,0 +1,15 @@
+from datetime import date
+
+from sgde.regras import validar_idade_etapa
+
+
+def test_etapa_pelo_nome():
+    for etapa in ("Ensino Fundamental - Anos Iniciais", "Fundamental Anos Iniciais", "201 - Fundamental Anos Iniciais"):
+        assert not validar_idade_etapa(date(2023, 1, 1), etapa, 2025)[0]
+        assert validar_idade_etapa(date(2018, 1, 1), etapa, 2025)[0]
+
+
+def test_etapa_nao_reconhecida_e_rejeitada():
+    compativel, mensagem = validar_idade_etapa(date(2018, 1, 1), "Anos Iniciais do Fundamental I", 2025)
+    assert not compativel
+    assert "não reconhecida" in mensagem